@@ -5,3 +5,12 @@ from .settings import read_config_file
 
 from .sm_scrt import SMSecureCrt
 from .sm_rdm import SMDevolutionsRdm
+from .sm_profile import SMProfiler
+from .sm_watch import SMWatcher
+from .sm_diff import SMDiff
+from .sm_validate import SMValidator
+from .sm_jumphost import SMJumpHostGraph
+from .sm_merge import SMXmlMerge
+from .sm_convert import SMSessionConvert
+from .sm_columns import SMColumns
+from .sm_api import SMConverter
@@ -0,0 +1,246 @@
+"""File input/output library (output files and folders replaced atomically, compressed files)"""
+
+import gzip
+import logging
+import os
+import os.path
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:  # optional, zstd compression only
+    zstandard = None
+
+# compression: file name suffix
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# compression: magic bytes (file content)
+COMPRESSION_MAGIC = {"gzip": b"\x1f\x8b", "zstd": b"\x28\xb5\x2f\xfd"}
+
+# fixed compression levels (reproducible output)
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def _read_umask() -> int:
+    """Return process umask (read once at import, os.umask() changes process-wide state)."""
+    try:
+        # Linux: read without changing it
+        with open("/proc/self/status", "r", encoding="ascii") as file:
+            for line in file:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# umask of the process (new files and folders of atomic writes)
+_UMASK = _read_umask()
+
+
+def _get_default_mode(directory=False) -> int:
+    """Return default mode of a new file (0o666) or folder (0o777) masked by process umask."""
+    return (0o777 if directory else 0o666) & ~_UMASK
+
+
+def is_compression_available(compression: str | None) -> bool:
+    """Return True if the compression is supported ('zstd' requires 'zstandard' package)."""
+    if compression == "zstd":
+        return zstandard is not None
+    return compression in (None, "gzip")
+
+
+def split_compression_suffix(file_path: str) -> tuple:
+    """Return (file path without compression suffix, compression) pair.
+
+    Example: 'sessions.xml.gz' -> ('sessions.xml', 'gzip')
+    """
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if file_path.lower().endswith(suffix):
+            return file_path[: -len(suffix)], compression
+    return file_path, None
+
+
+def get_compression(file_path: str, compression: str | None = None) -> str | None:
+    """Return compression of the output file ('gzip', 'zstd' or None).
+
+    Args:
+        file_path (str): Destination file
+        compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
+    """
+    if compression is None:
+        return split_compression_suffix(file_path)[1]
+    if compression == "none":
+        return None
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression '{compression}'")
+    return compression
+
+
+@contextmanager
+def _compress(file, compression: str | None, file_path: str):
+    """Wrap binary output file with compressor (context manager)."""
+    if compression is None:
+        yield file
+    elif compression == "gzip":
+        # fixed mtime and inner file name (the same content = the same bytes)
+        name = os.path.basename(split_compression_suffix(file_path)[0])
+        with gzip.GzipFile(
+            filename=name, mode="wb", fileobj=file, compresslevel=GZIP_LEVEL, mtime=0
+        ) as compressed:
+            yield compressed
+    else:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        with compressor.stream_writer(file, closefd=False) as compressed:
+            yield compressed
+
+
+@contextmanager
+def open_output(file_path: str, atomic=False, compression: str | None = None):
+    """Open output file for (binary) writing (context manager).
+
+    When atomic is set, content is written to a temporary file in the
+    destination folder and moved over the destination file when the block
+    finishes without an error. Readers never see partially written file.
+
+    Content is compressed while written (no intermediate uncompressed file)
+    when compression is set or the file name ends with '.gz' or '.zst'.
+
+    Args:
+        file_path (str): Destination file
+        atomic (bool, optional): Replace destination file atomically. Default: False.
+        compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
+
+    Raises:
+        OSError: zstd compression without 'zstandard' package
+    """
+
+    compression = get_compression(file_path, compression)
+    if not is_compression_available(compression):
+        raise OSError(f"Compression '{compression}' requires 'zstandard' package")
+    if compression is not None:
+        logging.info("Writing '%s' compressed (%s).", file_path, compression)
+
+    if not atomic:
+        with open(file_path, "wb") as file:
+            with _compress(file, compression, file_path) as output:
+                yield output
+        return
+
+    folder, filename = os.path.split(file_path)
+    fd, tmp_file = tempfile.mkstemp(
+        dir=folder if folder != "" else ".", prefix=f".{filename}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            with _compress(file, compression, file_path) as output:
+                yield output
+            file.flush()
+            os.fsync(file.fileno())
+
+        # keep permissions of the replaced file (mkstemp creates 0600 file)
+        if os.path.exists(file_path):
+            os.chmod(tmp_file, os.stat(file_path).st_mode & 0o777)
+        else:
+            os.chmod(tmp_file, _get_default_mode())
+
+        os.replace(tmp_file, file_path)
+        logging.info("File '%s' replaced atomically.", file_path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def open_input(file_path: str):
+    """Open input file for (binary) reading, decompress gzip/zstd content transparently.
+
+    Compression is detected by file content (magic bytes), not by extension.
+
+    Args:
+        file_path (str): Source file
+
+    Returns:
+        Binary file object (use as context manager)
+
+    Raises:
+        OSError: File can't be read, zstd file without 'zstandard' package
+    """
+    file = open(file_path, "rb")
+    try:
+        magic = file.peek(4)[:4]
+    except BaseException:
+        file.close()
+        raise
+
+    if magic.startswith(COMPRESSION_MAGIC["gzip"]):
+        logging.info("Reading '%s' compressed (gzip).", file_path)
+        file.close()
+        return gzip.open(file_path, "rb")
+
+    if magic.startswith(COMPRESSION_MAGIC["zstd"]):
+        if zstandard is None:
+            file.close()
+            raise OSError("Compression 'zstd' requires 'zstandard' package")
+        logging.info("Reading '%s' compressed (zstd).", file_path)
+        return zstandard.ZstdDecompressor().stream_reader(file, closefd=True)
+
+    return file
+
+
+def _replace_directory(src_dir: str, dst_dir: str) -> None:
+    """Replace destination folder by source folder (the same file system).
+
+    Destination folder is renamed aside, source folder is renamed to the
+    destination and the old folder is removed. Readers see either the old
+    or the new complete folder (destination path is missing between both
+    renames only).
+    """
+    if not os.path.exists(dst_dir):
+        os.rename(src_dir, dst_dir)
+        return
+
+    old_dir = tempfile.mkdtemp(dir=os.path.dirname(dst_dir), prefix=".old.")
+    old_dst = os.path.join(old_dir, os.path.basename(dst_dir))
+    os.rename(dst_dir, old_dst)
+    try:
+        os.rename(src_dir, dst_dir)
+    except OSError:
+        os.rename(old_dst, dst_dir)
+        os.rmdir(old_dir)
+        raise
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+@contextmanager
+def open_output_directory(dst_dir: str):
+    """Prepare output folder and replace destination folder with it (context manager).
+
+    Yields path of a new empty folder next to the destination. When the
+    block finishes without an error, the new folder replaces the destination
+    folder (destination content is not merged). Otherwise the new folder is
+    removed and destination is not changed.
+
+    Args:
+        dst_dir (str): Destination folder
+    """
+    dst_dir = os.path.abspath(dst_dir)
+    parent, name = os.path.split(dst_dir)
+    os.makedirs(parent, exist_ok=True)
+
+    new_dir = tempfile.mkdtemp(dir=parent, prefix=f".{name}.", suffix=".tmp")
+    try:
+        yield new_dir
+        # mkdtemp creates 0700 folder
+        os.chmod(new_dir, _get_default_mode(directory=True))
+        _replace_directory(new_dir, dst_dir)
+        logging.info("Folder '%s' replaced.", dst_dir)
+    except BaseException:
+        shutil.rmtree(new_dir, ignore_errors=True)
+        raise
@@ -2,6 +2,8 @@
 
 import argparse
 
+from .fileio import is_compression_available
+
 # import os.path
 # import logging
 
@@ -20,6 +22,38 @@ def get_version():
         version = "unknown"
     return version
 
+def add_profile_args(parser):
+    """Add profiling arguments (per-stage timing) to the parser."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        action="store_true",
+        required=False,
+        help="Print per-stage wall time, CPU time and row counts (to stderr).",
+    )
+    group.add_argument(
+        "--profile-json",
+        metavar="FILE",
+        dest="profile_json",
+        required=False,
+        help="Write per-stage profiling report to JSON file (implies --profile).",
+    )
+    group.add_argument(
+        "--profile-dir",
+        metavar="FOLDER",
+        dest="profile_dir",
+        required=False,
+        help="Dump cProfile stats file per stage to the folder (implies --profile).",
+    )
+    group.add_argument(
+        "--profile-memory",
+        action="store_true",
+        dest="profile_memory",
+        required=False,
+        help="Record peak/retained memory and top allocation sites per stage (tracemalloc, RSS sampling; slow, implies --profile).",
+    )
+
+
 def parse_maker_args():
     """Parse arguments for export sessions
 
@@ -42,9 +76,9 @@ def parse_maker_args():
     parser.add_argument("source", type=str, help="Source (XLS) file")
     parser.add_argument(
         "--type",
-        choices=["scrt", "rdm"],
+        choices=["scrt", "scrt-ini", "rdm"],
         default="scrt",
-        help="Destination type: scrt=SecureCRT (default), rdm=DevolutionsRDM",
+        help="Destination type: scrt=SecureCRT (default), scrt-ini=SecureCRT Config folder (.ini files), rdm=DevolutionsRDM",
     )
     group1.add_argument(
         "--write",
@@ -76,12 +110,151 @@ def parse_maker_args():
         required=False,
         help="Verbose output. (use: -v, -vv)",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        required=False,
+        help="Watch mode. Keep running and rebuild destination file when source file or config file changes.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        metavar="SECONDS",
+        default=1.0,
+        help="Watch mode polling interval in seconds (default=1.0).",
+    )
+    parser.add_argument(
+        "--shard",
+        action="store_true",
+        required=False,
+        help="SecureCRT only. Write one XML file per folder subtree and 'manifest.json' to destination folder.",
+    )
+    parser.add_argument(
+        "--shard-depth",
+        type=int,
+        metavar="DEPTH",
+        dest="shard_depth",
+        default=1,
+        help="Folder depth of the shards (default=1, top-level folder).",
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        required=False,
+        help="SecureCRT only. Build sessions of top-level folders in worker processes (output is the same).",
+    )
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        required=False,
+        help="SecureCRT only. Render sessions from compiled session template, no session elements are built (output is the same).",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        required=False,
+        help="SecureCRT only. Write template defaults once as 'Default' session, sessions keep the settings which differ only.",
+    )
+    parser.add_argument(
+        "--merge",
+        type=str,
+        metavar="EXISTING",
+        default=None,
+        help="Merge built sessions into existing SecureCRT XML or RDM JSON file EXISTING by path, other entries are kept untouched (destination: EXISTING if --write is not set).",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        required=False,
+        help="Devolutions RDM only. With --merge, write new and changed connections only (update-only import).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (--parallel), shards (--shard) or .ini files (--type scrt-ini) written concurrently (default=auto).",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        required=False,
+        help="Validate sheets (required fields, duplicates, references) before build and print the issues.",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        required=False,
+        help="Validate sheets and stop (exit status 1) on any error. Implies --validate.",
+    )
+    parser.add_argument(
+        "--validate-json",
+        type=str,
+        metavar="FILE",
+        dest="validate_json",
+        default=None,
+        help="Write validation report (JSON) to FILE. Implies --validate.",
+    )
+    parser.add_argument(
+        "--bastion",
+        type=str,
+        metavar="SESSION",
+        default=None,
+        help="SecureCRT only. List sessions connected through the jump host SESSION (path, directly or via other jump hosts) and exit.",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["gzip", "zstd"],
+        default=None,
+        help="Compress destination file(s) while written, '.gz' or '.zst' is added to the file name (default: by destination file extension).",
+    )
+    add_profile_args(parser)
     group2.add_argument(        
         "--version", action="version",
         version = f"{parser.prog} version  {get_version()}"
     )    
     arg = parser.parse_args()
 
+    if arg.strict or arg.validate_json:
+        arg.validate = True
+    if arg.watch and arg.print:
+        parser.error("argument --watch: not allowed with argument -p/--print")
+    if arg.shard and (arg.print or arg.watch):
+        parser.error("argument --shard: not allowed with arguments -p/--print, --watch")
+    if arg.shard and arg.type != "scrt":
+        parser.error("argument --shard: allowed with '--type scrt' only")
+    if arg.parallel and (arg.print or arg.watch or arg.shard):
+        parser.error("argument --parallel: not allowed with arguments -p/--print, --watch, --shard")
+    if arg.parallel and arg.type != "scrt":
+        parser.error("argument --parallel: allowed with '--type scrt' only")
+    if arg.compiled and (arg.print or arg.watch or arg.shard or arg.parallel):
+        parser.error("argument --compiled: not allowed with arguments -p/--print, --watch, --shard, --parallel")
+    if arg.compiled and arg.type != "scrt":
+        parser.error("argument --compiled: allowed with '--type scrt' only")
+    if arg.compact and (arg.watch or arg.shard or arg.parallel or arg.compiled):
+        parser.error("argument --compact: not allowed with arguments --watch, --shard, --parallel, --compiled")
+    if arg.compact and arg.type != "scrt":
+        parser.error("argument --compact: allowed with '--type scrt' only")
+    if arg.merge and (arg.print or arg.watch or arg.shard or arg.parallel or arg.compiled or arg.compact):
+        parser.error(
+            "argument --merge: not allowed with arguments -p/--print, --watch, --shard, --parallel, --compiled, --compact"
+        )
+    if arg.delta and (not arg.merge or arg.type != "rdm"):
+        parser.error("argument --delta: allowed with arguments --merge and '--type rdm' only")
+    if arg.shard_depth < 1:
+        parser.error("argument --shard-depth: must be 1 or more")
+    if arg.validate and arg.watch:
+        parser.error("argument --validate/--strict: not allowed with argument --watch")
+    if arg.bastion and (arg.watch or arg.shard or arg.parallel):
+        parser.error("argument --bastion: not allowed with arguments --watch, --shard, --parallel")
+    if arg.bastion and arg.type == "rdm":
+        parser.error("argument --bastion: allowed with '--type scrt' or '--type scrt-ini' only")
+    if arg.type == "scrt-ini" and (arg.print or arg.watch or arg.merge or arg.compress):
+        parser.error("argument --type scrt-ini: not allowed with arguments -p/--print, --watch, --merge, --compress")
+    if arg.compress and arg.print:
+        parser.error("argument --compress: not allowed with argument -p/--print")
+    if not is_compression_available(arg.compress):
+        parser.error(f"argument --compress: '{arg.compress}' requires 'zstandard' package")
+
     return arg
 
 
@@ -92,7 +265,7 @@ def parse_reader_args():
         object: Arguments
     """
     parser = argparse.ArgumentParser(
-        description="Read SecureCRT sessions XML file (source) and export it to Excel file (write to destination)."
+        description="Read SecureCRT sessions XML file, SecureCRT Config folder or Devolutions RDM JSON file (source) and export it to Excel file (write to destination)."
     )
     group1 = parser.add_mutually_exclusive_group()
     group2 = parser.add_mutually_exclusive_group()
@@ -104,7 +277,7 @@ def parse_reader_args():
         help="Configuration settings file (default=config.yaml)",
         default="config.yaml",
     )
-    parser.add_argument("source", type=str, help="SecureCRT sessions XML file (export from SecureCRT).")
+    parser.add_argument("source", type=str, help="SecureCRT sessions XML file (export from SecureCRT), SecureCRT Config (or Sessions) folder with .ini files or Devolutions RDM JSON file (*.json).")
 
     group1.add_argument(
         "-w",
@@ -114,6 +287,20 @@ def parse_reader_args():
         required=False,
         help="Write to destination Excel (xlsx) file. If not defined, write to the 'export' subfolder.",
     )
+    parser.add_argument(
+        "-s",
+        "--stream",
+        action="store_true",
+        required=False,
+        help="Streaming mode. Write rows to Excel while parsing XML file (bounded memory usage).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of threads reading .ini files (SecureCRT Config folder source) (default=auto).",
+    )
+    add_profile_args(parser)
     group2.add_argument(
         "-q",
         "--quiet",
@@ -136,3 +323,333 @@ def parse_reader_args():
     arg = parser.parse_args()
 
     return arg
+
+
+def parse_bench_args():
+    """Parse arguments for benchmark suite
+
+    Returns:
+        object: Arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic fleets and benchmark SessionMaker conversions (Excel->SCRT, Excel->RDM, SCRT->Excel)."
+    )
+    group2 = parser.add_mutually_exclusive_group()
+
+    parser.add_argument(
+        "--config",
+        type=str,
+        metavar="CONFIG",
+        help="Configuration settings file (default=config.yaml)",
+        default="config.yaml",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        metavar="SIZES",
+        default="1000,10000",
+        help="Comma separated fleet sizes (number of sessions), e.g. 1k,10k,100k,500k (default=1000,10000).",
+    )
+    parser.add_argument(
+        "--cases",
+        type=str,
+        metavar="CASES",
+        default="",
+        help="Comma separated benchmark cases (default=all).",
+    )
+    parser.add_argument(
+        "--data",
+        type=str,
+        metavar="FOLDER",
+        default="data/BENCH",
+        help="Folder for generated fixtures and outputs (default=data/BENCH).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=1,
+        help="Fleet generator seed (default=1).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="Timeout for one benchmark case.",
+    )
+    parser.add_argument(
+        "-w",
+        "--write",
+        metavar="RESULTS",
+        dest="write",
+        required=False,
+        help="Write results to JSON file. If not defined, write to '<data>/results-<commit>.json'.",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        required=False,
+        help="Compare results with baseline results JSON file (e.g. from other commit).",
+    )
+    group2.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        required=False,
+        help="Quiet output.",
+    )
+    group2.add_argument(
+        "-v",
+        "--verbose",
+        dest="verbose",
+        action="count",
+        required=False,
+        help="Verbose output (use: -v, -vv).",
+    )
+    group2.add_argument(
+        "--version", action="version",
+        version = f"{parser.prog} version  {get_version()}"
+    )
+    arg = parser.parse_args()
+
+    return arg
+
+
+def parse_diff_args():
+    """Parse arguments for sessions diff
+
+    Returns:
+        object: Arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare sessions of two sources (Excel book, SecureCRT XML, Devolutions RDM JSON) by full session path and report added, removed and modified sessions."
+    )
+    group2 = parser.add_mutually_exclusive_group()
+
+    parser.add_argument(
+        "--config",
+        type=str,
+        metavar="CONFIG",
+        help="Configuration settings file (default=config.yaml)",
+        default="config.yaml",
+    )
+    parser.add_argument("old", type=str, help="Old source file (*.xlsx, *.xml, *.json).")
+    parser.add_argument("new", type=str, help="New source file (*.xlsx, *.xml, *.json).")
+    parser.add_argument(
+        "-w",
+        "--write",
+        metavar="DESTINATION",
+        dest="write",
+        required=False,
+        help="Write added and modified sessions (from the new source) to importable file.",
+    )
+    parser.add_argument(
+        "--type",
+        choices=["scrt", "rdm"],
+        default=None,
+        help="Destination type of --write: scrt=SecureCRT, rdm=DevolutionsRDM (default: by file extension).",
+    )
+    parser.add_argument(
+        "-j",
+        "--json",
+        metavar="REPORT",
+        dest="json",
+        required=False,
+        help="Write diff report to JSON file.",
+    )
+    parser.add_argument(
+        "-s",
+        "--summary",
+        action="store_true",
+        required=False,
+        help="Print summary only (no session list).",
+    )
+    add_profile_args(parser)
+    group2.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        required=False,
+        help="Quiet output.",
+    )
+    group2.add_argument(
+        "-v",
+        "--verbose",
+        dest="verbose",
+        action="count",
+        required=False,
+        help="Verbose output (use: -v, -vv).",
+    )
+    group2.add_argument(
+        "--version", action="version",
+        version = f"{parser.prog} version  {get_version()}"
+    )
+    arg = parser.parse_args()
+
+    return arg
+
+
+def parse_convert_args():
+    """Parse arguments for direct sessions conversion
+
+    Returns:
+        object: Arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert SecureCRT sessions XML file to Devolutions RDM JSON file or RDM JSON file to SecureCRT XML file directly (without Excel book)."
+    )
+    group2 = parser.add_mutually_exclusive_group()
+
+    parser.add_argument(
+        "--config",
+        type=str,
+        metavar="CONFIG",
+        help="Configuration settings file (default=config.yaml)",
+        default="config.yaml",
+    )
+    parser.add_argument(
+        "source",
+        type=str,
+        help="SecureCRT sessions XML file (converted to RDM JSON) or Devolutions RDM JSON file (*.json, converted to SecureCRT XML).",
+    )
+    parser.add_argument(
+        "-w",
+        "--write",
+        metavar="DESTINATION",
+        dest="write",
+        required=False,
+        help="Write to destination file. If not defined, write to the 'export' subfolder.",
+    )
+    parser.add_argument(
+        "--credential-folder",
+        metavar="FOLDER",
+        default="Credentials",
+        help="RDM folder of credentials converted from SecureCRT credential groups (default=Credentials).",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["gzip", "zstd"],
+        default=None,
+        help="Compress destination file while written, '.gz' or '.zst' is added to the file name (default: by destination file extension).",
+    )
+    add_profile_args(parser)
+    group2.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        required=False,
+        help="Quiet output.",
+    )
+    group2.add_argument(
+        "-v",
+        "--verbose",
+        dest="verbose",
+        action="count",
+        required=False,
+        help="Verbose output (use: -v, -vv).",
+    )
+    group2.add_argument(
+        "--version", action="version",
+        version = f"{parser.prog} version  {get_version()}"
+    )
+    arg = parser.parse_args()
+
+    if not is_compression_available(arg.compress):
+        parser.error(f"argument --compress: '{arg.compress}' requires 'zstandard' package")
+
+    return arg
+
+
+def parse_server_args():
+    """Parse arguments for conversion service
+
+    Returns:
+        object: Arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Local conversion service. Convert uploaded Excel book (or file path) to SecureCRT XML or Devolutions RDM JSON over HTTP."
+    )
+    group1 = parser.add_mutually_exclusive_group()
+    group2 = parser.add_mutually_exclusive_group()
+
+    parser.add_argument(
+        "--config",
+        type=str,
+        metavar="CONFIG",
+        help="Configuration settings file (default=config.yaml)",
+        default="config.yaml",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Listen address (default=127.0.0.1).",
+    )
+    group1.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Listen port (default=8080).",
+    )
+    group1.add_argument(
+        "--socket",
+        metavar="FILE",
+        required=False,
+        help="Listen on Unix socket file (instead of host/port).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default=number of CPUs).",
+    )
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        dest="max_concurrent",
+        default=None,
+        help="Maximum number of conversions running at once (default=number of workers).",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        dest="max_queue",
+        default=32,
+        help="Maximum number of conversions waiting for a worker, then reject with 503 (default=32).",
+    )
+    parser.add_argument(
+        "--max-body",
+        type=float,
+        metavar="MB",
+        dest="max_body",
+        default=64,
+        help="Maximum uploaded Excel book size in MB (default=64).",
+    )
+    parser.add_argument(
+        "--root",
+        metavar="FOLDER",
+        default=".",
+        help="Root folder of Excel books converted by 'path' parameter (default=current folder).",
+    )
+    group2.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        required=False,
+        help="Quiet output (no access log).",
+    )
+    group2.add_argument(
+        "-v",
+        "--verbose",
+        dest="verbose",
+        action="count",
+        required=False,
+        help="Verbose output (use: -v, -vv).",
+    )
+    group2.add_argument(
+        "--version", action="version",
+        version = f"{parser.prog} version  {get_version()}"
+    )
+    arg = parser.parse_args()
+
+    return arg
@@ -43,3 +43,28 @@ def read_config_file(config_file: str):
             logging.error("Unable to read configuration file '%s'.", config_file)
 
     return False
+
+
+def resolve_template_paths(settings: dict, base_dir: str) -> dict:
+    """Return settings with relative SecureCRT template paths resolved against 'base_dir'.
+
+    Template paths in the configuration file are relative to the current
+    directory (scripts are run from SessionMaker folder). Settings are not
+    modified, the copy shares all other sections.
+
+    Attributes:
+        settings (dict): Configuration settings
+        base_dir (str): Folder of relative template paths
+
+    Returns:
+        settings (dict) with absolute template paths
+    """
+    templates = settings.get("scrt", {}).get("template")
+    if not templates:
+        return settings
+
+    templates = {
+        key: path if os.path.isabs(path) else os.path.join(base_dir, path)
+        for key, path in templates.items()
+    }
+    return {**settings, "scrt": {**settings["scrt"], "template": templates}}
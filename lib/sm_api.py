@@ -0,0 +1,220 @@
+"""SessionMaker library API module
+
+Class - SMConverter:
+    In-memory conversion entry point for Python tooling: Excel book (bytes,
+    file object) or sessions model (dicts) to SecureCRT XML or Devolutions
+    RDM JSON (bytes or binary stream). Nothing is read from or written to
+    disk (but configuration and templates) and nothing is printed. Settings
+    and parsed templates stay warm between calls.
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import io
+import logging
+import os.path
+
+import xlsxwriter
+
+from .settings import read_config_file, resolve_template_paths
+from .sm_excel import SMExcel
+from .sm_rdm import SMDevolutionsRdm
+from .sm_scrt import SMSecureCrt
+
+
+# ========================================
+# Class SMConverter
+# ========================================
+class SMConverter:
+    """Excel book / sessions model -> SecureCRT XML / Devolutions RDM JSON converter.
+
+    Source is one of:
+
+        bytes (bytearray, memoryview): Excel book content
+        file object: binary file object with Excel book content (read())
+        dict: sessions model, column based dicts (the same as the Excel
+            sheets, see SMSecureCrt.get_sessions_dict()) by sheet key:
+            'sessions' (required), 'scrt_credentials', 'scrt_firewalls',
+            'rdm_credentials', 'rdm_hosts'
+
+    Target is 'scrt' (SecureCRT XML, compiled template build) or 'rdm'
+    (Devolutions RDM JSON). Output is the same as written by session_maker.py.
+
+    Every call reads the source into its own maker objects, parsed templates
+    are shared (warm) between calls, so one converter may serve concurrent
+    conversions (threads). Errors are logged (logging) and None is returned.
+
+    Example:
+        converter = SMConverter(config_file="config.yaml")
+        xml_bytes = converter.convert(book_bytes, "scrt")
+        converter.convert_to(model, "rdm", output=file)
+
+    Attributes:
+        Private:
+            _settings (dict): Configuration settings
+            _xml_tpl_cache (dict): Parsed XML templates cache (shared between calls)
+    """
+
+    TARGETS = ("scrt", "rdm")
+
+    def __init__(self, settings: dict | None = None, config_file="config.yaml"):
+        """Initial method (settings are read and templates parsed once).
+
+        Relative template paths of the configuration file are resolved
+        against the configuration file folder (not the current directory).
+
+        Args:
+            settings (dict, optional): Configuration settings (config.yaml content). Default: None (read config_file).
+            config_file (str, optional): Configuration file. Default: "config.yaml".
+
+        Raises:
+            ValueError: Configuration file or XML templates can't be read
+        """
+        if settings is None:
+            settings = os.path.isfile(config_file) and read_config_file(config_file)
+            if not settings:
+                raise ValueError(f"Unable to read configuration file '{config_file}'")
+            settings = resolve_template_paths(settings, os.path.dirname(os.path.abspath(config_file)))
+
+        self._settings = settings
+        self._xml_tpl_cache = {}
+        if not SMSecureCrt(settings=self._settings, xml_tpl_cache=self._xml_tpl_cache).load_xml_templates():
+            raise ValueError("Unable to load SecureCRT XML templates")
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def __get_maker(self, target: str):
+        """Return new maker of the target (warm templates)."""
+        if target == "scrt":
+            return SMSecureCrt(settings=self._settings, xml_tpl_cache=self._xml_tpl_cache)
+        return SMDevolutionsRdm(settings=self._settings)
+
+    def __read_book(self, sm_maker, content: bytes, target: str, file_type: str) -> bool:
+        """Read Excel book content into the maker (sessions and target sheets)."""
+        if not sm_maker.excel_read_book_content(content, file_type):
+            logging.error("Unable to read Excel book.")
+            return False
+
+        excel = self._settings["excel"]
+        sheets_dict = [sm_maker.excel_read_sheet_sessions(excel["tab_sessions"])]
+        if target == "scrt":
+            # SecureCRT credentials and firewalls sheets are required
+            sheets_dict.append(sm_maker.excel_read_sheet_credentials(excel["tab_scrt_credentials"]))
+            sheets_dict.append(sm_maker.excel_read_sheet_firewalls(excel["tab_scrt_firewalls"]))
+        else:
+            # Devolutions RDM credentials and hosts sheets are optional
+            sm_maker.excel_read_sheet_credentials(excel["tab_rdm_credentials"])
+            sm_maker.excel_read_sheet_rdm_hosts(excel["tab_rdm_hosts"])
+
+        if any(sheet_dict is False for sheet_dict in sheets_dict):
+            logging.error("Unable to read Excel sheets.")
+            return False
+        return True
+
+    def __read_model(self, sm_maker, model: dict, target: str) -> bool:
+        """Set sessions model dicts (normalized the same way as Excel sheets) into the maker."""
+        if not model.get("sessions"):
+            logging.error("Sessions model has no 'sessions'.")
+            return False
+        if sm_maker.set_sessions_dict(model["sessions"]) is False:
+            logging.error("Unable to read sessions model.")
+            return False
+
+        if target == "scrt":
+            sm_maker.set_credentials_dict(model.get("scrt_credentials"))
+            sm_maker.set_firewalls_dict(model.get("scrt_firewalls"))
+        else:
+            sm_maker.set_credentials_dict(model.get("rdm_credentials"))
+            sm_maker.set_hosts_dict(model.get("rdm_hosts"))
+        return True
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def warm_up(self):
+        """Read small Excel book (Excel reader plugins are imported on the first read)."""
+        with io.BytesIO() as file:
+            workbook = xlsxwriter.Workbook(file, {"in_memory": True})
+            workbook.add_worksheet("warm-up").write_string(0, 0, "warm-up")
+            workbook.close()
+            SMExcel().read_excel_book_content(file.getvalue())
+
+    def clear_cache(self):
+        """Clear parsed templates cache (templates are parsed again on the next call)."""
+        self._xml_tpl_cache.clear()
+
+    def convert(self, source, target="scrt", file_type="xlsx") -> bytes | None:
+        """Convert source to SecureCRT XML or Devolutions RDM JSON content.
+
+        Args:
+            source (bytes | file object | dict): Excel book content, binary file object or sessions model
+            target (str, optional): 'scrt' or 'rdm'. Default: "scrt".
+            file_type (str, optional): Excel book file type. Default: "xlsx".
+
+        Returns:
+            (bytes): XML/JSON content (the same as written to file)
+            None: In case of error
+        """
+        if target not in self.TARGETS:
+            logging.error("Unknown target '%s' (expected: %s).", target, ", ".join(self.TARGETS))
+            return None
+
+        sm_maker = self.__get_maker(target)
+        if isinstance(source, dict):
+            ret = self.__read_model(sm_maker, source, target)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            ret = self.__read_book(sm_maker, bytes(source), target, file_type)
+        elif hasattr(source, "read"):
+            try:
+                content = source.read()
+            except OSError as err:
+                logging.error("Unable to read source file object.")
+                logging.error("%s", err)
+                return None
+            ret = self.__read_book(sm_maker, content, target, file_type)
+        else:
+            logging.error("Unsupported source type '%s'.", type(source).__name__)
+            return None
+        if not ret:
+            return None
+
+        if target == "scrt":
+            return sm_maker.build_xml_bytes_compiled()
+        return sm_maker.json_to_bytes(json_content=sm_maker.build_json_from_dict())
+
+    def convert_to(self, source, target="scrt", output=None, file_type="xlsx"):
+        """Convert source and write the content to binary stream.
+
+        Args:
+            source (bytes | file object | dict): Source (see convert())
+            target (str, optional): 'scrt' or 'rdm'. Default: "scrt".
+            output (file object, optional): Binary stream. Default: None (new io.BytesIO).
+            file_type (str, optional): Excel book file type. Default: "xlsx".
+
+        Returns:
+            (file object): Output stream (new io.BytesIO is positioned at the start)
+            None: In case of error (nothing is written)
+        """
+        content = self.convert(source, target, file_type)
+        if content is None:
+            return None
+
+        if output is None:
+            return io.BytesIO(content)
+
+        try:
+            output.write(content)
+        except OSError as err:
+            logging.error("Unable to write output stream.")
+            logging.error("%s", err)
+            return None
+        return output
@@ -0,0 +1,903 @@
+"""SessionMaker benchmark module
+
+Class - SMFleetGenerator:
+    Synthetic fleet generator (sessions workbook, SecureCRT XML export, Config folder
+    and Devolutions RDM JSON export).
+
+Class - SMBenchmark:
+    End-to-end conversion benchmarks (throughput and peak memory) and
+    concurrent build stress cases (shared makers, outputs compared).
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import filecmp
+import hashlib
+import json
+import logging
+import os
+import os.path
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import accumulate
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from .settings import resolve_template_paths
+from .sm_excel import SMExcel
+from .sm_rdm import SMDevolutionsRdm
+from .sm_scrt import SMSecureCrt
+from .sm_xml import XML_BACKEND_ENV, lxml_etree
+
+
+# ========================================
+# Class SMFleetGenerator
+# ========================================
+class SMFleetGenerator:
+    """SessionMaker synthetic fleet generator.
+
+    Generates deterministic (seeded) sessions with realistic folder depth
+    (region/site/role/rack), credential reuse (few credentials used by most
+    of the sessions) and session type mix (ssh/rdp/web).
+
+    Attributes:
+        Public:
+            sessions (int): Number of generated sessions.
+            seed (int): Random generator seed.
+
+        Private:
+            _settings (dict): Configuration file content.
+    """
+
+    REGIONS = ["emea", "amer", "apac", "latam", "anz", "mea"]
+    ROLES = ["core", "dist", "access", "dc", "fw", "lb", "wan", "oob"]
+    COLORSCHEMES = ["Chalkboard", "Traditional", "Solarized Dark", ""]
+    KEYWORDS = ["cisco-cli", "f5-cli", "junos-cli", ""]
+
+    # average number of sessions in one (leaf) folder
+    FOLDER_SIZE = 50
+
+    def __init__(self, sessions=1000, seed=1, settings=None):
+        self.sessions = sessions
+        self.seed = seed
+
+        self._settings = {}
+        if settings is not None:
+            self._settings = settings
+
+        # pools (credential reuse, firewall groups, RDM hosts)
+        self._credentials_count = max(5, sessions // 200)
+        self._firewalls_count = max(2, sessions // 2000)
+        self._hosts_count = max(2, sessions // 100)
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def _folders(self, rnd: random.Random) -> list:
+        """Return sorted list of leaf folders (list of path components).
+
+        Sorting keeps each subtree contiguous (depth-first order).
+        """
+        folders = set()
+        folders_count = max(1, self.sessions // self.FOLDER_SIZE)
+        sites = max(1, folders_count // (len(self.REGIONS) * len(self.ROLES)))
+
+        for idx in range(folders_count):
+            region = self.REGIONS[idx % len(self.REGIONS)]
+            site = "%s-site%03d" % (region, (idx // len(self.REGIONS)) % sites)
+            role = self.ROLES[(idx // (len(self.REGIONS) * sites)) % len(self.ROLES)]
+
+            depth = rnd.random()
+            if depth < 0.2:
+                folders.add((region, site))
+            elif depth < 0.8:
+                folders.add((region, site, role))
+            else:
+                folders.add((region, site, role, "rack%02d" % rnd.randrange(1, 10)))
+
+        return sorted(folders)
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def iter_sessions(self):
+        """Yield session rows (dict, keys from 'col_names_sessions')."""
+        rnd = random.Random(self.seed)
+        folders = self._folders(rnd)
+
+        # zipf-like credential reuse
+        cum_weights = list(
+            accumulate(1 / (idx + 1) for idx in range(self._credentials_count))
+        )
+        bastions = []
+
+        for idx in range(self.sessions):
+            folder = folders[idx * len(folders) // self.sessions]
+            folder_path = "/".join(folder)
+            role = folder[2] if len(folder) > 2 else "host"
+
+            choice = rnd.random()
+            if choice < 0.8:
+                session_type = "ssh"
+                port = "22" if rnd.random() < 0.9 else "2222"
+            elif choice < 0.95:
+                session_type = "rdp"
+                port = "3389"
+            else:
+                session_type = "web"
+                port = ""
+
+            address = "10.%d.%d.%d" % ((idx >> 16) & 255, (idx >> 8) & 255, idx & 255)
+            hostname = address if session_type != "web" else f"https://{address}/"
+            session = "%s-%06d" % (role, idx)
+
+            credential = rnd.choices(
+                range(self._credentials_count), cum_weights=cum_weights
+            )[0]
+            use_credential = rnd.random() < 0.7
+
+            firewall = ""
+            if session_type == "ssh":
+                choice = rnd.random()
+                if choice < 0.08:
+                    firewall = "fw-%03d" % rnd.randrange(self._firewalls_count)
+                elif choice < 0.1 and bastions:
+                    firewall = rnd.choice(bastions)
+                elif choice < 0.11:
+                    bastions.append(f"{folder_path}/{session}")
+
+            yield {
+                "folder": folder_path,
+                "session": session,
+                "type": session_type,
+                "hostname": hostname,
+                "port": port,
+                "username": "" if use_credential else "admin%d" % credential,
+                "rdp_alternate": "",
+                "rdm_credential": (
+                    "_credentials/cred-%04d" % credential if use_credential else ""
+                ),
+                "rdm_host": (
+                    "_hosts/host-%04d" % rnd.randrange(self._hosts_count)
+                    if session_type == "ssh" and rnd.random() < 0.05
+                    else ""
+                ),
+                "rdm_web_form": "loginform" if session_type == "web" else "",
+                "rdm_web_login": "username" if session_type == "web" else "",
+                "rdm_web_passwd": "passwd" if session_type == "web" else "",
+                "scrt_credential": "cred-%04d" % credential if use_credential else "",
+                "scrt_colorscheme": rnd.choice(self.COLORSCHEMES),
+                "scrt_keywords": rnd.choice(self.KEYWORDS),
+                "scrt_firewall": firewall,
+            }
+
+    def iter_credentials(self):
+        """Yield credential rows (SecureCRT and RDM credentials share the names)."""
+        for idx in range(self._credentials_count):
+            yield {
+                "folder": "_credentials",
+                "credential": "cred-%04d" % idx,
+                "username": "admin%d" % idx,
+            }
+
+    def iter_firewalls(self):
+        """Yield SecureCRT firewall group rows."""
+        for idx in range(self._firewalls_count):
+            yield {
+                "firewall": "fw-%03d" % idx,
+                "address": "192.0.2.%d" % (idx % 250 + 1),
+                "port": "22",
+                "username": "jump",
+            }
+
+    def iter_hosts(self):
+        """Yield RDM host rows."""
+        for idx in range(self._hosts_count):
+            yield {
+                "folder": "_hosts",
+                "name": "host-%04d" % idx,
+                "host": "172.16.%d.%d" % ((idx >> 8) & 255, idx & 255),
+                "rdm_vault": "_credentials/cred-0000",
+            }
+
+    def write_excel_book(self, excel_file: str) -> dict:
+        """Write synthetic sessions workbook (all worksheets).
+
+        Returns:
+            (dict): Number of written rows per sheet key.
+        """
+
+        def rows():
+            for row in self.iter_sessions():
+                yield "sessions", row
+            for row in self.iter_credentials():
+                yield "scrt_credentials", row
+                yield "rdm_credentials", row
+            for row in self.iter_firewalls():
+                yield "scrt_firewalls", row
+            for row in self.iter_hosts():
+                yield "rdm_hosts", row
+
+        excel_obj = SMExcel(settings=self._settings)
+        return excel_obj.write_excel_book_stream(
+            rows(),
+            excel_file=excel_file,
+            sheet_keys=[
+                "sessions",
+                "rdm_credentials",
+                "rdm_hosts",
+                "scrt_credentials",
+                "scrt_firewalls",
+            ],
+        )
+
+    def write_scrt_xml(self, xml_file: str) -> int:
+        """Write synthetic SecureCRT XML export (ssh sessions only).
+
+        Returns:
+            (int): Number of written sessions.
+        """
+        count = 0
+        dst = os.path.split(xml_file)
+        if dst[0] != "":
+            Path(dst[0]).mkdir(parents=True, exist_ok=True)
+
+        with open(xml_file, "w", encoding="utf8") as file:
+            file.write('<?xml version="1.0" encoding="UTF-8"?>\n<VanDyke version="3.0">\n')
+            file.write('\t<key name="Sessions">\n')
+
+            opened = []
+            for row in self.iter_sessions():
+                if row["type"] != "ssh":
+                    continue
+                folder = row["folder"].split("/")
+
+                # close/open folders to get to the session's folder
+                common = 0
+                while (
+                    common < len(opened)
+                    and common < len(folder)
+                    and opened[common] == folder[common]
+                ):
+                    common += 1
+                while len(opened) > common:
+                    opened.pop()
+                    file.write("\t" * (len(opened) + 2) + "</key>\n")
+                for name in folder[common:]:
+                    file.write(
+                        "\t" * (len(opened) + 2) + "<key name=%s>\n" % quoteattr(name)
+                    )
+                    opened.append(name)
+
+                firewall = row["scrt_firewall"]
+                if "/" in firewall:
+                    firewall = "Session:" + firewall
+                indent = "\t" * (len(opened) + 3)
+                file.write(
+                    "\t" * (len(opened) + 2)
+                    + "<key name=%s>\n" % quoteattr(row["session"])
+                )
+                for tag, name, value in [
+                    ("string", "Hostname", row["hostname"]),
+                    ("dword", "[SSH2] Port", row["port"]),
+                    ("string", "Username", row["username"]),
+                    ("string", "Credential Title", row["scrt_credential"]),
+                    ("string", "Keyword Set", row["scrt_keywords"]),
+                    ("string", "Color Scheme", row["scrt_colorscheme"]),
+                    ("string", "Firewall Name", firewall or "None"),
+                    ("string", "SSH2 Authentications V2", "keyboard-interactive,password"),
+                    ("string", "Cipher List", "aes256-ctr,aes256-cbc"),
+                ]:
+                    file.write(
+                        '%s<%s name=%s>%s</%s>\n'
+                        % (indent, tag, quoteattr(name), escape(value), tag)
+                    )
+                file.write("\t" * (len(opened) + 2) + "</key>\n")
+                count += 1
+
+            while opened:
+                opened.pop()
+                file.write("\t" * (len(opened) + 2) + "</key>\n")
+            file.write("\t</key>\n")
+
+            file.write('\t<key name="Credentials">\n')
+            for row in self.iter_credentials():
+                file.write(
+                    '\t\t<key name=%s>\n\t\t\t<string name="Username">%s</string>\n\t\t</key>\n'
+                    % (quoteattr(row["credential"]), escape(row["username"]))
+                )
+            file.write("\t</key>\n")
+
+            file.write('\t<key name="Firewalls">\n')
+            for row in self.iter_firewalls():
+                file.write("\t\t<key name=%s>\n" % quoteattr(row["firewall"]))
+                file.write(
+                    '\t\t\t<string name="Firewall Address">%s</string>\n'
+                    '\t\t\t<dword name="Firewall Port">%s</dword>\n'
+                    '\t\t\t<string name="Firewall User">%s</string>\n'
+                    % (escape(row["address"]), row["port"], escape(row["username"]))
+                )
+                file.write("\t\t</key>\n")
+            file.write("\t</key>\n</VanDyke>\n")
+
+        return count
+
+    def write_rdm_json(self, json_file: str) -> int:
+        """Write synthetic Devolutions RDM JSON export (all session types, credentials and hosts).
+
+        Returns:
+            (int): Number of written ssh sessions.
+        """
+        count = 0
+        dst = os.path.split(json_file)
+        if dst[0] != "":
+            Path(dst[0]).mkdir(parents=True, exist_ok=True)
+
+        def rows():
+            nonlocal count
+            for row in self.iter_credentials():
+                yield "rdm_credentials", row
+            for row in self.iter_hosts():
+                yield "rdm_hosts", row
+            for row in self.iter_sessions():
+                count += row["type"] == "ssh"
+                yield "sessions", row
+
+        sm_rdm = SMDevolutionsRdm(settings=self._settings)
+        sm_rdm.set_stable_ids()
+        sm_rdm.write_json_stream(rows(), json_file)
+
+        return count
+
+    def write_scrt_ini(self, ini_folder: str) -> int:
+        """Write synthetic SecureCRT Config folder (one .ini file per ssh session, credential, firewall).
+
+        Settings are the same as in write_scrt_xml().
+
+        Returns:
+            (int): Number of written files.
+        """
+        count = 0
+
+        def write(path: list, lines: list):
+            folder = os.path.join(ini_folder, *path[:-1])
+            Path(folder).mkdir(parents=True, exist_ok=True)
+            with open(os.path.join(folder, path[-1] + ".ini"), "w", encoding="utf8") as file:
+                file.write("\n".join(lines) + "\n")
+
+        for row in self.iter_sessions():
+            if row["type"] != "ssh":
+                continue
+            firewall = row["scrt_firewall"]
+            if "/" in firewall:
+                firewall = "Session:" + firewall
+            write(
+                ["Sessions"] + row["folder"].split("/") + [row["session"]],
+                [
+                    'S:"Hostname"=%s' % row["hostname"],
+                    'D:"[SSH2] Port"=%08x' % int(row["port"]),
+                    'S:"Username"=%s' % row["username"],
+                    'S:"Credential Title"=%s' % row["scrt_credential"],
+                    'S:"Keyword Set"=%s' % row["scrt_keywords"],
+                    'S:"Color Scheme"=%s' % row["scrt_colorscheme"],
+                    'S:"Firewall Name"=%s' % (firewall or "None"),
+                    'S:"SSH2 Authentications V2"=keyboard-interactive,password',
+                    'S:"Cipher List"=aes256-ctr,aes256-cbc',
+                ],
+            )
+            count += 1
+
+        for row in self.iter_credentials():
+            write(["Credentials", row["credential"]], ['S:"Username"=%s' % row["username"]])
+            count += 1
+
+        for row in self.iter_firewalls():
+            write(
+                ["Firewalls", row["firewall"]],
+                [
+                    'S:"Firewall Address"=%s' % row["address"],
+                    'D:"Firewall Port"=%08x' % int(row["port"]),
+                    'S:"Firewall User"=%s' % row["username"],
+                ],
+            )
+            count += 1
+
+        return count
+
+
+# ========================================
+# Class SMBenchmark
+# ========================================
+class SMBenchmark:
+    """SessionMaker end-to-end benchmark.
+
+    Every case runs as a separate process (the same way as users run it), wall time
+    and peak RSS of the process are recorded.
+
+    Attributes:
+        Public:
+            data_dir (str): Folder for generated fixtures and outputs.
+            config_file (str): Configuration file passed to the scripts.
+            timeout (float): Case timeout in seconds (None = no timeout).
+
+        Private:
+            _settings (dict): Configuration file content.
+            _root (str): SessionMaker folder (scripts location).
+    """
+
+    # case: (script, source, destination, extra arguments)
+    CASES = {
+        "excel-scrt": ("session_maker.py", "xlsx", "scrt.xml", ["--type", "scrt"]),
+        "excel-rdm": ("session_maker.py", "xlsx", "rdm.json", ["--type", "rdm"]),
+        "scrt-excel": ("session_reader.py", "scrt", "scrt.xlsx", []),
+        "scrt-excel-stream": ("session_reader.py", "scrt", "stream.xlsx", ["--stream"]),
+        "excel-scrt-parallel": (
+            "session_maker.py",
+            "xlsx",
+            "scrt-parallel.xml",
+            ["--type", "scrt", "--parallel"],
+        ),
+        "excel-scrt-compiled": (
+            "session_maker.py",
+            "xlsx",
+            "scrt-compiled.xml",
+            ["--type", "scrt", "--compiled"],
+        ),
+        "scrt-excel-lxml": ("session_reader.py", "scrt", "scrt-lxml.xlsx", []),
+        "scrt-excel-stream-lxml": ("session_reader.py", "scrt", "stream-lxml.xlsx", ["--stream"]),
+        "ini-excel": ("session_reader.py", "ini", "ini.xlsx", []),
+        "scrt-rdm": ("session_convert.py", "scrt", "convert-rdm.json", []),
+        "rdm-scrt": ("session_convert.py", "rdm", "convert-scrt.xml", []),
+    }
+
+    # case: reference case (output must be identical, speedup is recorded)
+    REFERENCE_CASES = {
+        "excel-scrt-parallel": "excel-scrt",
+        "excel-scrt-compiled": "excel-scrt",
+        "scrt-excel-lxml": "scrt-excel",
+        "scrt-excel-stream-lxml": "scrt-excel-stream",
+    }
+
+    # case: XML backend (SESSIONMAKER_XML_BACKEND), XML readers are pinned
+    CASE_XML_BACKENDS = {
+        "scrt-excel": "etree",
+        "scrt-excel-stream": "etree",
+        "scrt-excel-lxml": "lxml",
+        "scrt-excel-stream-lxml": "lxml",
+    }
+
+    # in-process case: (source, number of variant inputs)
+    # variants are built concurrently (threads) by one shared maker per
+    # target, every output is compared with the build of a fresh maker
+    THREAD_CASES = {
+        "build-threads": ("xlsx", 4),
+    }
+
+    # Excel book parts with build time (not compared)
+    EXCEL_VOLATILE_PARTS = ("docProps/core.xml",)
+
+    def __init__(self, settings=None, data_dir="data/BENCH", config_file="config.yaml", **kwargs):
+        self._settings = {}
+        if settings is not None:
+            self._settings = settings
+
+        self._root = kwargs.get("root", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.data_dir = data_dir
+        self.config_file = os.path.abspath(config_file)
+        self.timeout = kwargs.get("timeout", None)
+        self.seed = kwargs.get("seed", 1)
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def _fixture(self, kind: str, size: int) -> tuple:
+        """Return fixture file path and number of rows.
+
+        Stored fixture is reused when it was generated with the same seed and
+        configuration (meta file), otherwise it is generated again.
+        """
+        generator = SMFleetGenerator(sessions=size, seed=self.seed, settings=self._settings)
+        meta_file = os.path.join(self.data_dir, f"fleet-{size}-{kind}.json")
+
+        if kind == "xlsx":
+            fixture = os.path.join(self.data_dir, f"fleet-{size}.xlsx")
+        elif kind == "ini":
+            # Config folder, rows = number of .ini files
+            fixture = os.path.join(self.data_dir, f"fleet-{size}-scrt-ini")
+        elif kind == "rdm":
+            # rows = number of ssh sessions
+            fixture = os.path.join(self.data_dir, f"fleet-{size}-rdm-export.json")
+        else:
+            fixture = os.path.join(self.data_dir, f"fleet-{size}-scrt.xml")
+
+        meta = {"seed": self.seed, "config": self._get_config_digest()}
+        if os.path.exists(fixture) and os.path.isfile(meta_file):
+            with open(meta_file, "r", encoding="utf8") as file:
+                stored = json.load(file)
+            if all(stored.get(key) == value for key, value in meta.items()):
+                return fixture, stored["rows"]
+            logging.info("Fixture '%s' was generated with other seed or configuration.", fixture)
+
+        logging.info("Generating fixture '%s' (%d sessions)...", fixture, size)
+        Path(self.data_dir).mkdir(parents=True, exist_ok=True)
+        if os.path.isdir(fixture):
+            # Config folder of other seed (files are not overwritten only)
+            shutil.rmtree(fixture)
+        if kind == "xlsx":
+            rows = generator.write_excel_book(fixture)["sessions"]
+        elif kind == "ini":
+            rows = generator.write_scrt_ini(fixture)
+        elif kind == "rdm":
+            rows = generator.write_rdm_json(fixture)
+        else:
+            rows = generator.write_scrt_xml(fixture)
+
+        with open(meta_file, "w", encoding="utf8") as file:
+            json.dump({"rows": rows, **meta}, file)
+
+        return fixture, rows
+
+    def _get_config_digest(self) -> str:
+        """Return digest of the configuration (generated sheets and columns depend on it)."""
+        content = json.dumps(self._settings, sort_keys=True, default=str)
+        return hashlib.sha1(content.encode("utf8")).hexdigest()
+
+    def _run_process(self, command: list, env: dict | None = None) -> tuple:
+        """Run command, return (status, wall time, peak RSS of the process in KiB).
+
+        Args:
+            command (list): Command and arguments
+            env (dict, optional): Additional environment variables
+        """
+        if env:
+            env = {**os.environ, **env}
+        with tempfile.TemporaryFile() as stderr:
+            start = time.perf_counter()
+            proc = subprocess.Popen(
+                command, cwd=self._root, stdout=subprocess.DEVNULL, stderr=stderr, env=env
+            )
+            timer = None
+            if self.timeout is not None:
+                timer = threading.Timer(self.timeout, proc.kill)
+                timer.start()
+
+            # wait4() returns resource usage of the given process only
+            _, wait_status, rusage = os.wait4(proc.pid, 0)
+            seconds = time.perf_counter() - start
+            proc.returncode = os.waitstatus_to_exitcode(wait_status)
+
+            status = "ok"
+            if timer is not None:
+                if not timer.is_alive():
+                    status = "timeout"
+                timer.cancel()
+            if status == "ok" and proc.returncode != 0:
+                status = "error"
+                stderr.seek(0)
+                logging.error("Command '%s' failed.", " ".join(command))
+                logging.error("%s", stderr.read().decode("utf8", "replace").strip())
+
+        return status, seconds, rusage.ru_maxrss
+
+    def _is_same_output(self, file1: str, file2: str) -> bool:
+        """Return True if outputs are identical (Excel books: all parts but build time)."""
+        if not (zipfile.is_zipfile(file1) and zipfile.is_zipfile(file2)):
+            return filecmp.cmp(file1, file2, shallow=False)
+
+        with zipfile.ZipFile(file1) as book1, zipfile.ZipFile(file2) as book2:
+            names = [name for name in book1.namelist() if name not in self.EXCEL_VOLATILE_PARTS]
+            if names != [name for name in book2.namelist() if name not in self.EXCEL_VOLATILE_PARTS]:
+                return False
+            return all(book1.read(name) == book2.read(name) for name in names)
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def get_commit(self) -> str:
+        """Return current git commit (short hash) or 'unknown'."""
+        try:
+            return (
+                subprocess.check_output(
+                    ["git", "rev-parse", "--short", "HEAD"],
+                    cwd=self._root,
+                    stderr=subprocess.DEVNULL,
+                )
+                .decode("utf8")
+                .strip()
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return "unknown"
+
+    def run_thread_case(self, case: str, size: int) -> dict:
+        """Run concurrent build stress case and return result record.
+
+        Sessions of the workbook are split into variants (row index modulo
+        number of variants). SecureCRT (element and compiled build) and RDM
+        builds of all variants run concurrently on one shared maker per
+        target (per-call sources, every build twice, all threads start
+        together), outputs must be byte-identical to the builds of fresh
+        makers, otherwise status is 'error'. Template paths are resolved
+        against SessionMaker folder (the same as the process cases). Peak
+        RSS is not recorded (in-process case).
+
+        Args:
+            case (str): Case name (see THREAD_CASES)
+            size (int): Number of sessions in generated fleet
+        """
+        source, count = self.THREAD_CASES[case]
+        src_file, rows = self._fixture(source, size)
+        settings = resolve_template_paths(self._settings, self._root)
+        excel = settings["excel"]
+
+        sm_scrt = SMSecureCrt(settings=settings)
+        sm_scrt.set_excel_file(src_file, True)
+        sm_scrt.excel_read_sheet_sessions(excel["tab_sessions"])
+        sm_scrt.excel_read_sheet_credentials(excel["tab_scrt_credentials"])
+        sm_scrt.excel_read_sheet_firewalls(excel["tab_scrt_firewalls"])
+
+        sm_rdm = SMDevolutionsRdm(settings=settings)
+        sm_rdm.set_stable_ids()
+        sm_rdm.set_excel_file(src_file, True)
+        sm_rdm.excel_read_sheet_sessions(excel["tab_sessions"])
+        sm_rdm.excel_read_sheet_credentials(excel["tab_rdm_credentials"])
+        sm_rdm.excel_read_sheet_rdm_hosts(excel["tab_rdm_hosts"])
+
+        # sessions columns differ by target
+        variants = {
+            target: [
+                {key: column[idx::count] for key, column in maker.get_sessions_dict().items()}
+                for idx in range(count)
+            ]
+            for target, maker in (("scrt", sm_scrt), ("rdm", sm_rdm))
+        }
+        scrt_sources = {
+            "credentials_dict": sm_scrt.get_credentials_dict(),
+            "firewalls_dict": sm_scrt.get_firewalls_dict(),
+        }
+        rdm_sources = {
+            "credentials_dict": sm_rdm.get_credentials_dict(),
+            "hosts_dict": sm_rdm.get_rdm_hosts_dict(),
+        }
+
+        def build(maker, target: str, barrier=None, **kwargs) -> bytes:
+            if barrier is not None:
+                # all builds start together (overlapping builds on shared makers)
+                barrier.wait()
+            if target == "scrt":
+                return maker.xml_to_bytes(xml_element=maker.build_xml_from_dict(**kwargs))
+            if target == "scrt-compiled":
+                return maker.build_xml_bytes_compiled(**kwargs)
+            return maker.json_to_bytes(json_content=maker.build_json_from_dict(**kwargs))
+
+        # references (fresh maker per variant and target, object's dicts)
+        logging.info("Running case '%s' (%d sessions, %d variants)...", case, size, count)
+        jobs = []
+        references = {}
+        for idx in range(count):
+            for target in ("scrt", "scrt-compiled", "rdm"):
+                variant = variants[target.split("-")[0]][idx]
+                if target == "rdm":
+                    maker = SMDevolutionsRdm(settings=settings)
+                    maker.set_stable_ids()
+                    maker.set_credentials_dict(rdm_sources["credentials_dict"])
+                    maker.set_hosts_dict(rdm_sources["hosts_dict"])
+                    jobs.append((sm_rdm, target, {"sessions_dict": variant, **rdm_sources}))
+                else:
+                    maker = SMSecureCrt(
+                        settings=settings,
+                        credentials=scrt_sources["credentials_dict"],
+                        firewalls=scrt_sources["firewalls_dict"],
+                    )
+                    jobs.append((sm_scrt, target, {"sessions_dict": variant, **scrt_sources}))
+                maker.set_sessions_dict(variant)
+                references[(idx, target)] = build(maker, target)
+
+        # concurrent builds (shared makers, every job twice, one thread per build)
+        threads = len(jobs) * 2
+        barrier = threading.Barrier(threads)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            start = time.perf_counter()
+            futures = [
+                ((idx // 3, target), executor.submit(build, maker, target, barrier, **kwargs))
+                for _ in range(2)
+                for idx, (maker, target, kwargs) in enumerate(jobs)
+            ]
+            outputs = [(key, future.result()) for key, future in futures]
+            seconds = time.perf_counter() - start
+
+        # byte-for-byte parity with the fresh maker builds
+        differs = sorted({key for key, output in outputs if output != references[key]})
+        for idx, target in differs:
+            logging.error(
+                "Concurrent '%s' build of variant %d differs (case '%s', %d sessions).",
+                target,
+                idx,
+                case,
+                size,
+            )
+        status = "error" if differs else "ok"
+
+        rows_per_sec = None
+        if status == "ok":
+            rows_per_sec = round(rows * len(outputs) / 3 / count / seconds, 1)
+
+        result = {
+            "case": case,
+            "sessions": size,
+            "rows": rows,
+            "status": status,
+            "seconds": round(seconds, 4),
+            "rows_per_sec": rows_per_sec,
+            "peak_rss_kb": None,
+            "xml_backend": None,
+            "output": None,
+            "threads": threads,
+            "identical": not differs,
+        }
+        logging.info("Done. %s", result)
+
+        return result
+
+    def run_case(self, case: str, size: int) -> dict:
+        """Run one benchmark case and return result record.
+
+        Args:
+            case (str): Case name (see CASES and THREAD_CASES)
+            size (int): Number of sessions in generated fleet
+        """
+        if case in self.THREAD_CASES:
+            return self.run_thread_case(case, size)
+
+        script, source, destination, extra_args = self.CASES[case]
+        src_file, rows = self._fixture(source, size)
+        dst_file = os.path.join(self.data_dir, "out", f"fleet-{size}-{destination}")
+        Path(os.path.dirname(dst_file)).mkdir(parents=True, exist_ok=True)
+
+        command = [sys.executable, os.path.join(self._root, script)]
+        command += [os.path.abspath(src_file), "-w", os.path.abspath(dst_file)]
+        command += ["--config", self.config_file, "-q"] + extra_args
+
+        env = None
+        xml_backend = self.CASE_XML_BACKENDS.get(case)
+        if xml_backend is not None:
+            env = {XML_BACKEND_ENV: xml_backend}
+
+        if xml_backend == "lxml" and lxml_etree is None:
+            if os.environ.get(XML_BACKEND_ENV, "").strip().lower() == "lxml":
+                # lxml requested explicitly, parity must not pass unverified
+                logging.error("Case '%s' failed, lxml is requested but not installed.", case)
+                status = "error"
+            else:
+                logging.warning("Case '%s' skipped, lxml is not installed.", case)
+                status = "skipped"
+            seconds, peak_rss = 0.0, None
+        else:
+            logging.info("Running case '%s' (%d sessions)...", case, size)
+            status, seconds, peak_rss = self._run_process(command, env)
+
+        result = {
+            "case": case,
+            "sessions": size,
+            "rows": rows,
+            "status": status,
+            "seconds": round(seconds, 4),
+            "rows_per_sec": round(rows / seconds, 1) if status == "ok" else None,
+            "peak_rss_kb": peak_rss,
+            "xml_backend": xml_backend,
+            "output": dst_file,
+        }
+        logging.info("Done. %s", result)
+
+        return result
+
+    def run(self, cases: list, sizes: list, on_result=None) -> dict:
+        """Run all cases for all sizes.
+
+        Args:
+            cases (list): Case names
+            sizes (list): Fleet sizes (number of sessions)
+            on_result (callable, optional): Called with every result record.
+
+        Returns:
+            (dict): Machine-readable results (environment and result records).
+        """
+        results = {
+            "commit": self.get_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": self.seed,
+            "results": [],
+        }
+
+        for size in sizes:
+            size_results = {}
+            for case in cases:
+                result = self.run_case(case, size)
+                self.check_reference(result, size_results.get(self.REFERENCE_CASES.get(case)))
+                size_results[case] = result
+                results["results"].append(result)
+                if on_result is not None:
+                    on_result(result)
+
+        return results
+
+    def check_reference(self, result: dict, reference: dict | None) -> None:
+        """Compare case result with its reference case result (same fleet size).
+
+        Sets 'reference', 'reference_speedup' and 'identical' (outputs are
+        byte-identical, Excel books without build time) of the result record.
+
+        Args:
+            result (dict): Case result record
+            reference (dict, optional): Reference case result record (None = not run)
+        """
+        if reference is None or result["status"] != "ok" or reference["status"] != "ok":
+            return
+
+        result["reference"] = reference["case"]
+        result["reference_speedup"] = round(reference["seconds"] / result["seconds"], 2)
+        result["identical"] = self._is_same_output(result["output"], reference["output"])
+        if not result["identical"]:
+            logging.error(
+                "Output of case '%s' differs from '%s' (%d sessions).",
+                result["case"],
+                reference["case"],
+                result["sessions"],
+            )
+
+    def compare(self, results: dict, baseline: dict) -> list:
+        """Compare results with baseline results (both from run()).
+
+        Returns:
+            (list): Records (case, sessions, baseline seconds, seconds, speedup).
+        """
+        baseline_index = {
+            (record["case"], record["sessions"]): record
+            for record in baseline.get("results", [])
+        }
+
+        ret_list = []
+        for record in results["results"]:
+            old = baseline_index.get((record["case"], record["sessions"]))
+            if old is None or old["status"] != "ok" or record["status"] != "ok":
+                continue
+            ret_list.append(
+                {
+                    "case": record["case"],
+                    "sessions": record["sessions"],
+                    "baseline_seconds": old["seconds"],
+                    "seconds": record["seconds"],
+                    "speedup": round(old["seconds"] / record["seconds"], 2),
+                }
+            )
+
+        return ret_list
+
+    def write_results(self, results: dict, results_file: str) -> None:
+        """Write results to JSON file."""
+        dst = os.path.split(results_file)
+        if dst[0] != "":
+            Path(dst[0]).mkdir(parents=True, exist_ok=True)
+
+        with open(results_file, "w", encoding="utf8") as file:
+            json.dump(results, file, indent=4)
@@ -6,6 +6,7 @@ from pathlib import Path
 import xml.etree.ElementTree as ET
 import xmltodict
 
+from .sm_columns import SMColumns
 from .sm_excel import SMExcel
 from .sm_xml import SMXml
 from .sm_json import SMJson
@@ -171,10 +172,8 @@ class SessionMaker:
         """
         self.json_file = json_file
 
-        # TODO
-        # if self.json_file != "" and read_json_file:
-        #     # self._xml_obj = SMXml(xml_file=self.xml_file, read_xml_file=True)
-        #     self.parse_json_file()
+        # JSON content is not read at once, readers iterate the file
+        # incrementally (e.g. SMDevolutionsRdm.iter_rows_from_json())
 
     def set_xml_file(self, xml_file: str|None, read_xml_file=False):
         """Set XML file attribute. If xml_file is not empty, initialize self._xml_obj (read content).
@@ -191,6 +190,9 @@ class SessionMaker:
     def set_sessions_dict(self, sessions=None) -> bool:
         """Set sessions dictionary. If not set initiate it.
 
+        Columns are normalized (see SMColumns.normalize_sessions()): port,
+        type, hostname and folder values are canonical for all targets.
+
         Args:
             sessions (dict): Sessions ordered dictionary
 
@@ -215,10 +217,13 @@ class SessionMaker:
                 if key in keys:
                     self._sessions_dict[key] = []
         else:
+            columns = SMColumns().normalize_sessions(
+                {key: sessions[key] for key in keys if key in sessions}
+            )
             for key in excel_col_name:
                 if key in keys:
                     try:
-                        self._sessions_dict[key] = list(map(str, sessions[key]))
+                        self._sessions_dict[key] = columns[key]
                     except KeyError:
                         logging.warning(
                             "Missing column name '%s' (key: '%s').",
@@ -272,6 +277,42 @@ class SessionMaker:
 
         return False
 
+    def excel_read_book_content(self, content: bytes, file_type="xlsx") -> bool:
+        """Read workbook from memory (instead of excel_file).
+
+        Args:
+            content (bytes): Excel book file content
+            file_type (str, optional): Excel book file type. Default: "xlsx".
+
+        Returns:
+            True: When success
+            False: If not
+        """
+        self._excel_obj = SMExcel(settings=self._settings, read_excel_file=False)
+        return self._excel_obj.read_excel_book_content(content, file_type)
+
+    def excel_read_sheets(self, sheet_names: list) -> bool:
+        """Re-read defined sheets of excel_file workbook (keep other sheets).
+
+        Args:
+            sheet_names (list): Sheets names
+
+        Returns:
+            True: When success
+            False: If not
+        """
+        return self._excel_obj.read_excel_sheets(sheet_names)
+
+    def excel_get_book_signature(self) -> dict | None:
+        """Return excel_file workbook signature (see SMExcel.get_book_signature)."""
+        return self._excel_obj.get_book_signature()
+
+    def excel_get_changed_sheets(
+        self, old_signature: dict | None, new_signature: dict | None
+    ) -> list | None:
+        """Return list of sheets changed between workbook signatures (None = unknown)."""
+        return self._excel_obj.get_changed_sheets(old_signature, new_signature)
+
     def excel_read_sheet(self, sheet_name: str, type="column") -> dict | list | bool:
         """Read excel sheet and return content as dict/array.
 
@@ -336,7 +377,10 @@ class SessionMaker:
 
         Args:
             xml_element (ET.Element, optional): XML object.
+            xml_bytes (bytes, optional): Serialized XML content (written instead of xml_element).
             xml_file (str, optional): Destination file. If not set, use self.xml_file.
+            atomic (bool, optional): Replace destination file atomically. Default: False.
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
         """
 
         xml_element = kwargs.get("xml_element", self._xml_sessions)
@@ -347,7 +391,22 @@ class SessionMaker:
         else:
             dst_file = self.xml_file
 
-        self._xml_obj.write_xml_file(xml_element=xml_element, xml_file=dst_file)
+        self._xml_obj.write_xml_file(
+            xml_element=xml_element,
+            xml_bytes=kwargs.get("xml_bytes", None),
+            xml_file=dst_file,
+            atomic=kwargs.get("atomic", False),
+            compression=kwargs.get("compression", None),
+        )
+
+    def xml_to_bytes(self, **kwargs) -> bytes | None:
+        """Return XML Element as bytes (the same content as written to file).
+
+        Args:
+            xml_element (ET.Element, optional): XML object.
+        """
+        xml_element = kwargs.get("xml_element", self._xml_sessions)
+        return self._xml_obj.xml_to_bytes(xml_element=xml_element)
 
     # ====================
     # JSON methods
@@ -370,6 +429,8 @@ class SessionMaker:
         Args:
             json_content (, optional): JSON object.
             json_file (str, optional): Destination file. If not set, use self.xml_file.
+            atomic (bool, optional): Replace destination file atomically. Default: False.
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
         """
 
         json_content = kwargs.get("json_content", self._json_sessions)
@@ -380,7 +441,21 @@ class SessionMaker:
         else:
             dst_file = self.json_file
 
-        self._json_obj.write_json_file(json_content=json_content, json_file=dst_file)
+        self._json_obj.write_json_file(
+            json_content=json_content,
+            json_file=dst_file,
+            atomic=kwargs.get("atomic", False),
+            compression=kwargs.get("compression", None),
+        )
+
+    def json_to_bytes(self, **kwargs) -> bytes:
+        """Return JSON as bytes (the same content as written to file).
+
+        Args:
+            json_content (, optional): JSON object.
+        """
+        json_content = kwargs.get("json_content", self._json_sessions)
+        return self._json_obj.json_to_bytes(json_content)
 
     # ====================
     # general methods
@@ -0,0 +1,235 @@
+"""SessionMaker columns module
+
+Class - SMColumns:
+    Typed normalization of sessions sheet columns. Whole columns are
+    converted at once (unique values normalized once, NumPy arrays used
+    when installed): port to validated number, type to known session type,
+    hostname trimmed and lower-cased (host part of web session URL only),
+    folder separators canonicalized.
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import logging
+import re
+
+try:
+    import numpy
+except ImportError:  # optional, array-backed columns
+    numpy = None
+
+
+# ========================================
+# Class SMColumns
+# ========================================
+class SMColumns:
+    """Sessions columns normalization (Excel cells -> clean string columns).
+
+    Excel cells arrive as int, float or str (depending on the reader and the
+    cell format), e.g. port 22 may be 22, 22.0 or '22.0'. Normalized columns
+    are string columns (the sessions dict format used by all targets) with
+    canonical values:
+
+        port: integer ('22.0' -> '22'), empty if not set
+        type: trimmed and lower-cased ('SSH ' -> 'ssh')
+        hostname: trimmed and lower-cased; web session URL ('/', '?' or '#'
+            in the value) keeps the case of userinfo, path, query and fragment
+            ('https://Portal.example.com/Admin' -> 'https://portal.example.com/Admin')
+        folder: '/' separated names without empty parts ('a\\\\b//c/' -> 'a/b/c')
+
+    Invalid values (port out of 1-65535 or not a number, unknown session
+    type) are kept (trimmed) and counted, so the validation reports them.
+    Other columns are converted to string only (str()).
+
+    Typed columns (port numbers, session type codes) of the last
+    normalization are available by get_typed_columns().
+
+    Attributes:
+        Public:
+            use_numpy (bool): Use NumPy arrays (when installed)
+
+        Private:
+            _typed (dict): Typed columns of the last normalization
+            _stats (dict): Changed and invalid values of the last normalization
+    """
+
+    SESSION_TYPES = ("ssh", "rdp", "web")
+    PORT_RANGE = (1, 65535)
+
+    # folder separators (with surrounding whitespace)
+    FOLDER_SEPARATOR_RE = re.compile(r"\s*[/\\]+\s*")
+
+    # URL: scheme, userinfo, host (and port), path/query/fragment
+    URL_RE = re.compile(r"^([A-Za-z][A-Za-z0-9+.-]*://)?([^/?#@]*@)?([^/?#]*)(.*)$", re.DOTALL)
+
+    def __init__(self, use_numpy: bool | None = None):
+        """Initial method
+
+        Args:
+            use_numpy (bool, optional): Use NumPy arrays. Default: None (when installed).
+        """
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy and numpy is not None
+        self._typed = {}
+        self._stats = {}
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def __get_port(self, value: str) -> tuple:
+        """Return (normalized value, port number) of the port cell (number 0 = empty or invalid)."""
+        value = value.strip()
+        if value == "":
+            return "", 0
+
+        try:
+            number = int(value)
+        except ValueError:
+            try:
+                number = float(value)
+            except ValueError:
+                return value, 0
+            if not number.is_integer():
+                return value, 0
+            number = int(number)
+
+        if not self.PORT_RANGE[0] <= number <= self.PORT_RANGE[1]:
+            return str(number), 0
+        return str(number), number
+
+    def __get_type(self, value: str) -> tuple:
+        """Return (normalized value, type code) of the type cell (code -1 = empty or unknown)."""
+        value = value.strip().lower()
+        if value in self.SESSION_TYPES:
+            return value, self.SESSION_TYPES.index(value)
+        return value, -1
+
+    def __get_folder(self, value: str) -> tuple:
+        """Return (normalized value, None) of the folder cell."""
+        return self.FOLDER_SEPARATOR_RE.sub("/", value.strip()).strip("/"), None
+
+    def __map_unique(self, column: list, get_value) -> tuple:
+        """Normalize unique values of the column once, return (values, typed values).
+
+        Low cardinality columns (port, type, folder) have much less unique
+        values than rows.
+        """
+        if self.use_numpy:
+            uniques, inverse = numpy.unique(numpy.array(column, dtype=str), return_inverse=True)
+            pairs = [get_value(str(value)) for value in uniques]
+            values = numpy.array([pair[0] for pair in pairs], dtype=object)[inverse]
+            typed = numpy.array([pair[1] for pair in pairs], dtype=object)[inverse]
+            return values.tolist(), typed
+
+        cache = {}
+        values = []
+        typed = []
+        for value in column:
+            pair = cache.get(value)
+            if pair is None:
+                pair = cache[value] = get_value(value)
+            values.append(pair[0])
+            typed.append(pair[1])
+        return values, typed
+
+    def __get_url(self, value: str) -> str:
+        """Return URL with lower-cased scheme and host (path, query and userinfo are case-sensitive)."""
+        scheme, userinfo, host, rest = self.URL_RE.match(value).groups()
+        return (scheme or "").lower() + (userinfo or "") + host.lower() + rest
+
+    def __get_hostnames(self, column: list) -> list:
+        """Return trimmed and lower-cased hostname column (host part only of URLs)."""
+        if self.use_numpy and column:
+            stripped = numpy.char.strip(numpy.array(column, dtype=str))
+            values = numpy.char.lower(stripped).tolist()
+            stripped = stripped.tolist()
+        else:
+            stripped = [value.strip() for value in column]
+            values = [value.lower() for value in stripped]
+
+        # web sessions keep URL in the hostname column
+        for idx, value in enumerate(stripped):
+            if "/" in value or "?" in value or "#" in value:
+                values[idx] = self.__get_url(value)
+        return values
+
+    def __get_array(self, values, dtype: str):
+        """Return typed column as NumPy array (when used) or list of int."""
+        if self.use_numpy:
+            return numpy.asarray(values, dtype=dtype)
+        return list(values)
+
+    def __count(self, key: str, old: list, new: list, invalid: int = 0):
+        """Record changed and invalid values of the column."""
+        changed = sum(map(str.__ne__, old, new))
+        self._stats[key] = {"changed": changed, "invalid": invalid}
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def normalize_sessions(self, sessions: dict) -> dict:
+        """Return sessions dict with normalized string columns.
+
+        Args:
+            sessions (dict): Sessions dict (column based, keys of col_names_sessions)
+
+        Returns:
+            (dict): The same keys, string columns (normalized port, type, hostname, folder)
+        """
+        self._typed = {}
+        self._stats = {}
+        normalized = {}
+
+        for key, column in sessions.items():
+            column = list(map(str, column))
+            if key == "port":
+                values, typed = self.__map_unique(column, self.__get_port)
+                invalid = sum(1 for value, number in zip(values, typed) if value != "" and number == 0)
+                self._typed["port"] = self.__get_array(typed, "int32")
+                self.__count(key, column, values, invalid)
+            elif key == "type":
+                values, typed = self.__map_unique(column, self.__get_type)
+                invalid = sum(1 for value, code in zip(values, typed) if value != "" and code == -1)
+                self._typed["type"] = self.__get_array(typed, "int8")
+                self.__count(key, column, values, invalid)
+            elif key == "folder":
+                values = self.__map_unique(column, self.__get_folder)[0]
+                self.__count(key, column, values)
+            elif key == "hostname":
+                values = self.__get_hostnames(column)
+                self.__count(key, column, values)
+            else:
+                values = column
+            normalized[key] = values
+
+        for key, stats in self._stats.items():
+            if stats["changed"] or stats["invalid"]:
+                logging.info(
+                    "Column '%s' normalized: %d value(s) changed, %d invalid.",
+                    key,
+                    stats["changed"],
+                    stats["invalid"],
+                )
+
+        return normalized
+
+    def get_typed_columns(self) -> dict:
+        """Return typed columns of the last normalize_sessions().
+
+        Returns:
+            (dict): 'port': port numbers (0 = empty or invalid),
+                'type': index to SESSION_TYPES (-1 = empty or unknown).
+                NumPy arrays (when used) or lists of int.
+        """
+        return self._typed
+
+    def get_stats(self) -> dict:
+        """Return changed and invalid values per normalized column of the last normalize_sessions()."""
+        return self._stats
@@ -0,0 +1,275 @@
+"""SessionMaker conversion module
+
+Class - SMSessionConvert:
+    Direct conversion between SecureCRT XML export and Devolutions RDM JSON
+    (no Excel book), both directions. Source is parsed incrementally and
+    sessions are written as they come, so memory does not grow with the
+    number of sessions.
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import logging
+import os.path
+from pathlib import Path
+
+from .sm_rdm import SMDevolutionsRdm
+from .sm_scrt import SMSecureCrt
+
+
+# ========================================
+# Class SMSessionConvert
+# ========================================
+class SMSessionConvert:
+    """SecureCRT <-> Devolutions RDM session converter.
+
+    SecureCRT -> RDM (scrt_to_rdm()):
+
+    SecureCRT ssh sessions are converted to RDM SSH sessions (type 77),
+    credential groups to RDM credentials (type 26) in the credential folder.
+    Session of a credential group references the credential of the same
+    name. IDs are stable (derived from the path), so a session can reference
+    the credential written after it (SecureCRT export lists sessions first).
+
+    Sessions of other types (telnet, serial, ...) and firewall groups have no
+    RDM counterpart, they are counted and skipped.
+
+    RDM -> SecureCRT (rdm_to_scrt()):
+
+    RDM SSH sessions (type 77) are converted to SecureCRT ssh sessions
+    (rendered from the session template), credentials (type 26) to
+    credential groups of the credential name. Session referencing a host
+    (type 53) gets host address (if not set) and host credential (if no
+    session credential). Credential and host references are resolved
+    through connection ID index (see SMDevolutionsRdm.iter_rows_from_json()).
+
+    Connections of other types (rdp, web, ...) are counted and skipped.
+
+    Attributes:
+        Public:
+            credential_folder (str): RDM folder of converted credential groups
+
+        Private:
+            _settings (dict): Configuration settings
+            _stats (dict): Conversion statistics
+            _hosts (dict): RDM host path: (address, credential path)
+    """
+
+    CREDENTIAL_FOLDER = "Credentials"
+
+    def __init__(self, settings: dict, credential_folder: str = CREDENTIAL_FOLDER):
+        """Initial method
+
+        Args:
+            settings (dict): Configuration settings (config.yaml content)
+            credential_folder (str, optional): RDM folder of converted credential groups. Default: 'Credentials'.
+        """
+        self._settings = settings
+        self.credential_folder = credential_folder.strip("/")
+        self._stats = {}
+        self._hosts = {}
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def __iter_scrt_rdm_rows(self, xml_file: str):
+        """Yield RDM rows (sheet_key, row) of SecureCRT XML export records.
+
+        Raises:
+            ValueError: XML file is not parsed completely
+        """
+        sm_scrt = SMSecureCrt(settings=self._settings)
+        for sheet_key, row in sm_scrt.iter_rows_from_xml(xml_file):
+            if sheet_key == "sessions":
+                if row["type"] != "ssh":
+                    self._stats["unsupported"] += 1
+                    continue
+                credential = row["scrt_credential"]
+                if credential != "" and self.credential_folder != "":
+                    credential = f"{self.credential_folder}/{credential}"
+                self._stats["sessions"] += 1
+                yield "sessions", {**row, "rdm_credential": credential, "rdm_host": ""}
+            elif sheet_key == "scrt_credentials":
+                self._stats["credentials"] += 1
+                yield "rdm_credentials", {
+                    "folder": self.credential_folder,
+                    "credential": row["credential"],
+                    "username": row["username"],
+                }
+            elif sheet_key == "scrt_firewalls":
+                self._stats["firewalls"] += 1
+
+        if not sm_scrt.is_xml_read_complete():
+            raise ValueError(f"Source file '{xml_file}' is not complete")
+
+    @staticmethod
+    def __get_rdm_path(path: str) -> str:
+        """Return RDM connection path with '/' separator."""
+        return path.replace("\\", "/").strip("/")
+
+    def __get_scrt_session_row(self, row: dict) -> dict:
+        """Return SecureCRT session row of the RDM ssh session row (host resolved)."""
+        hostname = row["hostname"]
+        credential = self.__get_rdm_path(row["rdm_credential"])
+        if row["rdm_host"] != "":
+            host, host_credential = self._hosts[self.__get_rdm_path(row["rdm_host"])]
+            if hostname == "":
+                hostname = host
+            if credential == "":
+                credential = host_credential
+
+        return {
+            "folder": row["folder"],
+            "session": row["session"],
+            "type": "ssh",
+            "hostname": hostname,
+            "port": row["port"],
+            "username": row["username"],
+            # SecureCRT credential groups are not nested
+            "scrt_credential": credential.rsplit("/", 1)[-1],
+            "scrt_colorscheme": "",
+            "scrt_keywords": "",
+            "scrt_firewall": "",
+        }
+
+    def __iter_rdm_scrt_rows(self, json_file: str):
+        """Yield SecureCRT rows (sheet_key, row) of RDM JSON export connections.
+
+        Sessions referencing a host not read yet are deferred and yielded at
+        the end (memory depends on the number of hosts and forward
+        references only).
+
+        Raises:
+            ValueError: JSON file is not parsed completely
+        """
+        sm_rdm = SMDevolutionsRdm(settings=self._settings)
+        self._hosts = {}
+        # credential group names (flat in SecureCRT)
+        credentials = set()
+        deferred = []
+
+        for sheet_key, row in sm_rdm.iter_rows_from_json(json_file):
+            if sheet_key == "rdm_hosts":
+                path = self.__get_rdm_path(f"{row['folder']}/{row['name']}")
+                self._hosts[path] = (row["host"], self.__get_rdm_path(row["rdm_vault"]))
+                self._stats["hosts"] += 1
+            elif sheet_key == "rdm_credentials":
+                if row["credential"] in credentials:
+                    logging.warning(
+                        "Credential '%s' (folder '%s') already converted. Skipping.",
+                        row["credential"],
+                        row["folder"],
+                    )
+                    self._stats["duplicates"] += 1
+                    continue
+                credentials.add(row["credential"])
+                self._stats["credentials"] += 1
+                yield "scrt_credentials", {"credential": row["credential"], "username": row["username"]}
+            elif row["type"] != "ssh":
+                self._stats["unsupported"] += 1
+            elif row["rdm_host"] != "" and self.__get_rdm_path(row["rdm_host"]) not in self._hosts:
+                deferred.append(row)
+            else:
+                self._stats["sessions"] += 1
+                yield "sessions", self.__get_scrt_session_row(row)
+
+        for row in deferred:
+            if self.__get_rdm_path(row["rdm_host"]) not in self._hosts:
+                logging.warning("Host '%s' (session '%s') not found.", row["rdm_host"], row["session"])
+                self._stats["unresolved"] += 1
+                row = {**row, "rdm_host": ""}
+            self._stats["sessions"] += 1
+            yield "sessions", self.__get_scrt_session_row(row)
+
+        read_stats = sm_rdm.get_json_read_stats()
+        self._stats["unsupported"] += read_stats["unsupported"]
+        self._stats["unresolved"] += read_stats["unresolved"]
+        if not sm_rdm.is_json_read_complete():
+            raise ValueError(f"Source file '{json_file}' is not complete")
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def scrt_to_rdm(self, xml_file: str, json_file: str, compression: str | None = None) -> dict | None:
+        """Convert SecureCRT XML export to Devolutions RDM JSON.
+
+        Destination file is replaced atomically when the whole source is
+        converted (it is not changed in case of error).
+
+        Args:
+            xml_file (str): SecureCRT XML file (compressed file is read transparently)
+            json_file (str): Destination RDM JSON file
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
+
+        Returns:
+            (dict): Converted sessions, credentials, folders (written connections),
+                skipped unsupported sessions and firewall groups
+            None: In case of error
+        """
+        self._stats = {"sessions": 0, "credentials": 0, "folders": 0, "unsupported": 0, "firewalls": 0}
+
+        dst_folder = os.path.dirname(json_file)
+        if dst_folder != "" and not os.path.isdir(dst_folder):
+            logging.info("Creating subfolder '%s'.", dst_folder)
+            Path(dst_folder).mkdir(parents=True, exist_ok=True)
+
+        sm_rdm = SMDevolutionsRdm(settings=self._settings)
+        sm_rdm.set_stable_ids()
+        counts = sm_rdm.write_json_stream(
+            self.__iter_scrt_rdm_rows(xml_file), json_file, atomic=True, compression=compression
+        )
+        if counts is None:
+            return None
+
+        self._stats["folders"] = counts["folders"]
+        return self._stats
+
+    def rdm_to_scrt(self, json_file: str, xml_file: str, compression: str | None = None) -> dict | None:
+        """Convert Devolutions RDM JSON export to SecureCRT XML.
+
+        Destination file is replaced atomically when the whole source is
+        converted (it is not changed in case of error).
+
+        Args:
+            json_file (str): RDM JSON file (compressed file is read transparently)
+            xml_file (str): Destination SecureCRT XML file
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
+
+        Returns:
+            (dict): Converted sessions, credentials, hosts (resolved into sessions),
+                folders (written keys), skipped unsupported connections, duplicate
+                credential names and unresolved references
+            None: In case of error
+        """
+        self._stats = {
+            "sessions": 0,
+            "credentials": 0,
+            "hosts": 0,
+            "folders": 0,
+            "unsupported": 0,
+            "duplicates": 0,
+            "unresolved": 0,
+        }
+
+        dst_folder = os.path.dirname(xml_file)
+        if dst_folder != "" and not os.path.isdir(dst_folder):
+            logging.info("Creating subfolder '%s'.", dst_folder)
+            Path(dst_folder).mkdir(parents=True, exist_ok=True)
+
+        sm_scrt = SMSecureCrt(settings=self._settings)
+        counts = sm_scrt.write_xml_stream(
+            self.__iter_rdm_scrt_rows(json_file), xml_file, atomic=True, compression=compression
+        )
+        if counts is None:
+            return None
+
+        self._stats["folders"] = counts["folders"]
+        return self._stats
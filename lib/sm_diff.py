@@ -0,0 +1,492 @@
+"""SessionMaker diff module
+
+Class - SMDiff:
+    Compare two sessions sources (Excel book, SecureCRT XML, Devolutions RDM
+    JSON) indexed by full session path, report added, removed and modified
+    sessions and write changed sessions only (importable XML/JSON).
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import json
+import logging
+import os.path
+
+from .fileio import split_compression_suffix
+from .sm_class import SessionMaker
+from .sm_columns import SMColumns
+from .sm_scrt import SMSecureCrt
+from .sm_rdm import SMDevolutionsRdm
+
+
+# ========================================
+# Class SMDiff
+# ========================================
+class SMDiff:
+    """SessionMaker diff of two sessions sources.
+
+    Old source is indexed by full session path ("folder/session") once, new
+    source is streamed and every session is looked up in the index (one pass,
+    linear time). Sessions left in the index are removed.
+
+    Only fields defined by both sources are compared (e.g. Excel book vs
+    SecureCRT XML compares SecureCRT fields, 'rdm_*' fields are ignored).
+    When Excel book is compared with SecureCRT XML, empty cell means
+    "template default" and matches any value.
+
+    Attributes:
+        Private:
+            _settings (dict): Configuration settings.
+            _changed_rows (dict): New source rows of added and modified
+                sessions and all credential/firewall/host rows
+                (sheet_key: list of rows), see write_changes().
+    """
+
+    # source kind by file extension
+    SOURCE_KINDS = {
+        ".xlsx": "excel",
+        ".xlsm": "excel",
+        ".xls": "excel",
+        ".ods": "excel",
+        ".xml": "scrt",
+        ".json": "rdm",
+    }
+
+    # session fields defined by source kind (excel: columns of the sessions sheet)
+    SOURCE_FIELDS = {
+        "scrt": (
+            "type",
+            "hostname",
+            "port",
+            "username",
+            "scrt_credential",
+            "scrt_colorscheme",
+            "scrt_keywords",
+            "scrt_firewall",
+        ),
+        "rdm": (
+            "type",
+            "hostname",
+            "port",
+            "username",
+            "rdp_alternate",
+            "rdm_credential",
+            "rdm_host",
+            "rdm_web_form",
+            "rdm_web_login",
+            "rdm_web_passwd",
+        ),
+    }
+
+    # session types by source kind (other kinds: all types)
+    SOURCE_TYPES = {"scrt": ("ssh",)}
+
+    # Excel sheets read by diff ('tab_*' settings key, sheet_key, 'col_names_*' settings key)
+    EXCEL_SHEETS = (
+        ("tab_sessions", "sessions", "col_names_sessions"),
+        ("tab_scrt_credentials", "scrt_credentials", "col_names_scrt_credentials"),
+        ("tab_scrt_firewalls", "scrt_firewalls", "col_names_scrt_firewalls"),
+        ("tab_rdm_credentials", "rdm_credentials", "col_names_rdm_credentials"),
+        ("tab_rdm_hosts", "rdm_hosts", "col_names_rdm_hosts"),
+    )
+
+    def __init__(self, settings: dict):
+        self._settings = settings
+        self._changed_rows = {}
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def __get_path(self, folder: str, name: str) -> str:
+        """Return full path ("folder/name") with normalized folder."""
+        folder = folder.replace("\\", "/").strip().strip("/")
+        if folder == "":
+            return name
+        return folder + "/" + name
+
+    def __get_ref_path(self, reference: str) -> str:
+        """Return normalized full path of the referenced connection (RDM credential, host)."""
+        folder, _, name = reference.replace("\\", "/").rpartition("/")
+        return self.__get_path(folder, name)
+
+    def __read_excel(self, src_file: str) -> tuple | None:
+        """Read Excel book and return session fields and rows.
+
+        Sessions columns are normalized the same way as by the targets (see
+        SMColumns.normalize_sessions()), so e.g. port '22.0' matches '22'.
+
+        Returns:
+            (tuple): (fields, rows), where rows is a list of (sheet_key, row_dict)
+            None: In case of error
+        """
+        sm_excel = SessionMaker(
+            settings=self._settings, excel_file=src_file, read_excel_file=True
+        )
+
+        fields = ()
+        rows = []
+        for tab_key, sheet_key, col_names_key in self.EXCEL_SHEETS:
+            col_names = self._settings["excel"][col_names_key]
+            sheet_dict = sm_excel.excel_read_sheet(self._settings["excel"][tab_key])
+            if sheet_dict is False:
+                if sheet_key == "sessions":
+                    logging.error("Unable to read sheet '%s'.", self._settings["excel"][tab_key])
+                    return None
+                continue
+
+            sheet_dict = sm_excel.col_name_normalize(sheet_dict, col_names)
+            keys = [key for key in col_names if key in sheet_dict]
+            columns = [
+                ["" if value is None else value for value in sheet_dict[key]] for key in keys
+            ]
+            if sheet_key == "sessions":
+                fields = tuple(key for key in keys if key not in ("folder", "session"))
+                # the same values as written by the targets (port '22.0' -> '22', ...)
+                sessions = SMColumns().normalize_sessions(dict(zip(keys, columns)))
+                columns = [sessions[key] for key in keys]
+
+            for values in zip(*columns):
+                row = {key: str(value) for key, value in zip(keys, values)}
+                rows.append((sheet_key, row))
+
+        return fields, rows
+
+    def __open_source(self, src_file: str) -> tuple | None:
+        """Open sessions source.
+
+        Returns:
+            (tuple): (kind, fields, rows, is_complete), where rows is an
+                iterable of (sheet_key, row_dict) pairs (SecureCRT XML and RDM
+                JSON are read incrementally) and is_complete returns True when
+                the rows were read from the whole source (after the rows are
+                consumed)
+            None: In case of error
+        """
+        kind = self.get_source_kind(src_file)
+        if kind is None:
+            logging.error(
+                "Unknown source type of '%s' (use Excel book, SecureCRT XML or RDM JSON).",
+                src_file,
+            )
+            return None
+        if not os.path.isfile(src_file):
+            logging.error("File '%s' not found.", src_file)
+            return None
+
+        if kind == "scrt":
+            sm_scrt = SMSecureCrt(settings=self._settings)
+            rows = sm_scrt.iter_rows_from_xml(src_file)
+            return kind, self.SOURCE_FIELDS[kind], rows, sm_scrt.is_xml_read_complete
+        if kind == "rdm":
+            sm_rdm = SMDevolutionsRdm(settings=self._settings)
+            rows = sm_rdm.iter_rows_from_json(src_file)
+            return kind, self.SOURCE_FIELDS[kind], rows, sm_rdm.is_json_read_complete
+
+        excel = self.__read_excel(src_file)
+        if excel is None:
+            return None
+        return (kind,) + excel + (lambda: True,)
+
+    def __get_values(self, row: dict, fields: tuple, templated: bool) -> tuple:
+        """Return compared values of the session row.
+
+        Args:
+            row (dict): Session row
+            fields (tuple): Compared fields
+            templated (bool): Excel row compared with SecureCRT XML (empty value
+                is None, SecureCRT firewall session path is prefixed)
+        """
+        values = []
+        for field in fields:
+            value = row.get(field, "").strip()
+            if templated:
+                if value == "":
+                    value = None
+                elif field == "scrt_firewall" and "/" in value and "Session:" not in value:
+                    value = "Session:" + value
+            values.append(value)
+
+        return tuple(values)
+
+    def __get_changes(self, fields: tuple, old_values: tuple, new_values: tuple) -> dict:
+        """Return changed fields (field: [old, new]), None values match any value."""
+        changes = {}
+        for field, old, new in zip(fields, old_values, new_values):
+            if old != new and old is not None and new is not None:
+                changes[field] = [old, new]
+
+        return changes
+
+    def __rows_to_dict(self, rows: list, col_names_key: str) -> dict:
+        """Return column-based dict (as read from Excel sheet) from rows."""
+        return {
+            key: [row.get(key, "") for row in rows]
+            for key in self._settings["excel"][col_names_key]
+        }
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def get_source_kind(self, src_file: str) -> str | None:
+        """Return source kind ('excel', 'scrt', 'rdm') by file extension or None.
+
+        Compression suffix ('.gz', '.zst') is ignored, compressed SecureCRT XML
+        and RDM JSON files are read transparently.
+        """
+        src_file = split_compression_suffix(src_file)[0]
+        return self.SOURCE_KINDS.get(os.path.splitext(src_file)[1].lower())
+
+    def diff(self, old_file: str, new_file: str) -> dict | None:
+        """Compare sessions of two sources.
+
+        Args:
+            old_file (str): Old source (Excel book, SecureCRT XML or RDM JSON)
+            new_file (str): New source (Excel book, SecureCRT XML or RDM JSON)
+
+        Returns:
+            (dict): Diff result ('added', 'removed', 'modified', counters)
+            None: In case of error
+        """
+        old_source = self.__open_source(old_file)
+        if old_source is None:
+            return None
+        new_source = self.__open_source(new_file)
+        if new_source is None:
+            return None
+        old_kind, old_fields, old_rows, old_complete = old_source
+        new_kind, new_fields, new_rows, new_complete = new_source
+
+        # compared fields (settings order) and session types
+        fields = tuple(
+            key
+            for key in self._settings["excel"]["col_names_sessions"]
+            if key in old_fields and key in new_fields
+        )
+        types = self.SOURCE_TYPES.get(old_kind, self.SOURCE_TYPES.get(new_kind))
+        old_templated = old_kind == "excel" and new_kind == "scrt"
+        new_templated = new_kind == "excel" and old_kind == "scrt"
+
+        result = {
+            "old": {"file": old_file, "kind": old_kind, "sessions": 0},
+            "new": {"file": new_file, "kind": new_kind, "sessions": 0},
+            "fields": list(fields),
+            "added": [],
+            "removed": [],
+            "modified": {},
+            "unchanged": 0,
+            "skipped": 0,
+            "duplicates": 0,
+        }
+        self._changed_rows = {}
+
+        # index old sessions (path: values)
+        old_index = {}
+        for sheet_key, row in old_rows:
+            if sheet_key != "sessions":
+                continue
+            if row.get("session", "").strip() == "":
+                # empty row (Excel book)
+                continue
+            if types is not None and row.get("type", "") not in types:
+                result["skipped"] += 1
+                continue
+            path = self.__get_path(row.get("folder", ""), row.get("session", ""))
+            if path in old_index:
+                logging.warning("Duplicate session '%s' in '%s'.", path, old_file)
+                result["duplicates"] += 1
+            old_index[path] = self.__get_values(row, fields, old_templated)
+        if not old_complete():
+            logging.error("Source file '%s' is not complete.", old_file)
+            return None
+        result["old"]["sessions"] = len(old_index)
+
+        # stream new sessions, look up in the index
+        new_paths = set()
+        for sheet_key, row in new_rows:
+            if sheet_key != "sessions":
+                # credentials, firewalls, hosts (referenced by changed sessions)
+                self._changed_rows.setdefault(sheet_key, []).append(row)
+                continue
+            if row.get("session", "").strip() == "":
+                # empty row (Excel book)
+                continue
+            if types is not None and row.get("type", "") not in types:
+                result["skipped"] += 1
+                continue
+            path = self.__get_path(row.get("folder", ""), row.get("session", ""))
+            if path in new_paths:
+                logging.warning("Duplicate session '%s' in '%s'.", path, new_file)
+                result["duplicates"] += 1
+                continue
+            new_paths.add(path)
+
+            new_values = self.__get_values(row, fields, new_templated)
+            old_values = old_index.pop(path, None)
+            if old_values is None:
+                result["added"].append(path)
+            elif old_values == new_values:
+                result["unchanged"] += 1
+                continue
+            else:
+                changes = self.__get_changes(fields, old_values, new_values)
+                if not changes:
+                    result["unchanged"] += 1
+                    continue
+                result["modified"][path] = changes
+            self._changed_rows.setdefault("sessions", []).append(row)
+
+        if not new_complete():
+            logging.error("Source file '%s' is not complete.", new_file)
+            self._changed_rows = {}
+            return None
+        result["new"]["sessions"] = len(new_paths)
+        result["removed"] = list(old_index)
+
+        return result
+
+    def get_report(self, result: dict, summary=False) -> list:
+        """Return diff report lines.
+
+        Args:
+            result (dict): Diff result (see diff())
+            summary (bool, optional): Summary line only. Default: False.
+        """
+        lines = []
+        if not summary:
+            lines.append(
+                "--- %s (%s, %d session(s))"
+                % (result["old"]["file"], result["old"]["kind"], result["old"]["sessions"])
+            )
+            lines.append(
+                "+++ %s (%s, %d session(s))"
+                % (result["new"]["file"], result["new"]["kind"], result["new"]["sessions"])
+            )
+            for path in result["added"]:
+                lines.append(f"+ {path}")
+            for path in result["removed"]:
+                lines.append(f"- {path}")
+            for path, changes in result["modified"].items():
+                lines.append(f"~ {path}")
+                for field, (old, new) in changes.items():
+                    lines.append(f"    {field}: '{old}' -> '{new}'")
+
+        lines.append(
+            "%d added, %d removed, %d modified, %d unchanged (compared fields: %s)."
+            % (
+                len(result["added"]),
+                len(result["removed"]),
+                len(result["modified"]),
+                result["unchanged"],
+                ", ".join(result["fields"]) if result["fields"] else "none",
+            )
+        )
+        if result["skipped"]:
+            lines.append(
+                "%d session(s) of type not supported by both sources skipped."
+                % result["skipped"]
+            )
+
+        return lines
+
+    def write_report(self, result: dict, report_file: str) -> None:
+        """Write diff result to JSON file."""
+        with open(report_file, "w", encoding="utf8") as file:
+            json.dump(result, file, indent=2)
+            file.write("\n")
+        logging.info("Diff report written to '%s'.", report_file)
+
+    def write_changes(self, dst_file: str, dst_type="scrt") -> int | None:
+        """Write added and modified sessions (new source) to importable file.
+
+        Only credentials, firewalls and hosts referenced by written sessions
+        are included. Sessions are built from templates (SecureCRT) the same
+        way as by session_maker.py. Removed sessions are not written (import
+        doesn't remove sessions).
+
+        Args:
+            dst_file (str): Destination file (SecureCRT XML or RDM JSON)
+            dst_type (str, optional): Destination type ('scrt', 'rdm'). Default: 'scrt'.
+
+        Returns:
+            (int): Number of written sessions
+            None: Nothing to write
+        """
+        sessions = self._changed_rows.get("sessions", [])
+        if not sessions:
+            return None
+
+        if dst_type == "scrt":
+            credentials = {row.get("scrt_credential", "") for row in sessions}
+            firewalls = {row.get("scrt_firewall", "") for row in sessions}
+
+            sm_maker = SMSecureCrt(settings=self._settings)
+            sm_maker.set_sessions_dict(self.__rows_to_dict(sessions, "col_names_sessions"))
+            sm_maker.set_credentials_dict(
+                self.__rows_to_dict(
+                    [
+                        row
+                        for row in self._changed_rows.get("scrt_credentials", [])
+                        if row.get("credential", "") in credentials
+                    ],
+                    "col_names_scrt_credentials",
+                )
+            )
+            sm_maker.set_firewalls_dict(
+                self.__rows_to_dict(
+                    [
+                        row
+                        for row in self._changed_rows.get("scrt_firewalls", [])
+                        if row.get("firewall", "") in firewalls
+                    ],
+                    "col_names_scrt_firewalls",
+                )
+            )
+            if sm_maker.build_xml_from_dict() is None:
+                return None
+            sm_maker.xml_write(xml_file=dst_file)
+            return len(sessions)
+
+        # RDM: hosts referenced by sessions, credentials referenced by sessions and hosts
+        credentials = {
+            self.__get_ref_path(row.get("rdm_credential", ""))
+            for row in sessions
+        }
+        host_paths = {
+            self.__get_ref_path(row.get("rdm_host", ""))
+            for row in sessions
+        }
+        hosts = [
+            row
+            for row in self._changed_rows.get("rdm_hosts", [])
+            if self.__get_path(row.get("folder", ""), row.get("name", "")) in host_paths
+        ]
+        credentials.update(
+            self.__get_ref_path(row.get("rdm_vault", "")) for row in hosts
+        )
+
+        sm_maker = SMDevolutionsRdm(settings=self._settings)
+        sm_maker.set_sessions_dict(self.__rows_to_dict(sessions, "col_names_sessions"))
+        sm_maker.set_credentials_dict(
+            self.__rows_to_dict(
+                [
+                    row
+                    for row in self._changed_rows.get("rdm_credentials", [])
+                    if self.__get_path(row.get("folder", ""), row.get("credential", ""))
+                    in credentials
+                ],
+                "col_names_rdm_credentials",
+            )
+        )
+        sm_maker.set_hosts_dict(self.__rows_to_dict(hosts, "col_names_rdm_hosts"))
+        if sm_maker.build_json_from_dict() is None:
+            return None
+        sm_maker.write_json(json_file=dst_file)
+        return len(sessions)
@@ -12,7 +12,10 @@ Version list:
 
 """
 import logging
+import re
+import zipfile
 from os import path
+import xml.etree.ElementTree as ET
 import pyexcel
 import xlsxwriter
 import os.path
@@ -21,6 +24,8 @@ from pathlib import Path
 # from datetime import date
 from datetime import datetime
 
+from .fileio import open_output
+
 
 # from jinja2 import Environment, FileSystemLoader
 # from ruamel.yaml import YAML
@@ -112,6 +117,181 @@ class SMExcel:
         self._excel_book = excel_book
         return True
 
+    def read_excel_book_content(self, content: bytes, file_type="xlsx") -> bool:
+        """Read whole excel book from memory (e.g. uploaded file) into 'self._excel_book'.
+
+        Args:
+            content (bytes): Excel book file content
+            file_type (str, optional): Excel book file type. Default: "xlsx".
+
+        Returns:
+            True: When read excel book is successfully.
+            False: When excel book content reading is not successful.
+        """
+
+        try:
+            excel_book = pyexcel.get_book_dict(file_type=file_type, file_content=content)
+            pyexcel.free_resources()
+            logging.info("Loading excel book content (%d bytes) complete.", len(content))
+        except Exception as err:
+            # any reader (plugin) error, content is not valid book
+            logging.error("Unable to load excel book content.")
+            logging.error("%s", err)
+            return False
+
+        self._excel_book = excel_book
+        return True
+
+    def read_excel_sheets(self, sheets: list) -> bool:
+        """Re-read defined sheets only and update them in 'self._excel_book'.
+
+        Args:
+            sheets (list): Sheet names
+
+        Returns:
+            True: When sheets are read successfully.
+            False: When excel book file reading is not successful.
+        """
+
+        try:
+            excel_book = pyexcel.get_book_dict(file_name=self._excel_file, sheets=sheets)
+            pyexcel.free_resources()
+            logging.info(
+                "Loading sheet(s) '%s' from excel book '%s' complete.",
+                "', '".join(sheets),
+                self._excel_file,
+            )
+        except (OSError, zipfile.BadZipFile) as err:
+            logging.error("Unable to load file or sheet(s).")
+            logging.error("%s", err)
+            return False
+
+        for sheet_name in sheets:
+            if sheet_name in excel_book:
+                self._excel_book[sheet_name] = excel_book[sheet_name]
+            else:
+                self._excel_book.pop(sheet_name, None)
+
+        return True
+
+    def get_book_signature(self) -> dict | None:
+        """Return signature of xlsx book sheets (without reading sheets content).
+
+        Signature contains CRC-32 of every worksheet part (from the zip
+        directory) and shared strings table (used to compare sheets whose
+        parts are the same, but referenced strings changed).
+
+        Returns:
+            (dict): Book signature
+            None: Book is not xlsx file (or is not readable, e.g. while saving)
+        """
+
+        try:
+            with zipfile.ZipFile(self._excel_file) as book:
+                sheets = {}
+                for sheet_name, part in self.__get_book_sheet_parts(book).items():
+                    sheets[sheet_name] = {"part": part, "crc": book.getinfo(part).CRC}
+
+                shared_strings = None
+                if "xl/sharedStrings.xml" in book.namelist():
+                    shared_strings = self.__get_book_shared_strings(book)
+
+        except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as err:
+            logging.info("Unable to read book signature '%s': %s", self._excel_file, err)
+            return None
+
+        return {"sheets": sheets, "shared_strings": shared_strings}
+
+    def get_changed_sheets(self, old_signature: dict | None, new_signature: dict | None) -> list | None:
+        """Compare book signatures and return list of changed sheets.
+
+        Sheet is changed when its part changed, or when shared string
+        referenced by the sheet changed.
+
+        Args:
+            old_signature (dict): Previous book signature
+            new_signature (dict): Current book signature
+
+        Returns:
+            (list): Names of changed (added or removed) sheets
+            None: Unable to compare (all sheets should be read)
+        """
+
+        if old_signature is None or new_signature is None:
+            return None
+
+        old_sheets = old_signature["sheets"]
+        new_sheets = new_signature["sheets"]
+        changed = [name for name in old_sheets if name not in new_sheets]
+        unchanged = []
+        for sheet_name, sheet in new_sheets.items():
+            if sheet_name not in old_sheets or old_sheets[sheet_name]["crc"] != sheet["crc"]:
+                changed.append(sheet_name)
+            else:
+                unchanged.append(sheet_name)
+
+        old_strings = old_signature["shared_strings"]
+        new_strings = new_signature["shared_strings"]
+        if unchanged and old_strings != new_strings:
+            try:
+                with zipfile.ZipFile(self._excel_file) as book:
+                    for sheet_name in unchanged:
+                        sheet_xml = book.read(new_sheets[sheet_name]["part"])
+                        for match in self.__RE_SHARED_STRING_CELL.finditer(sheet_xml):
+                            idx = int(match.group(1))
+                            if old_strings is None or new_strings is None:
+                                changed.append(sheet_name)
+                                break
+                            old_string = old_strings[idx] if idx < len(old_strings) else None
+                            new_string = new_strings[idx] if idx < len(new_strings) else None
+                            if old_string != new_string:
+                                changed.append(sheet_name)
+                                break
+            except (OSError, KeyError, zipfile.BadZipFile) as err:
+                logging.info("Unable to compare book sheets '%s': %s", self._excel_file, err)
+                return None
+
+        return changed
+
+    # shared string cell (t="s") value in worksheet part
+    __RE_SHARED_STRING_CELL = re.compile(rb'<c [^>]*t="s"[^>]*>\s*<v>(\d+)</v>')
+
+    def __get_book_sheet_parts(self, book: zipfile.ZipFile) -> dict:
+        """Return dict 'sheet name: worksheet part' of xlsx book."""
+        ns_main = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+        ns_rel = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+        ns_pkg = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+        targets = {}
+        rels = ET.fromstring(book.read("xl/_rels/workbook.xml.rels"))
+        for rel in rels.iter(f"{ns_pkg}Relationship"):
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = "xl/" + target
+            targets[rel.get("Id")] = target
+
+        parts = {}
+        workbook = ET.fromstring(book.read("xl/workbook.xml"))
+        for sheet in workbook.iter(f"{ns_main}sheet"):
+            parts[sheet.get("name")] = targets[sheet.get(f"{ns_rel}id")]
+
+        return parts
+
+    def __get_book_shared_strings(self, book: zipfile.ZipFile) -> list:
+        """Return list of xlsx book shared strings."""
+        ns_main = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+        strings = []
+        with book.open("xl/sharedStrings.xml") as file:
+            for _, element in ET.iterparse(file):
+                if element.tag == f"{ns_main}si":
+                    strings.append("".join(element.itertext()))
+                    element.clear()
+
+        return strings
+
     def set_excel_file(self, excel_file: str, read_excel_file=True):
         """Set self._excel_file variable
 
@@ -221,21 +401,7 @@ class SMExcel:
         # Create a workbook and add a worksheet.
         workbook = xlsxwriter.Workbook(excel_file)
         # sheet_sessions = workbook.add_worksheet(name="sessions")
-
-        today = datetime.today()
-        workbook.set_properties(
-            {
-                "title": "Device sessions list",
-                "subject": "",
-                "author": "SessionMaker",
-                "company": "Soitron",
-                # 'category': 'Example spreadsheets',
-                # 'keywords': 'Sample, Example, Properties',
-                "created": today,
-                "comments": "Sessions workbook generated by SessionMaker on "
-                + today.strftime("%d/%m/%Y, %H:%M:%S"),
-            }
-        )
+        self._set_book_properties(workbook)
 
         workbook = self._write_sheet(
             workbook,
@@ -275,6 +441,133 @@ class SMExcel:
 
         workbook.close()
 
+    def write_excel_book_stream(
+        self, rows, excel_file: str | None = None, sheet_keys: list | None = None
+    ) -> dict:
+        """Write rows to Excel book as they come (constant memory mode).
+
+        Every row is flushed to the (temporary) sheet file immediately, so memory
+        usage does not depend on the number of rows. Sheets are the same as
+        in write_excel_book().
+
+        Destination file is replaced atomically when all rows are written. Rows
+        source raises ValueError when its source is not complete (e.g.
+        truncated file), destination file is not changed then.
+
+        Args:
+            rows (iterable): Pairs (sheet_key, row_dict). Sheet key is one of
+                'sessions', 'rdm_credentials', 'scrt_credentials', 'scrt_firewalls'.
+            excel_file (str, optional): Destination file. Default: self._excel_file
+            sheet_keys (list, optional): Sheets to create. Default: sheets from write_excel_book().
+
+        Returns:
+            (dict): Number of written rows per sheet key.
+            None: In case of error (destination file is not written)
+        """
+        if excel_file is None:
+            excel_file = self._excel_file
+        excel_file = str(excel_file)
+
+        # preparing destination folder
+        dst = os.path.split(excel_file)
+        if dst[0] != "" and os.path.isdir(dst[0]) is False:
+            # create parent folders if not exists
+            logging.info("Creating subfolder '%s'.", dst[0])
+            Path(dst[0]).mkdir(parents=True, exist_ok=True)
+
+        if os.path.exists(excel_file):
+            logging.warning("Destination file '%s' exists. Overwriting.", excel_file)
+
+        try:
+            with open_output(excel_file, atomic=True, compression="none") as file:
+                return self.__write_book_stream_rows(file, rows, sheet_keys, excel_file)
+        except (OSError, ValueError) as err:
+            logging.error("Unable to write Excel file '%s'", excel_file)
+            logging.error("%s", err)
+            return None
+
+    def __write_book_stream_rows(self, file, rows, sheet_keys: list | None, excel_file: str) -> dict:
+        """Write rows to Excel book (binary file object), see write_excel_book_stream()."""
+        workbook = xlsxwriter.Workbook(file, {"constant_memory": True})
+        self._set_book_properties(workbook)
+
+        if sheet_keys is None:
+            sheet_keys = [
+                "sessions",
+                "rdm_credentials",
+                "scrt_credentials",
+                "scrt_firewalls",
+            ]
+
+        # sheet_key: [worksheet, col_names, col_widths, next_row]
+        sheets = {}
+        for sheet_key in sheet_keys:
+            sheet_name = self._settings["excel"]["tab_" + sheet_key]
+            col_names = self._settings["excel"]["col_names_" + sheet_key]
+            sheet = self._write_sheet_title(workbook, sheet_name, col_names)
+            col_widths = [len(col_names[key]) for key in col_names]
+            sheets[sheet_key] = [sheet, col_names, col_widths, 1]
+
+        try:
+            for sheet_key, row in rows:
+                sheet, col_names, col_widths, row_idx = sheets[sheet_key]
+                for col, key in enumerate(col_names):
+                    value = str(row.get(key, ""))
+                    if len(value) > col_widths[col]:
+                        col_widths[col] = len(value)
+                    sheet.write_string(row_idx, col, value)
+                sheets[sheet_key][3] = row_idx + 1
+
+            # column widths are written on close, it is safe to set them now
+            for sheet, col_names, col_widths, row_idx in sheets.values():
+                for col, col_width in enumerate(col_widths):
+                    sheet.set_column(col, col, col_width + 1)
+
+            logging.info("Writing Excel file '%s'.", excel_file)
+        finally:
+            # close removes temporary sheet files (book written to the temporary file)
+            workbook.close()
+
+        return {sheet_key: value[3] - 1 for sheet_key, value in sheets.items()}
+
+    def _set_book_properties(self, workbook):
+        """Set SessionMaker workbook properties (title, author,...)."""
+        today = datetime.today()
+        workbook.set_properties(
+            {
+                "title": "Device sessions list",
+                "subject": "",
+                "author": "SessionMaker",
+                "company": "Soitron",
+                # 'category': 'Example spreadsheets',
+                # 'keywords': 'Sample, Example, Properties',
+                "created": today,
+                "comments": "Sessions workbook generated by SessionMaker on "
+                + today.strftime("%d/%m/%Y, %H:%M:%S"),
+            }
+        )
+
+    def _write_sheet_title(self, workbook, sheet_name, col_names):
+        """Add worksheet with title row (column names) and return it."""
+        sheet = workbook.add_worksheet(name=sheet_name)
+
+        title_general = workbook.add_format({"bold": 1})
+        title_scrt = workbook.add_format({"bold": 1})
+        title_scrt.set_fg_color("#60b1b5")
+        title_rdm = workbook.add_format({"bold": 1})
+        title_rdm.set_fg_color("#3f8df3")
+
+        logging.info("Creating workbook sheet '%s'", sheet_name)
+        for col, key in enumerate(col_names):
+            if key.startswith("scrt_") or sheet_name.startswith("scrt "):
+                sheet.write(0, col, col_names[key], title_scrt)
+            elif key.startswith("rdm_") or sheet_name.startswith("rdm "):
+                sheet.write(0, col, col_names[key], title_rdm)
+            else:
+                sheet.write(0, col, col_names[key], title_general)
+
+        return sheet
+
     def _write_sheet(
         self, workbook, sheet_name, col_names=[], data=[], title_bg_color=""
     ):
@@ -303,7 +596,7 @@ class SMExcel:
                 sheet.write(0, col, col_names[key], title_general)
 
                 # 3f8df3
-            if not key in data.keys():
+            if not key in data.keys() or len(data[key]) == 0:
                 data[key] = [""]
 
             # set column width
@@ -16,7 +16,11 @@ import logging
 import os.path
 from pathlib import Path
 
+import io
 import json
+import re
+
+from .fileio import open_input, open_output
 
 
 # ========================================
@@ -42,6 +46,8 @@ class SMJson:
         ### public attributes
         self.json_file = ""
         self._json_content = None
+        # the last iterparse_json_array() read the whole file
+        self._read_complete = False
         self.set_json_file(
             kwargs.get("json_file", ""), kwargs.get("read_json_file", False)
         )
@@ -59,6 +65,125 @@ class SMJson:
     # Public methods
     # ========================================
 
+    def iterparse_json_array(self, json_file: str | None = None, key="Connections"):
+        """Read JSON file incrementally and yield items of the top-level array 'key'.
+
+        File is read in chunks and array items are decoded one by one (memory
+        usage does not depend on the number of items). Other top-level
+        values are decoded and skipped. Compressed (gzip, zstd) file is
+        decompressed while read.
+
+        Args:
+            json_file (str, optional): JSON file. If not set, use self.json_file.
+            key (str, optional): Top-level object key of the array. Default: "Connections".
+
+        Yields:
+            Decoded array items (e.g. dict)
+        """
+        if json_file is None:
+            json_file = self.json_file
+
+        logging.info("Parsing JSON file '%s' (streaming)...", json_file)
+        self._read_complete = False
+        try:
+            with io.TextIOWrapper(open_input(json_file), encoding="utf-8-sig") as file:
+                yield from self.__iterparse_json_array(file, key)
+            self._read_complete = True
+            logging.info("Success.")
+        except json.JSONDecodeError as err:
+            logging.error("Unable to parse JSON file '%s'", json_file)
+            logging.error("%s", err)
+        except (OSError, UnicodeDecodeError) as err:
+            logging.error("Unable to read JSON file '%s'", json_file)
+            logging.error("%s", err)
+
+    # JSON whitespace
+    __RE_WS = re.compile(r"[ \t\n\r]*")
+
+    # read chunk size (characters)
+    CHUNK_SIZE = 65536
+
+    def __iterparse_json_array(self, file, key: str):
+        """Yield items of the top-level array 'key' from JSON text file object."""
+        decoder = json.JSONDecoder()
+        state = {"buffer": "", "pos": 0, "eof": False}
+
+        def fill() -> bool:
+            """Append next chunk to the buffer (drop consumed part). False on EOF."""
+            if state["eof"]:
+                return False
+            chunk = file.read(self.CHUNK_SIZE)
+            if chunk == "":
+                state["eof"] = True
+                return False
+            state["buffer"] = state["buffer"][state["pos"] :] + chunk
+            state["pos"] = 0
+            return True
+
+        def skip_ws():
+            """Move position after whitespace (read more, if needed)."""
+            while True:
+                state["pos"] = self.__RE_WS.match(state["buffer"], state["pos"]).end()
+                if state["pos"] < len(state["buffer"]) or not fill():
+                    return
+
+        def next_char(expected: str) -> str:
+            """Consume next (non-whitespace) character, one of 'expected'."""
+            skip_ws()
+            if state["pos"] >= len(state["buffer"]):
+                raise json.JSONDecodeError("Unexpected end of file", state["buffer"], state["pos"])
+            char = state["buffer"][state["pos"]]
+            if char not in expected:
+                raise json.JSONDecodeError(
+                    f"Expecting one of '{expected}'", state["buffer"], state["pos"]
+                )
+            state["pos"] += 1
+            return char
+
+        def decode():
+            """Decode next value (read more, until the value is complete)."""
+            skip_ws()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(state["buffer"], state["pos"])
+                    # number at the end of buffer may continue in the next chunk
+                    if end < len(state["buffer"]) or state["eof"]:
+                        state["pos"] = end
+                        return value
+                except json.JSONDecodeError:
+                    if state["eof"]:
+                        raise
+                fill()
+
+        fill()
+        next_char("{")
+        skip_ws()
+        if state["buffer"][state["pos"] : state["pos"] + 1] == "}":
+            return
+
+        while True:
+            name = decode()
+            next_char(":")
+            if name == key:
+                next_char("[")
+                skip_ws()
+                if state["buffer"][state["pos"] : state["pos"] + 1] == "]":
+                    state["pos"] += 1
+                else:
+                    while True:
+                        yield decode()
+                        if next_char(",]") == "]":
+                            break
+            else:
+                decode()
+
+            if next_char(",}") == "}":
+                return
+
+    def is_read_complete(self) -> bool:
+        """Return True if the last iterparse_json_array() read the whole file (no parse error)."""
+        return self._read_complete
+
     def print_json(self, json_content=None):
         """Print formated JSON to stdout.
 
@@ -72,19 +197,33 @@ class SMJson:
         json_formated = json.dumps(json_content, indent=4)
         print(json_formated)
 
+    def json_to_bytes(self, json_content=None) -> bytes:
+        """Return JSON content as bytes (the same content as written by write_json_file).
+
+        Args:
+            json_content (optional): JSON object. Defaults to self._json_content.
+        """
+        if json_content is None:
+            json_content = self._json_content
+
+        return json.dumps(json_content, indent=4).encode("utf8")
+
     def set_json_file(self, json_file: str, read_json_file=False):
         """Set JSON file attribute"""
         self.json_file = json_file
-        # if json_file != "" and read_json_file:
-        #     self.parse_json_file()
+        # JSON content is read incrementally, see iterparse_json_array()
 
-    def write_json_file(self, json_file: str | None = None, json_content=None) -> None:
+    def write_json_file(
+        self, json_file: str | None = None, json_content=None, atomic=False, compression=None
+    ) -> None:
         """
         Writes JSON content to a specified file.
         
         Args:
             json_file (str | None, optional): The path to the JSON file. If None, defaults to self.json_file.
             json_content (any, optional): The content to be written to the JSON file. If None, defaults to self._json_content.
+            atomic (bool, optional): Replace the destination file atomically. Defaults to False.
+            compression (str | None, optional): 'gzip', 'zstd' or 'none'. Defaults to None (by file extension '.gz', '.zst').
         
         Raises:
             FileNotFoundError: If the specified file path does not exist and cannot be created.
@@ -92,7 +231,7 @@ class SMJson:
         Logs:
             Info: When creating subfolders that do not exist.
             Warning: If the destination file already exists and will be overwritten.
-            Error: If unable to write to the JSON file due to a FileNotFoundError.
+            Error: If unable to write to the JSON file (FileNotFoundError, OSError).
         """
         
 
@@ -113,17 +252,26 @@ class SMJson:
             Path(dst[0]).mkdir(parents=True, exist_ok=True)
 
         if os.path.exists(json_file):
-            logging.warning("Destination file '%s' exists. Overwriting.", json_file)
+            if atomic:
+                logging.info("Destination file '%s' exists. Replacing.", json_file)
+            else:
+                logging.warning("Destination file '%s' exists. Overwriting.", json_file)
 
         # write to file
         try:
-            with open(json_file, "w", encoding="utf8") as outfile:
+            with open_output(json_file, atomic=atomic, compression=compression) as file:
+                outfile = io.TextIOWrapper(file, encoding="utf8")
                 outfile.write(json_object)
+                outfile.flush()
+                outfile.detach()
         except FileNotFoundError as err:
             logging.error(
                 "Unable to write. JSON file destination not set.",
             )
             logging.error("%s", err)
+        except OSError as err:
+            logging.error("Unable to write JSON file '%s'", json_file)
+            logging.error("%s", err)
 
     #     # xml_element = ET.Element(kwargs.get("xml_element", self._xml_element))
 
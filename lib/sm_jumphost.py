@@ -0,0 +1,265 @@
+"""SessionMaker jump host graph module
+
+Class - SMJumpHostGraph:
+    Graph of SecureCRT sessions connected through other sessions (firewall
+    group value with '/' is a path to jump host session, "Session:<path>").
+    Checks jump host existence, detects cycles, computes chain depth and
+    lists sessions transiting through a bastion.
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import logging
+
+
+# ========================================
+# Class SMJumpHostGraph
+# ========================================
+class SMJumpHostGraph:
+    """SecureCRT jump host graph.
+
+    Every session has one jump host at most, so the graph is built from the
+    session path index in linear time and every walk visits each session
+    once (depths are memoized).
+
+    Depth is the number of jump hosts on the way to the session (0 = direct
+    connection). Sessions in a cycle (or behind it) have no depth (None).
+
+    Attributes:
+        Private:
+            _paths (list): Session paths (node index -> path)
+            _rows (list): Sessions dict row indexes of the paths
+            _index (dict): Session path -> node index
+            _jump (list): Node index of the jump host (NONE, MISSING)
+            _targets (list): Jump host path as written in the sheet
+            _depths (list): Chain depth of the node (None = cycle)
+            _cycles (list): Cycles (lists of node indexes)
+    """
+
+    PREFIX = "Session:"
+
+    # jump host values
+    NONE = -1
+    MISSING = -2
+
+    def __init__(self, sessions: dict, session_types=("ssh",)):
+        """Build the graph from sessions dict (column-based, as read from Excel).
+
+        Args:
+            sessions (dict): Sessions dict
+            session_types (tuple, optional): Session types of graph nodes. Default: ("ssh",).
+        """
+        self._paths = []
+        self._rows = []
+        self._index = {}
+        self._jump = []
+        self._targets = []
+        self._depths = []
+        self._cycles = []
+
+        self.__build_graph(sessions, session_types)
+        self.__set_depths()
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def __build_graph(self, sessions: dict, session_types: tuple):
+        """Build session path index and jump host edges."""
+        count = len(sessions.get("session") or [])
+        columns = {}
+        for key in ("folder", "session", "type", "scrt_firewall"):
+            column = sessions.get(key) or [""] * count
+            columns[key] = ["" if value is None else str(value).strip() for value in column]
+
+        # nodes (session path index, first session of the path wins)
+        for idx in range(count):
+            if columns["type"][idx] not in session_types or columns["session"][idx] == "":
+                continue
+            folder = columns["folder"][idx].strip("/")
+            path = folder + "/" + columns["session"][idx] if folder else columns["session"][idx]
+            if path in self._index:
+                continue
+            self._index[path] = len(self._paths)
+            self._paths.append(path)
+            self._rows.append(idx)
+            self._targets.append(self.get_target_path(columns["scrt_firewall"][idx]))
+
+        # edges (one jump host per session)
+        for target in self._targets:
+            if target is None:
+                self._jump.append(self.NONE)
+            else:
+                self._jump.append(self._index.get(target, self.MISSING))
+
+    def __set_depths(self):
+        """Compute chain depth of every node and find cycles (linear time)."""
+        UNSEEN, ON_PATH, DONE = 0, 1, 2
+        state = [UNSEEN] * len(self._paths)
+        self._depths = [None] * len(self._paths)
+
+        for start in range(len(self._paths)):
+            if state[start] == DONE:
+                continue
+
+            # walk the chain up to a resolved node (or back to the walk = cycle)
+            walk = []
+            node = start
+            while node >= 0 and state[node] == UNSEEN:
+                state[node] = ON_PATH
+                walk.append(node)
+                node = self._jump[node]
+
+            if node >= 0 and state[node] == ON_PATH:
+                # cycle: walk from the first node of the cycle
+                cycle = walk[walk.index(node):]
+                self._cycles.append(cycle)
+                depth = None
+            elif node >= 0:
+                depth = self._depths[node]
+            else:
+                # no jump host (or missing jump host, counted as one hop)
+                depth = -1 if node == self.NONE else 0
+
+            # resolve the walk backwards (cycle and sessions behind it: None)
+            for node in reversed(walk):
+                if depth is not None:
+                    depth += 1
+                self._depths[node] = depth
+                state[node] = DONE
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    @classmethod
+    def get_target_path(cls, firewall: str) -> str | None:
+        """Return jump host session path of the firewall value (None = firewall group).
+
+        Args:
+            firewall (str): Firewall group value ('scrt_firewall' column)
+        """
+        firewall = "" if firewall is None else str(firewall).strip()
+        if "/" not in firewall and not firewall.startswith(cls.PREFIX):
+            return None
+        if firewall.startswith(cls.PREFIX):
+            firewall = firewall[len(cls.PREFIX):]
+
+        return firewall.strip("/")
+
+    def get_sessions_count(self) -> int:
+        """Return number of sessions (graph nodes)."""
+        return len(self._paths)
+
+    def get_jump_sessions_count(self) -> int:
+        """Return number of sessions connected through jump host."""
+        return sum(1 for jump in self._jump if jump != self.NONE)
+
+    def get_missing(self) -> list:
+        """Return sessions with missing jump host session.
+
+        Returns:
+            (list): dicts: row (sessions dict index), session (path), target (jump host path)
+        """
+        return [
+            {"row": self._rows[node], "session": self._paths[node], "target": self._targets[node]}
+            for node, jump in enumerate(self._jump)
+            if jump == self.MISSING
+        ]
+
+    def get_cycles(self) -> list:
+        """Return jump host cycles.
+
+        Returns:
+            (list): lists of dicts: row (sessions dict index), session (path); in jump order
+        """
+        return [
+            [{"row": self._rows[node], "session": self._paths[node]} for node in cycle]
+            for cycle in self._cycles
+        ]
+
+    def get_depth(self, path: str) -> int | None:
+        """Return chain depth of the session (None = in cycle or unknown session)."""
+        node = self._index.get(path.strip("/"))
+        if node is None:
+            return None
+        return self._depths[node]
+
+    def get_max_depth(self) -> int:
+        """Return the longest jump host chain depth (cycles excluded)."""
+        return max((depth for depth in self._depths if depth is not None), default=0)
+
+    def get_chain(self, path: str) -> list | None:
+        """Return jump host chain of the session (session first, last jump host last).
+
+        Returns:
+            (list): Session paths, None if session is not found
+        """
+        node = self._index.get(path.strip("/"))
+        if node is None:
+            return None
+
+        chain = []
+        seen = set()
+        while node >= 0 and node not in seen:
+            seen.add(node)
+            chain.append(self._paths[node])
+            node = self._jump[node]
+
+        return chain
+
+    def get_transit(self, bastion: str) -> list | None:
+        """Return sessions transiting through the bastion session (blast radius).
+
+        Sessions are listed breadth-first (nearest first).
+
+        Args:
+            bastion (str): Bastion session path
+
+        Returns:
+            (list): dicts: row (sessions dict index), session (path),
+                hops (number of jump hosts between bastion and the session + 1),
+                via (path of the session's jump host).
+                None if the bastion is not found.
+        """
+        start = self._index.get(self.get_target_path(bastion) or bastion.strip("/"))
+        if start is None:
+            logging.warning("Bastion session '%s' not found.", bastion)
+            return None
+
+        # reverse edges (jump host -> sessions)
+        children = {}
+        for node, jump in enumerate(self._jump):
+            if jump >= 0:
+                children.setdefault(jump, []).append(node)
+
+        transit = []
+        seen = {start}
+        level = [start]
+        hops = 0
+        while level:
+            hops += 1
+            next_level = []
+            for parent in level:
+                for node in children.get(parent, ()):
+                    if node in seen:
+                        continue
+                    seen.add(node)
+                    next_level.append(node)
+                    transit.append(
+                        {
+                            "row": self._rows[node],
+                            "session": self._paths[node],
+                            "hops": hops,
+                            "via": self._paths[parent],
+                        }
+                    )
+            level = next_level
+
+        return transit
@@ -0,0 +1,374 @@
+"""SessionMaker merge module
+
+Class - SMXmlMerge:
+    Merge of built SecureCRT sessions, credentials and firewalls into an
+    existing SecureCRT (VanDyke) XML export. Existing file is read and
+    written as a stream (bounded memory), keys of the built document are
+    found by full path index (linear time). Sessions, credentials and
+    firewalls which are not in the workbook are kept untouched.
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+
+from .fileio import open_output
+from .sm_xml import SMXml, escape_xml_attrib, escape_xml_text
+
+
+# ========================================
+# Class SMXmlMerge
+# ========================================
+class SMXmlMerge:
+    """Merge built SecureCRT document into existing SecureCRT XML file.
+
+    Keys of the document are identified by path of names from the root
+    (e.g. ('Sessions', 'folder', 'session'), ('Credentials', 'name')).
+    Key with key children (and top-level sections) is a folder, other
+    keys are entries (sessions, credentials, firewalls).
+
+    Entry of the built document replaces existing entry of the same path
+    (in place), new entries (and folders) are added at the end of their
+    existing folder. Empty key names of the existing file (folder with
+    trailing '/' written by older versions) are not path levels, the same
+    as by SMDiff. Output is indented the same way as write_xml_file().
+
+    Attributes:
+        Private:
+            _kinds (dict): Path of built key: 'folder' or 'entry'
+            _elements (dict): Path of built key: element
+            _children (dict): Path of built folder: child paths (document order)
+            _done (set): Paths of written built entries
+            _stats (dict): Merge statistics
+    """
+
+    FOLDER = "folder"
+    ENTRY = "entry"
+
+    def __init__(self, xml_root: ET.Element):
+        """Index the built document.
+
+        Args:
+            xml_root (ET.Element): Built SecureCRT document (see SMSecureCrt.build_xml_from_dict())
+        """
+        self._kinds = {}
+        self._elements = {}
+        self._children = {}
+        self._done = set()
+        self._stats = {}
+
+        self.__index_element(xml_root, ())
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def __index_element(self, element: ET.Element, path: tuple):
+        """Index built keys (recursively) by path."""
+        self._kinds[path] = self.FOLDER
+        self._elements[path] = element
+        children = self._children.setdefault(path, [])
+
+        for child in element:
+            if child.tag != "key":
+                continue
+            child_path = path + (child.get("name"),)
+            if child_path in self._kinds:
+                # duplicate key (merged by the build), first wins
+                continue
+            children.append(child_path)
+            if len(child_path) == 1 or child.find("./key") is not None:
+                self.__index_element(child, child_path)
+            else:
+                self._kinds[child_path] = self.ENTRY
+                self._elements[child_path] = child
+
+    def __count(self, path: tuple, action: str, count=1):
+        """Add count to the statistics of the section (path[0])."""
+        section = self._stats.setdefault(path[0], {"added": 0, "updated": 0, "kept": 0})
+        section[action] += count
+
+    def __count_entries(self, path: tuple) -> int:
+        """Return number of built entries in the subtree of the path."""
+        if self._kinds[path] == self.ENTRY:
+            return 1
+        return sum(self.__count_entries(child) for child in self._children[path])
+
+    @staticmethod
+    def __write_element(write, element, level: int):
+        """Serialize element indented for the level (the same as ET.indent() + ET.write()).
+
+        Tail of the element is not written.
+        """
+        write("<" + element.tag)
+        for name, value in element.attrib.items():
+            write(f' {name}="{escape_xml_attrib(value)}"')
+
+        if len(element) == 0:
+            if element.text:
+                write(">" + escape_xml_text(element.text) + f"</{element.tag}>")
+            else:
+                write(" />")
+            return
+
+        indent = "\n" + "\t" * (level + 1)
+        write(">")
+        if element.text and element.text.strip():
+            write(escape_xml_text(element.text))
+        else:
+            write(indent)
+        for idx, child in enumerate(element):
+            SMXmlMerge.__write_element(write, child, level + 1)
+            if child.tail and child.tail.strip():
+                write(escape_xml_text(child.tail))
+            elif idx < len(element) - 1:
+                write(indent)
+            else:
+                write(indent[:-1])
+        write(f"</{element.tag}>")
+
+    def __write_child_start(self, write, frame: dict):
+        """Write parent start tag (first child) or tail of the previous child."""
+        if not frame["opened"]:
+            frame["opened"] = True
+            element = frame["element"]
+            write("<" + element.tag)
+            for name, value in element.attrib.items():
+                write(f' {name}="{escape_xml_attrib(value)}"')
+            write(">")
+            if element.text and element.text.strip():
+                write(escape_xml_text(element.text))
+            else:
+                write("\n" + "\t" * (frame["level"] + 1))
+        else:
+            self.__write_tail(write, frame, last=False)
+
+    def __write_tail(self, write, frame: dict, last: bool):
+        """Write tail of the previous child (indentation or text)."""
+        tail = frame["last"].tail if frame["last"] is not None else None
+        if tail and tail.strip():
+            write(escape_xml_text(tail))
+        else:
+            write("\n" + "\t" * (frame["level"] + (0 if last else 1)))
+
+    def __write_new_children(self, write, frame: dict):
+        """Write built children of the folder which are not in existing file."""
+        path = frame["path"]
+        if self._kinds.get(path) != self.FOLDER:
+            return
+
+        new_children = [child for child in self._children[path] if child[-1] not in frame["seen"]]
+        if not new_children:
+            return
+        if frame["settings"]:
+            # existing session, folder of the same path in the workbook
+            count = sum(self.__count_entries(child) for child in new_children)
+            logging.warning(
+                "Key '%s' is a session in existing file and a folder in workbook, %d entries not merged.",
+                "/".join(path),
+                count,
+            )
+            self._stats["conflicts"] += 1
+            return
+
+        for child in new_children:
+            self.__write_child_start(write, frame)
+            self.__write_element(write, self._elements[child], frame["level"] + 1)
+            frame["last"] = None
+            self.__count(child, "added", self.__count_entries(child))
+
+    def __merge_stream(self, events, write) -> bool:
+        """Merge built document into the existing file events, write the output.
+
+        Returns:
+            True: Existing document is read and written completely
+            False: Existing document is incomplete (parse error)
+        """
+        stack = []
+        # element (existing entry or setting) buffered until its end
+        buffered = None
+        buffered_depth = 0
+
+        for event, element in events:
+            if buffered is not None:
+                # buffered subtree (written or replaced at the end)
+                buffered_depth += 1 if event == "start" else -1
+                if buffered_depth > 0:
+                    continue
+                element = buffered
+                buffered = None
+                frame = stack[-1]
+                path = frame["path"] + (element.get("name"),)
+                self.__write_buffered(write, frame, element, path)
+                frame["last"] = element
+                frame["element"].remove(element)
+                continue
+
+            if event == "start":
+                if not stack:
+                    # document root
+                    stack.append(self.__get_frame(element, (), 0))
+                    continue
+
+                frame = stack[-1]
+                self.__write_child_start(write, frame)
+                if element.tag != "key":
+                    frame["settings"] = True
+                    buffered, buffered_depth = element, 1
+                    continue
+
+                name = element.get("name")
+                if name == "" and frame["path"]:
+                    # empty folder level (trailing '/' folder written by older versions), its
+                    # keys belong to the parent folder (the same path as the built keys)
+                    stack.append(self.__get_frame(element, frame["path"], frame["level"] + 1, frame))
+                    continue
+
+                frame["seen"].add(name)
+                path = frame["path"] + (name,)
+                if path in self._kinds and self._kinds[path] == self.ENTRY and path not in self._done:
+                    buffered, buffered_depth = element, 1
+                    continue
+
+                stack.append(self.__get_frame(element, path, frame["level"] + 1))
+                continue
+
+            # end of streamed key (or root)
+            frame = stack.pop()
+            if not frame["transparent"]:
+                # new children of the empty folder level are written by its parent
+                self.__write_new_children(write, frame)
+            if frame["opened"]:
+                self.__write_tail(write, frame, last=True)
+                write(f"</{element.tag}>")
+            else:
+                self.__write_element(write, element, frame["level"])
+
+            if len(frame["path"]) > 1 and not frame["keys"]:
+                self.__count(frame["path"], "kept")
+
+            if not stack:
+                return True
+            stack[-1]["last"] = element
+            stack[-1]["keys"] = True
+            stack[-1]["element"].remove(element)
+
+        return False
+
+    def __write_buffered(self, write, frame: dict, element, path: tuple):
+        """Write buffered element: setting as is, existing entry replaced by built entry."""
+        if element.tag != "key":
+            self.__write_element(write, element, frame["level"] + 1)
+            return
+
+        frame["keys"] = True
+        if element.find("./key") is not None:
+            # existing folder, session of the same path in the workbook
+            logging.warning(
+                "Key '%s' is a folder in existing file and a session in workbook, session not merged.",
+                "/".join(path),
+            )
+            self._stats["conflicts"] += 1
+            self.__write_element(write, element, frame["level"] + 1)
+            return
+
+        self.__write_element(write, self._elements[path], frame["level"] + 1)
+        self._done.add(path)
+        self.__count(path, "updated")
+
+    def __get_frame(self, element, path: tuple, level: int, parent: dict | None = None) -> dict:
+        """Return streamed element state.
+
+        Frame of the empty folder level (parent is set) shares names of the
+        existing children with the parent frame.
+        """
+        return {
+            # existing element, path, indentation level
+            "element": element,
+            "path": path,
+            "level": level,
+            # start tag written, names of existing children, the last written child
+            "opened": False,
+            "seen": parent["seen"] if parent is not None else set(),
+            "transparent": parent is not None,
+            "last": None,
+            # has key children, has setting children
+            "keys": False,
+            "settings": False,
+        }
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def merge(self, xml_file: str, dst_file: str, atomic=True, compression: str | None = None) -> dict | None:
+        """Merge built document into existing SecureCRT XML file and write the result.
+
+        Existing file is parsed incrementally (ElementTree), processed
+        elements are released, so memory depends on the built document
+        and the deepest existing subtree only. Destination may be the
+        existing file (replaced atomically).
+
+        Args:
+            xml_file (str): Existing SecureCRT XML file (compressed file is read transparently)
+            dst_file (str): Destination file
+            atomic (bool, optional): Replace destination file atomically. Default: True.
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
+
+        Returns:
+            (dict): Merge statistics: sections (added, updated, kept entries), conflicts
+            None: In case of error (destination file is not written)
+        """
+        self._done = set()
+        self._stats = {"conflicts": 0}
+        for path in self._children[()]:
+            self.__count(path, "added", 0)
+
+        # the existing file events are merged on the fly (elements are removed from the tree)
+        events = SMXml().iterparse_xml_file(xml_file, events=("start", "end"), backend="etree")
+        try:
+            with open_output(dst_file, atomic=atomic, compression=compression) as file:
+                chunks = []
+
+                def write(text: str):
+                    chunks.append(text)
+                    if len(chunks) >= 4096:
+                        file.write("".join(chunks).encode("utf8"))
+                        chunks.clear()
+
+                write("<?xml version='1.0' encoding='utf8'?>\n")
+                if not self.__merge_stream(events, write):
+                    raise ValueError(f"Existing file '{xml_file}' is not complete")
+                file.write("".join(chunks).encode("utf8"))
+        except (OSError, ValueError) as err:
+            logging.error("Unable to merge sessions into '%s'", dst_file)
+            logging.error("%s", err)
+            return None
+
+        return self._stats
+
+    @staticmethod
+    def get_report_lines(stats: dict) -> list:
+        """Return merge statistics as text lines.
+
+        Args:
+            stats (dict): Merge statistics (see merge())
+        """
+        lines = []
+        for section, counts in stats.items():
+            if section == "conflicts":
+                continue
+            lines.append(
+                f"{section}: {counts['added']} added, {counts['updated']} updated, {counts['kept']} kept"
+            )
+        if stats["conflicts"]:
+            lines.append(f"{stats['conflicts']} folder/session conflict(s), see warnings")
+
+        return lines
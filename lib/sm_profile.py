@@ -0,0 +1,294 @@
+"""SessionMaker profiling module
+
+Class - SMProfiler:
+    Pipeline stages profiler (wall time, CPU time, row counts, cProfile dumps,
+    peak/retained memory).
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import cProfile
+import json
+import logging
+import os.path
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from .sm_xml import get_xml_backend
+
+
+# ========================================
+# Class SMProfiler
+# ========================================
+class SMProfiler:
+    """SessionMaker pipeline profiler.
+
+    Records wall time, CPU time and row count of every pipeline stage
+    (e.g. excel_load, normalize, build, serialize). When disabled, stages
+    are not measured at all.
+
+    Memory instrumentation (opt-in, slows the conversion down) records
+    Python heap peak and retained size (tracemalloc), process RSS peak
+    (sampled) and top allocation sites of every stage.
+
+    Attributes:
+        Public:
+            enabled (bool): Profiling is enabled.
+            profile_dir (str): Folder for cProfile dumps (one file per stage). Default: None (no dumps).
+            memory (bool): Memory instrumentation is enabled.
+            memory_top (int): Number of reported top allocation sites per stage.
+
+            info (dict): Run environment (e.g. XML backend), part of the report.
+
+        Private:
+            _stages (list): Recorded stages.
+    """
+
+    # RSS sampling period (seconds)
+    RSS_INTERVAL = 0.005
+
+    def __init__(
+        self,
+        enabled=False,
+        profile_dir: str | None = None,
+        memory=False,
+        memory_top=5,
+    ):
+        self.enabled = enabled or profile_dir is not None or memory
+        self.profile_dir = profile_dir
+        self.memory = memory
+        self.memory_top = memory_top
+        self.info = {"xml_backend": get_xml_backend()}
+        self._stages = []
+
+        if self.profile_dir is not None:
+            Path(self.profile_dir).mkdir(parents=True, exist_ok=True)
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def _get_rss(self) -> int | None:
+        """Return current process RSS (KiB) or None (unsupported platform)."""
+        try:
+            with open("/proc/self/statm", "r", encoding="utf8") as file:
+                pages = int(file.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _memory_start(self) -> dict:
+        """Start stage memory measurement (RSS sampler thread, heap snapshot)."""
+        state = {"stop": threading.Event(), "rss_peak": self._get_rss()}
+
+        def sample_rss():
+            while not state["stop"].wait(self.RSS_INTERVAL):
+                rss = self._get_rss()
+                if rss is not None and (state["rss_peak"] is None or rss > state["rss_peak"]):
+                    state["rss_peak"] = rss
+
+        if state["rss_peak"] is not None:
+            state["thread"] = threading.Thread(target=sample_rss, daemon=True)
+            state["thread"].start()
+
+        state["snapshot"] = tracemalloc.take_snapshot()
+        state["traced_start"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+        return state
+
+    def _memory_stop(self, state: dict) -> dict:
+        """Stop stage memory measurement and return memory record."""
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+
+        state["stop"].set()
+        if "thread" in state:
+            state["thread"].join()
+        rss = self._get_rss()
+        if rss is not None and (state["rss_peak"] is None or rss > state["rss_peak"]):
+            state["rss_peak"] = rss
+
+        # top allocation sites (allocated during the stage and still alive)
+        trace_filter = (tracemalloc.Filter(False, tracemalloc.__file__),)
+        statistics = snapshot.filter_traces(trace_filter).compare_to(
+            state["snapshot"].filter_traces(trace_filter), "lineno"
+        )
+        top = []
+        for stat in statistics[: self.memory_top]:
+            frame = stat.traceback[0]
+            top.append(
+                {
+                    "site": f"{frame.filename}:{frame.lineno}",
+                    "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff,
+                }
+            )
+
+        return {
+            "traced_peak_kb": round(traced_peak / 1024, 1),
+            "traced_retained_kb": round(traced_current / 1024, 1),
+            "traced_delta_kb": round((traced_current - state["traced_start"]) / 1024, 1),
+            "rss_peak_kb": state["rss_peak"],
+            "rss_kb": rss,
+            "top": top,
+        }
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        """Measure pipeline stage (context manager).
+
+        Yielded record (dict) may be updated inside the stage, e.g. record["rows"] = 10.
+
+        Args:
+            name (str): Stage name
+            rows (int, optional): Number of processed rows
+        """
+        record = {"stage": name, "rows": rows}
+        if not self.enabled:
+            yield record
+            return
+
+        profile = None
+        if self.profile_dir is not None:
+            profile = cProfile.Profile()
+
+        memory_state = None
+        if self.memory:
+            memory_state = self._memory_start()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record["wall_s"] = round(time.perf_counter() - wall_start, 6)
+            record["cpu_s"] = round(time.process_time() - cpu_start, 6)
+
+            if memory_state is not None:
+                record["memory"] = self._memory_stop(memory_state)
+
+            if profile is not None:
+                profile_file = os.path.join(
+                    self.profile_dir, "%02d-%s.prof" % (len(self._stages) + 1, name)
+                )
+                profile.dump_stats(profile_file)
+                record["profile_file"] = profile_file
+                logging.info("cProfile stats written to '%s'.", profile_file)
+
+            self._stages.append(record)
+
+    def get_report(self) -> dict:
+        """Return profiling report (stages and totals)."""
+        report = {
+            "info": self.info,
+            "stages": self._stages,
+            "total": {
+                "wall_s": round(sum(stage["wall_s"] for stage in self._stages), 6),
+                "cpu_s": round(sum(stage["cpu_s"] for stage in self._stages), 6),
+            },
+        }
+        if self.memory and self._stages:
+            report["total"]["traced_peak_kb"] = max(
+                stage["memory"]["traced_peak_kb"] for stage in self._stages
+            )
+            rss_peaks = [
+                stage["memory"]["rss_peak_kb"]
+                for stage in self._stages
+                if stage["memory"]["rss_peak_kb"] is not None
+            ]
+            report["total"]["rss_peak_kb"] = max(rss_peaks) if rss_peaks else None
+
+        return report
+
+    def print_report(self, file=None):
+        """Print profiling report as a table (default: stderr)."""
+        if not self.enabled:
+            return
+        if file is None:
+            file = sys.stderr
+
+        report = self.get_report()
+        print(", ".join(f"{key}: {value}" for key, value in report["info"].items()), file=file)
+        print(f"{'stage':<16} {'rows':>9} {'wall [s]':>10} {'cpu [s]':>10} {'rows/sec':>10}", file=file)
+        for stage in report["stages"]:
+            rows = stage["rows"] if stage["rows"] is not None else ""
+            rows_per_sec = ""
+            if stage["rows"] and stage["wall_s"] > 0:
+                rows_per_sec = "%.1f" % (stage["rows"] / stage["wall_s"])
+            print(
+                f"{stage['stage']:<16} {rows:>9} {stage['wall_s']:>10.4f} "
+                f"{stage['cpu_s']:>10.4f} {rows_per_sec:>10}",
+                file=file,
+            )
+        print(
+            f"{'total':<16} {'':>9} {report['total']['wall_s']:>10.4f} {report['total']['cpu_s']:>10.4f}",
+            file=file,
+        )
+
+        if not self.memory:
+            return
+
+        print("", file=file)
+        print(
+            f"{'stage':<16} {'heap peak':>10} {'retained':>10} {'RSS peak':>10} {'RSS':>10}",
+            file=file,
+        )
+        for stage in report["stages"]:
+            memory = stage["memory"]
+            print(
+                f"{stage['stage']:<16} {self._format_kb(memory['traced_peak_kb']):>10} "
+                f"{self._format_kb(memory['traced_retained_kb']):>10} "
+                f"{self._format_kb(memory['rss_peak_kb']):>10} {self._format_kb(memory['rss_kb']):>10}",
+                file=file,
+            )
+        for stage in report["stages"]:
+            print(f"\nTop allocation sites ({stage['stage']}):", file=file)
+            for site in stage["memory"]["top"]:
+                print(
+                    f"  {self._format_kb(site['size_kb']):>10} {site['count']:>8}  {site['site']}",
+                    file=file,
+                )
+
+    def _format_kb(self, size_kb) -> str:
+        """Return KiB value as a human readable string."""
+        if size_kb is None:
+            return "-"
+        if abs(size_kb) >= 1024:
+            return "%.1fM" % (size_kb / 1024)
+        return "%.1fK" % size_kb
+
+    def write_json(self, json_file: str) -> None:
+        """Write profiling report to JSON file."""
+        if not self.enabled:
+            return
+
+        dst = os.path.split(json_file)
+        if dst[0] != "" and os.path.isdir(dst[0]) is False:
+            logging.info("Creating subfolder '%s'.", dst[0])
+            Path(dst[0]).mkdir(parents=True, exist_ok=True)
+
+        logging.info("Writing profiling report '%s'.", json_file)
+        with open(json_file, "w", encoding="utf8") as file:
+            json.dump(self.get_report(), file, indent=4)
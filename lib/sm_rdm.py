@@ -1,10 +1,17 @@
 """Devolutions Remote Desktop Manager (RDM) session generator"""
 
+import io
+import json
 import logging
 import xml.etree.ElementTree as ET
 import uuid
 from .sm_class import SessionMaker
+from .sm_json import SMJson
 from .sm_xml import SMXml
+from .fileio import open_input, open_output
+
+# namespace of stable connection IDs (see set_stable_ids())
+RDM_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "sessionmaker:rdm")
 
 
 # ========================================
@@ -61,7 +68,15 @@ class SMDevolutionsRdm(SessionMaker):
         self.json_file = ""
         self._json_sessions = {}
         self._json_hosts = {}
-        self.__rdm_connection_list = []
+        # built connections are kept in a per-call build context (see __new_build_context())
+        self._json_read_stats = {}
+        self._json_read_complete = False
+        # stable IDs (derived from path)
+        self.__rdm_stable_ids = False
+
+        # existing RDM export (upsert by path): connections, (type, group, name): position
+        self._existing_connections = None
+        self._existing_index = {}
         self.set_json_file(json_file, read_json_file=False)
 
     # ========================================
@@ -192,18 +207,17 @@ class SMDevolutionsRdm(SessionMaker):
         return True
 
     def set_json_file(self, json_file: str | None = None, read_json_file=False):
-        """Set JSON file attribute. If read_json_file is True, read content.
+        """Set JSON file attribute.
+
+        JSON content is not read at once, use iter_rows_from_json() or
+        write_excel_stream() to read it incrementally.
 
         Args:
             json_file (str): JSON file (source or destination)
-            read_json_file (Bool): if True - read JSON file content
+            read_json_file (Bool): not used (streaming reader)
         """
         self.json_file = json_file
 
-        # if self.json_file != "" and read_json_file:
-        #     # self._xml_obj = SMXml(xml_file=self.xml_file, read_xml_file=True)
-        #     self.parse_xml_file()
-
     def set_sessions_dict(self, sessions=None) -> bool:
         """Set (Devolutions RDM specific fields) session dictionary. If not set, initiate it.
 
@@ -345,6 +359,10 @@ class SMDevolutionsRdm(SessionMaker):
 
     ### public methods
 
+    def get_rdm_hosts_dict(self):
+        """Return hosts dictionary (ordered dict)."""
+        return self._rdm_hosts_dict
+
     def get_rdm_hosts_dict_count(self):
         """Return credentials dictionary size (int)."""
         return len(self._rdm_hosts_dict["name"])
@@ -425,6 +443,239 @@ class SMDevolutionsRdm(SessionMaker):
 
         return self._sessions_dict
 
+    def __json_get_path(self, group, name) -> str:
+        """Return connection path ("folder/name") from RDM Group and Name."""
+        group = "" if group is None else str(group).replace("\\", "/").rstrip("/")
+        name = "" if name is None else str(name)
+        if group == "":
+            return name
+        return group + "/" + name
+
+    def __json_get_value(self, conn_obj: dict, *keys) -> str:
+        """Return nested value of the connection object as string ("" if not set)."""
+        value = conn_obj
+        for key in keys:
+            if not isinstance(value, dict):
+                return ""
+            value = value.get(key)
+        if value is None:
+            return ""
+        return str(value)
+
+    def __json_get_row(self, conn_obj: dict) -> tuple:
+        """Return Excel row of the RDM connection object.
+
+        Returns:
+            (tuple): (sheet_key, row_dict, references) or (None, None, None) for
+                unsupported connection types. References are pairs (row key,
+                connection ID), resolved by the caller.
+        """
+        conn_type = conn_obj.get("ConnectionType")
+        folder = self.__json_get_value(conn_obj, "Group").replace("\\", "/")
+        name = self.__json_get_value(conn_obj, "Name")
+        get = self.__json_get_value
+        references = []
+
+        if conn_type == 26:
+            # credential
+            row = {
+                "folder": folder,
+                "credential": name,
+                "username": get(conn_obj, "Credentials", "UserName"),
+            }
+            return "rdm_credentials", row, references
+
+        if conn_type == 53:
+            # host
+            row = {
+                "folder": folder,
+                "name": name,
+                "host": get(conn_obj, "HostDetails", "Host"),
+                "rdm_vault": get(conn_obj, "CredentialConnectionSavedPath").replace("\\", "/"),
+            }
+            if row["rdm_vault"] == "" and get(conn_obj, "CredentialConnectionID"):
+                references.append(("rdm_vault", get(conn_obj, "CredentialConnectionID")))
+            return "rdm_hosts", row, references
+
+        if conn_type == 77:
+            # ssh session
+            row = {
+                "folder": folder,
+                "session": name,
+                "type": "ssh",
+                "hostname": get(conn_obj, "Terminal", "Host"),
+                "port": get(conn_obj, "Terminal", "HostPort"),
+                "username": get(conn_obj, "Terminal", "Username"),
+                "rdm_credential": get(conn_obj, "CredentialConnectionSavedPath"),
+                "rdm_host": get(conn_obj, "HostConnectionSavedPath"),
+            }
+            credential_id = get(conn_obj, "CredentialConnectionID")
+            host_id = get(conn_obj, "HostConnectionID")
+        elif conn_type == 1:
+            # rdp session
+            row = {
+                "folder": folder,
+                "session": name,
+                "type": "rdp",
+                "hostname": get(conn_obj, "Url"),
+                "port": get(conn_obj, "Port"),
+                "username": get(conn_obj, "RDP", "Username"),
+                "rdp_alternate": get(conn_obj, "AlternateShell"),
+                "rdm_credential": get(conn_obj, "CredentialConnectionSavedPath"),
+                "rdm_host": "",
+            }
+            credential_id = get(conn_obj, "CredentialConnectionID")
+            host_id = ""
+        elif conn_type == 32:
+            # web session
+            row = {
+                "folder": folder,
+                "session": name,
+                "type": "web",
+                "hostname": get(conn_obj, "DataEntry", "Url"),
+                "username": get(conn_obj, "DataEntry", "WebUserName"),
+                "rdm_credential": "",
+                "rdm_host": "",
+                "rdm_web_form": get(conn_obj, "DataEntry", "WebFormIdHtmlElementName"),
+                "rdm_web_login": get(conn_obj, "DataEntry", "WebUsernameHtmlElementName"),
+                "rdm_web_passwd": get(conn_obj, "DataEntry", "WebPasswordHtmlElementName"),
+            }
+            credential_id = get(conn_obj, "DataEntry", "CredentialConnectionID")
+            host_id = ""
+        else:
+            return None, None, None
+
+        row["rdm_credential"] = row["rdm_credential"].replace("\\", "/")
+        row["rdm_host"] = row["rdm_host"].replace("\\", "/")
+        if row["rdm_credential"] == "" and credential_id:
+            references.append(("rdm_credential", credential_id))
+        if row["rdm_host"] == "" and host_id:
+            references.append(("rdm_host", host_id))
+
+        return "sessions", row, references
+
+    def iter_rows_from_json(self, json_file: str | None = None):
+        """Read Devolutions RDM JSON file incrementally and yield Excel rows.
+
+        'Connections' array items are decoded one by one and classified by
+        ConnectionType (25 folder, 26 credential, 53 host, 77 ssh, 1 rdp,
+        32 web). References (credential, host) are resolved through
+        connection ID index. Rows referencing connection not read yet are
+        deferred and yielded at the end (memory usage depends on the number
+        of credentials/hosts and forward references only).
+
+        Read statistics (folders, unsupported, unresolved) are available
+        by get_json_read_stats().
+
+        Args:
+            json_file (str, optional): RDM JSON file. If not set, use self.json_file.
+
+        Yields:
+            (tuple): Pair (sheet_key, row_dict), where sheet_key is one of
+                'sessions', 'rdm_credentials', 'rdm_hosts'.
+        """
+        if json_file is None:
+            json_file = self.json_file
+
+        # connection ID: connection path (credentials and hosts)
+        connection_paths = {}
+        # rows with forward references (sheet_key, row, references)
+        deferred = []
+        self._json_read_stats = {"folders": 0, "unsupported": 0, "unresolved": 0}
+        self._json_read_complete = False
+
+        json_obj = SMJson()
+        for conn_obj in json_obj.iterparse_json_array(json_file, "Connections"):
+            if not isinstance(conn_obj, dict):
+                self._json_read_stats["unsupported"] += 1
+                continue
+            if conn_obj.get("ConnectionType") == 25:
+                # folders are part of the rows folder path
+                self._json_read_stats["folders"] += 1
+                continue
+
+            sheet_key, row, references = self.__json_get_row(conn_obj)
+            if row is None:
+                logging.debug(
+                    "Unsupported connection type '%s' (%s). Skipping.",
+                    conn_obj.get("ConnectionType"),
+                    conn_obj.get("Name"),
+                )
+                self._json_read_stats["unsupported"] += 1
+                continue
+
+            if conn_obj.get("ConnectionType") in (26, 53) and conn_obj.get("ID"):
+                connection_paths[conn_obj["ID"]] = self.__json_get_path(
+                    conn_obj.get("Group"), conn_obj.get("Name")
+                )
+
+            unresolved = []
+            for key, connection_id in references:
+                if connection_id in connection_paths:
+                    row[key] = connection_paths[connection_id]
+                else:
+                    unresolved.append((key, connection_id))
+
+            if unresolved:
+                deferred.append((sheet_key, row, unresolved))
+            else:
+                yield sheet_key, row
+
+        self._json_read_complete = json_obj.is_read_complete()
+        for sheet_key, row, references in deferred:
+            for key, connection_id in references:
+                if connection_id in connection_paths:
+                    row[key] = connection_paths[connection_id]
+                else:
+                    logging.warning(
+                        "Connection ID '%s' (%s of '%s') not found.",
+                        connection_id,
+                        key,
+                        row.get("session", row.get("name", "")),
+                    )
+                    self._json_read_stats["unresolved"] += 1
+            yield sheet_key, row
+
+    def get_json_sessions(self) -> dict:
+        """Return built (or merged) JSON content (see build_json_from_dict(), merge_existing_json())."""
+        return self._json_sessions
+
+    def is_json_read_complete(self) -> bool:
+        """Return True if the last iter_rows_from_json() read the whole file (no parse error)."""
+        return self._json_read_complete
+
+    def get_json_read_stats(self) -> dict:
+        """Return statistics of the last iter_rows_from_json() (folders, unsupported, unresolved)."""
+        return self._json_read_stats
+
+    def __iter_complete_rows(self):
+        """Yield rows of iter_rows_from_json(), raise ValueError when the JSON file is not parsed completely."""
+        yield from self.iter_rows_from_json()
+        if not self.is_json_read_complete():
+            raise ValueError(f"Source file '{self.json_file}' is not complete")
+
+    def write_excel_stream(self, rows=None, excel_file=None) -> dict:
+        """Write records to Excel file as they come (see iter_rows_from_json()).
+
+        Args:
+            rows (iterable, default: self.iter_rows_from_json()): (sheet_key, row_dict) pairs
+            excel_file (str, default: self.excel_file): Excel file to write content
+
+        Returns:
+            (dict): Number of written rows per sheet key.
+            None: Source file is not complete or in case of error (Excel file is not written)
+        """
+        if rows is None:
+            rows = self.__iter_complete_rows()
+        if excel_file is None:
+            excel_file = self.excel_file
+
+        return self._excel_obj.write_excel_book_stream(
+            rows,
+            excel_file=excel_file,
+            sheet_keys=["sessions", "rdm_credentials", "rdm_hosts"],
+        )
+
     def write_excel(self, **kwargs):
         excel_file = str(kwargs.get("excel_file", self.excel_file))
         credentials_dict = kwargs.get("credentials_dict", self._credentials_dict)
@@ -444,7 +695,7 @@ class SMDevolutionsRdm(SessionMaker):
 
     ### private methods
 
-    def __build_rdm_connection_folder(self, **kwargs):
+    def __build_rdm_connection_folder(self, ctx: dict, **kwargs):
         """Set RDM connection folder (type 25).
 
         Check if parent exists, if not, create it (recursively).
@@ -461,7 +712,7 @@ class SMDevolutionsRdm(SessionMaker):
         folder_list = folder.split("\\")
         folder_name = folder_list[-1]
         if len(folder_list) > 1:
-            self.__build_rdm_connection_folder(folder="\\".join(folder_list[0:-1]))
+            self.__build_rdm_connection_folder(ctx, folder="\\".join(folder_list[0:-1]))
 
         # build folder object
         conn_obj = dict()
@@ -469,15 +720,12 @@ class SMDevolutionsRdm(SessionMaker):
         conn_obj["Group"] = folder
         conn_obj["Name"] = folder_name
 
-        # check if folder dict exists
-        if conn_obj in self.__rdm_connection_list:
-            return
-
-        #  append folder dict to self.__rdm_connection_list
-        self.__rdm_connection_list.append(conn_obj)
+        # add (if not exists)
+        self.__add_rdm_connection(ctx, conn_obj)
 
     def __build_rdm_connection_rdp_session(
         self,
+        ctx: dict,
         folder="",
         session="",
         hostname="",
@@ -490,7 +738,7 @@ class SMDevolutionsRdm(SessionMaker):
     ):
         """Set RDM RDP session (type 1)
 
-        Check if RDP session not exists in self.__rdm_connection_list and add it.
+        Check if RDP session not exists in the build context and add it.
 
         Args:
             folder (str, optional, default=""): folder path
@@ -504,7 +752,7 @@ class SMDevolutionsRdm(SessionMaker):
 
         # arguments
         # folder = kwargs.get("folder", "")
-        self.__build_rdm_connection_folder(folder=folder)
+        self.__build_rdm_connection_folder(ctx, folder=folder)
         # session = kwargs.get("session", "")
         # hostname = kwargs.get("hostname", "")
         # port = kwargs.get("port", "3389")
@@ -540,17 +788,15 @@ class SMDevolutionsRdm(SessionMaker):
         # credential
         if rdm_credential != "":
             conn_obj["CredentialConnectionSavedPath"] = rdm_credential
-            credential_uuid = self.__get_rdm_connection_uuid(rdm_credential)
+            credential_uuid = self.__get_rdm_connection_uuid(ctx, rdm_credential)
             conn_obj["CredentialConnectionID"] = credential_uuid
 
-        # check duplicity
-        if conn_obj in self.__rdm_connection_list:
-            return
-
-        self.__rdm_connection_list.append(conn_obj)
+        # add (if not exists)
+        self.__add_rdm_connection(ctx, conn_obj)
 
     def __build_rdm_connection_ssh_session(
         self,
+        ctx: dict,
         folder="",
         session="",
         hostname="",
@@ -562,7 +808,7 @@ class SMDevolutionsRdm(SessionMaker):
     ):
         """Set RDM SSH session (type 77)
 
-        Check if SSH session not exists in self.__rdm_connection_list and add it.
+        Check if SSH session not exists in the build context and add it.
 
         Args:
             folder (str, optional, default=""): folder path
@@ -572,7 +818,7 @@ class SMDevolutionsRdm(SessionMaker):
         """
         # arguments
         # folder = kwargs.get("folder", "")
-        self.__build_rdm_connection_folder(folder=folder)
+        self.__build_rdm_connection_folder(ctx, folder=folder)
         # session = kwargs.get("session", "")
         # hostname = kwargs.get("hostname", "")
         # port = kwargs.get("port", "")
@@ -602,7 +848,7 @@ class SMDevolutionsRdm(SessionMaker):
         # if username == "" and credential != "":
         if rdm_credential != "":
             conn_obj["CredentialConnectionSavedPath"] = rdm_credential
-            credential_uuid = self.__get_rdm_connection_uuid(rdm_credential)
+            credential_uuid = self.__get_rdm_connection_uuid(ctx, rdm_credential)
             conn_obj["CredentialConnectionID"] = credential_uuid
 
         # host
@@ -610,19 +856,16 @@ class SMDevolutionsRdm(SessionMaker):
             # reference to host object
             conn_obj["HostSourceMode"] = 1            
             conn_obj["HostConnectionSavedPath"] = rdm_host
-            host_uuid = self.__get_rdm_connection_uuid(rdm_host)
+            host_uuid = self.__get_rdm_connection_uuid(ctx, rdm_host, ref_type=53)
             conn_obj["HostConnectionID"] = host_uuid
 
-        # check duplicity
-        if conn_obj in self.__rdm_connection_list:
-            return
+        # add (if not exists)
+        self.__add_rdm_connection(ctx, conn_obj)
 
-        self.__rdm_connection_list.append(conn_obj)
-
-    def __build_rdm_connection_web_session(self, **kwargs):
+    def __build_rdm_connection_web_session(self, ctx: dict, **kwargs):
         """Set RDM Web based session (type 32)
 
-        Check if Web session not exists in self.__rdm_connection_list and add it.
+        Check if Web session not exists in the build context and add it.
 
         Args:
             folder (str, optional, default=""): folder path
@@ -636,7 +879,7 @@ class SMDevolutionsRdm(SessionMaker):
         """
         # arguments
         folder = kwargs.get("folder", "")
-        self.__build_rdm_connection_folder(folder=folder)
+        self.__build_rdm_connection_folder(ctx, folder=folder)
         session = kwargs.get("session", "")
         hostname = kwargs.get("hostname", "")
         username = kwargs.get("username", "")
@@ -675,42 +918,109 @@ class SMDevolutionsRdm(SessionMaker):
         # credential
         if credential != "":
             # conn_obj["DataEntry"]["CredentialConnectionSavedPath"] = credential
-            credential_uuid = self.__get_rdm_connection_uuid(credential)
+            credential_uuid = self.__get_rdm_connection_uuid(ctx, credential)
             conn_obj["DataEntry"]["CredentialConnectionID"] = credential_uuid
 
-        # check duplicity
-        if conn_obj in self.__rdm_connection_list:
-            return
-
-        self.__rdm_connection_list.append(conn_obj)
+        # add (if not exists)
+        self.__add_rdm_connection(ctx, conn_obj)
 
-    def __get_rdm_connection_uuid(self, connection_path):
+    def __get_rdm_connection_uuid(self, ctx: dict, connection_path, ref_type=26):
         """Return UUID of the connection based on full path.
 
+        Built credentials and hosts are found by index, connections of the
+        existing RDM export (see set_existing_json()) are used when the path
+        is not built. With stable IDs, ID of the connection not built yet is
+        derived from the path.
+
         Args:
+            ctx (dict): Build context (see __new_build_context())
             connection_path (str):Connection name including folder path.
+            ref_type (int, optional): Type of referenced connection (26=credential, 53=host). Default: 26.
 
         Return:
             UUID of the connection record
         """
         conn_path_list = connection_path.split("\\")
-        for conn_obj in self.__rdm_connection_list:
-            if (
-                conn_obj["Group"].rstrip("\\") == "\\".join(conn_path_list[0:-1])
-                and conn_obj["Name"] == conn_path_list[-1]
-            ):
-                if conn_obj["ConnectionType"] == 26:
-                    # credential obj
-                    return conn_obj["ID"]
-
-                if conn_obj["ConnectionType"] == 53:
-                    # host obj
-                    return conn_obj["ID"]
-
-    def __build_rdm_connection_credential(self, folder="", credential="", username=""):
+        group = "\\".join(conn_path_list[0:-1])
+        conn_id = ctx["ids"].get((group, conn_path_list[-1]))
+        if conn_id is not None:
+            return conn_id
+
+        for conn_type in (26, 53):
+            position = self._existing_index.get((conn_type, group.strip("\\"), conn_path_list[-1]))
+            if position is not None:
+                return self._existing_connections[position].get("ID")
+
+        if self.__rdm_stable_ids:
+            # not built (yet), the same ID as the connection gets when built
+            return self.__get_stable_id(ref_type, group, conn_path_list[-1])
+
+    def __get_stable_id(self, conn_type: int, group: str, name: str, key="ID") -> str:
+        """Return stable ID of the connection (UUID derived from type and path)."""
+        path = group.replace("/", "\\").strip("\\") + "\\" + name
+        return str(uuid.uuid5(RDM_ID_NAMESPACE, f"{key}:{conn_type}:{path}"))
+
+    def __new_connection_id(self, conn_obj: dict, key="ID") -> str:
+        """Return ID of new connection: existing ID, stable ID or random UUID."""
+        conn_id = self.__get_existing_value(conn_obj, key)
+        if conn_id:
+            return conn_id
+        if self.__rdm_stable_ids:
+            return self.__get_stable_id(conn_obj["ConnectionType"], conn_obj["Group"], conn_obj["Name"], key)
+        return str(uuid.uuid4())
+
+    def __new_build_context(self, stream=False) -> dict:
+        """Return new build context (state of one build call).
+
+        Every build (build_json_from_dict(), iter_json_connections()) works
+        with its own context, the object keeps configuration and sources
+        only. So builds of the same object do not share output and the
+        object may serve concurrent builds (threads).
+
+        Args:
+            stream (bool, optional): Streaming build (folders checked for duplicities only). Default: False.
+        """
+        return {
+            # built connections
+            "connections": [],
+            # canonical JSON of built connections (duplicities)
+            "keys": set(),
+            # (group, name): ID of built credentials and hosts (references)
+            "ids": {},
+            "stream": stream,
+        }
+
+    def __add_rdm_connection(self, ctx: dict, conn_obj: dict):
+        """Add connection to the build context connections (if the same connection not exists).
+
+        Credentials and hosts are indexed by path (see __get_rdm_connection_uuid()).
+        """
+        if ctx["stream"] and conn_obj["ConnectionType"] != 25:
+            # streaming build: rows are unique paths, only folders are checked
+            ctx["connections"].append(conn_obj)
+        else:
+            conn_key = json.dumps(conn_obj, sort_keys=True)
+            if conn_key in ctx["keys"]:
+                return
+            ctx["keys"].add(conn_key)
+            ctx["connections"].append(conn_obj)
+
+        if conn_obj["ConnectionType"] in (26, 53):
+            ctx["ids"].setdefault(
+                (conn_obj["Group"].rstrip("\\"), conn_obj["Name"]), conn_obj["ID"]
+            )
+
+    def __get_existing_value(self, conn_obj: dict, key: str, default=None):
+        """Return value of the same connection (type, group, name) in existing RDM export."""
+        position = self._existing_index.get(self.__get_connection_key(conn_obj))
+        if position is None:
+            return default
+        return self._existing_connections[position].get(key, default)
+
+    def __build_rdm_connection_credential(self, ctx: dict, folder="", credential="", username=""):
         """Set RDM Credential (type 26)
 
-        Check if credential not exists in self.__rdm_connection_list and add it.
+        Check if credential not exists in the build context and add it.
 
         Args:
             folder (str, optional, default=""): folder path
@@ -718,7 +1028,7 @@ class SMDevolutionsRdm(SessionMaker):
             username (str, optional, default: ""): username
         """
         # arguments
-        self.__build_rdm_connection_folder(folder=folder)
+        self.__build_rdm_connection_folder(ctx, folder=folder)
         # credential = kwargs.get("credential", "")
         # username = kwargs.get("username", "")
 
@@ -731,19 +1041,17 @@ class SMDevolutionsRdm(SessionMaker):
         conn_obj["ConnectionType"] = 26
         conn_obj["Group"] = folder
         conn_obj["Name"] = credential
-        conn_obj["CredentialConnectionID"] = str(uuid.uuid4())
-        conn_obj["ID"] = str(uuid.uuid4())
+        # existing credential keeps its IDs (see set_existing_json())
+        conn_obj["CredentialConnectionID"] = self.__new_connection_id(conn_obj, "CredentialConnectionID")
+        conn_obj["ID"] = self.__new_connection_id(conn_obj)
         conn_obj["Credentials"] = {}
         if username != "":
             conn_obj["Credentials"]["UserName"] = username
 
-        # check duplicity
-        if conn_obj in self.__rdm_connection_list:
-            return
-
-        self.__rdm_connection_list.append(conn_obj)
+        # add (if not exists)
+        self.__add_rdm_connection(ctx, conn_obj)
 
-    def __build_rdm_connection_host(self, folder="", name="", host="", rdm_vault=""):
+    def __build_rdm_connection_host(self, ctx: dict, folder="", name="", host="", rdm_vault=""):
         """
         Builds a Connection object type Host (type 53).
 
@@ -760,7 +1068,7 @@ class SMDevolutionsRdm(SessionMaker):
         # build Host object (type 53)
 
         # arguments
-        self.__build_rdm_connection_folder(folder=folder)
+        self.__build_rdm_connection_folder(ctx, folder=folder)
 
         # rdm_vault
         # rdm_vault=self._rdm_hosts_dict["rdm_vault"][idx]
@@ -775,8 +1083,9 @@ class SMDevolutionsRdm(SessionMaker):
         conn_obj["ConnectionType"] = 53
         conn_obj["Group"] = folder
         conn_obj["Name"] = name
-        # generate unique UUID (when using in other connection types)
-        conn_obj["ID"] = str(uuid.uuid4())
+        # generate unique UUID (when using in other connection types),
+        # existing host keeps its ID (see set_existing_json())
+        conn_obj["ID"] = self.__new_connection_id(conn_obj)
         # host/ip
         conn_obj["HostDetails"] = {}
         if host != "":
@@ -784,114 +1093,346 @@ class SMDevolutionsRdm(SessionMaker):
         # credential (if defined)
         if rdm_vault != "":
             conn_obj["CredentialConnectionSavedPath"] = rdm_vault
-            credential_uuid = self.__get_rdm_connection_uuid(rdm_vault)
+            credential_uuid = self.__get_rdm_connection_uuid(ctx, rdm_vault)
             conn_obj["CredentialConnectionID"] = credential_uuid
 
-        # check duplicity
-        if conn_obj in self.__rdm_connection_list:
-            return
+        # add (if not exists)
+        self.__add_rdm_connection(ctx, conn_obj)
 
-        self.__rdm_connection_list.append(conn_obj)
+    def __build_rdm_connection_session(self, ctx: dict, row: dict):
+        """Set RDM session (ssh, rdp, web) from session row (dict, keys of sessions dict)."""
+        folder_path = row.get("folder", "").replace("/", "\\")
+        session_type = row.get("type", "")
 
-    def __sessions_dict_to_json_connections(self):
-        """Set __rdm_connection_list from _sessions_dict"""
+        # ssh session (#77)
+        if session_type == "ssh":
+            self.__build_rdm_connection_ssh_session(
+                ctx,
+                folder=folder_path,
+                session=row.get("session", ""),
+                hostname=row.get("hostname", ""),
+                port=row.get("port", ""),
+                username=row.get("username", ""),
+                rdm_credential=row.get("rdm_credential", ""),
+                rdm_host=row.get("rdm_host", ""),
+            )
 
-        # get folder path and session in a loop
-        for idx, session_row in enumerate(self._sessions_dict["session"]):
-            # get folders structure
-            folder_path = self._sessions_dict["folder"][idx]
-            folder_path = folder_path.replace("/", "\\")
-            session_type = self._sessions_dict["type"][idx]
-
-            # ssh session (#77)
-            if session_type == "ssh":
-                self.__build_rdm_connection_ssh_session(
-                    folder=folder_path,
-                    session=self._sessions_dict["session"][idx],
-                    hostname=self._sessions_dict["hostname"][idx],
-                    port=self._sessions_dict["port"][idx],
-                    username=self._sessions_dict["username"][idx],
-                    rdm_credential=self._sessions_dict["rdm_credential"][idx],
-                    rdm_host=self._sessions_dict["rdm_host"][idx],
-                )
+        # rdp session (#1)
+        if session_type == "rdp":
+            self.__build_rdm_connection_rdp_session(
+                ctx,
+                folder=folder_path,
+                session=row.get("session", ""),
+                hostname=row.get("hostname", ""),
+                port=row.get("port", ""),
+                username=row.get("username", ""),
+                rdm_credential=row.get("rdm_credential", ""),
+                alternate_shell=row.get("rdp_alternate", ""),
+            )
 
-            # rdp session (#1)
-            if session_type == "rdp":
-                self.__build_rdm_connection_rdp_session(
-                    folder=folder_path,
-                    session=self._sessions_dict["session"][idx],
-                    hostname=self._sessions_dict["hostname"][idx],
-                    port=self._sessions_dict["port"][idx],
-                    username=self._sessions_dict["username"][idx],
-                    rdm_credential=self._sessions_dict["rdm_credential"][idx],
-                    alternate_shell=self._sessions_dict["rdp_alternate"][idx],
-                )
+        # web session (#32)
+        if session_type == "web":
+            self.__build_rdm_connection_web_session(
+                ctx,
+                folder=folder_path,
+                session=row.get("session", ""),
+                hostname=row.get("hostname", ""),
+                port=row.get("port", ""),
+                username=row.get("username", ""),
+                credential=row.get("rdm_credential", ""),
+                web_form=row.get("rdm_web_form", ""),
+                web_login=row.get("rdm_web_login", ""),
+                web_passwd=row.get("rdm_web_passwd", ""),
+            )
 
-            # web session (#32)
-            if session_type == "web":
-                self.__build_rdm_connection_web_session(
-                    folder=folder_path,
-                    session=self._sessions_dict["session"][idx],
-                    hostname=self._sessions_dict["hostname"][idx],
-                    port=self._sessions_dict["port"][idx],
-                    username=self._sessions_dict["username"][idx],
-                    credential=self._sessions_dict["rdm_credential"][idx],
-                    web_form=self._sessions_dict["rdm_web_form"][idx],
-                    web_login=self._sessions_dict["rdm_web_login"][idx],
-                    web_passwd=self._sessions_dict["rdm_web_passwd"][idx],
-                )
+    def __sessions_dict_to_json_connections(self, ctx: dict, sessions_dict: dict):
+        """Add connections of sessions dict to the build context"""
 
-    def __credentials_dict_to_json_connections(self):
-        """Set __rdm_connection_list from _credentials_dict"""
+        # get session rows in a loop
+        keys = list(sessions_dict)
+        for values in zip(*sessions_dict.values()):
+            self.__build_rdm_connection_session(ctx, dict(zip(keys, values)))
+
+    def __credentials_dict_to_json_connections(self, ctx: dict, credentials_dict: dict):
+        """Add connections of credentials dict to the build context"""
+        if not credentials_dict:
+            return
 
         # get credentials/credentials in a loop
-        for idx, vault_row in enumerate(self._credentials_dict["credential"]):
+        for idx, vault_row in enumerate(credentials_dict["credential"]):
             # get folders structure
-            folder_path = self._credentials_dict["folder"][idx]
+            folder_path = credentials_dict["folder"][idx]
             folder_path = folder_path.replace("/", "\\")
 
             # credential (#26)
             self.__build_rdm_connection_credential(
+                ctx,
                 folder=folder_path,
-                credential=self._credentials_dict["credential"][idx],
-                username=self._credentials_dict["username"][idx],
+                credential=credentials_dict["credential"][idx],
+                username=credentials_dict["username"][idx],
             )
 
-        return self.__rdm_connection_list
-
-    def __rdm_hosts_dict_to_json_connections(self):
-        """Set __rdm_connection_list from _rdm_hosts_dict"""
+    def __rdm_hosts_dict_to_json_connections(self, ctx: dict, hosts_dict: dict):
+        """Add connections of hosts dict to the build context"""
+        if not hosts_dict:
+            return
 
         # get credentials/credentials in a loop
-        for idx, host_row in enumerate(self._rdm_hosts_dict["name"]):
+        for idx, host_row in enumerate(hosts_dict["name"]):
             # get folders structure
-            folder_path = self._rdm_hosts_dict["folder"][idx]
+            folder_path = hosts_dict["folder"][idx]
             folder_path = folder_path.replace("/", "\\")
 
             # host (#53)
             self.__build_rdm_connection_host(
+                ctx,
                 folder=folder_path,
-                name=self._rdm_hosts_dict["name"][idx],
-                host=self._rdm_hosts_dict["host"][idx],
-                rdm_vault=self._rdm_hosts_dict["rdm_vault"][idx],
+                name=hosts_dict["name"][idx],
+                host=hosts_dict["host"][idx],
+                rdm_vault=hosts_dict["rdm_vault"][idx],
             )
 
-        return self.__rdm_connection_list
-
     ### public methods
 
-    def build_json_from_dict(self):
+    def build_json_from_dict(self, **kwargs):
         """Build DevolutionsRDM JSON content.
         Method set's attribute self._json_sessions.
 
+        Every call builds into its own build context, so repeated builds
+        do not duplicate connections and concurrent builds (threads) of
+        the same object do not share output. Pass the source dicts to
+        build other content than the object's dicts.
+
+        Args:
+            sessions_dict (dict, optional): Sessions dict. Default: self._sessions_dict.
+            credentials_dict (dict, optional): Credentials dict. Default: self._credentials_dict.
+            hosts_dict (dict, optional): Hosts dict. Default: self._rdm_hosts_dict.
+
         Returns:
             (dict()): JSON content of sessions for importing to Devolutions RDM.
         """
+        ctx = self.__new_build_context()
 
-        self.__credentials_dict_to_json_connections()
-        self.__rdm_hosts_dict_to_json_connections()
-        self.__sessions_dict_to_json_connections()
-        self._json_sessions = dict()
-        self._json_sessions["Connections"] = self.__rdm_connection_list
+        self.__credentials_dict_to_json_connections(
+            ctx, kwargs.get("credentials_dict", self._credentials_dict)
+        )
+        self.__rdm_hosts_dict_to_json_connections(ctx, kwargs.get("hosts_dict", self._rdm_hosts_dict))
+        self.__sessions_dict_to_json_connections(ctx, kwargs.get("sessions_dict", self._sessions_dict))
 
-        return self._json_sessions
+        json_sessions = {"Connections": ctx["connections"]}
+        self._json_sessions = json_sessions
+
+        return json_sessions
+
+    # ====================
+    # Existing RDM export (upsert by path)
+    # ====================
+
+    ### private methods
+
+    @staticmethod
+    def __get_connection_key(conn_obj: dict) -> tuple:
+        """Return connection index key (ConnectionType, Group, Name)."""
+        group = str(conn_obj.get("Group") or "").replace("/", "\\").strip("\\")
+        return conn_obj.get("ConnectionType"), group, conn_obj.get("Name")
+
+    def __merge_connection(self, existing: dict, built: dict) -> dict:
+        """Return existing connection updated with built connection values (recursively).
+
+        Values which are not set by the build (e.g. edited in RDM) are kept.
+        """
+        merged = dict(existing)
+        for key, value in built.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = self.__merge_connection(merged[key], value)
+            else:
+                merged[key] = value
+
+        return merged
+
+    ### public methods
+
+    def set_existing_json(self, json_file: str) -> bool:
+        """Read existing Devolutions RDM JSON export and index it by path.
+
+        Connections are indexed by (ConnectionType, Group, Name), the first
+        connection of the path wins. Built credentials and hosts of the same
+        path keep their existing IDs, so references of other connections
+        (in the export and in RDM) stay valid. See merge_existing_json().
+
+        Args:
+            json_file (str): Existing RDM JSON file (compressed file is read transparently)
+
+        Returns:
+            True: When the export is read
+            False: If not
+        """
+        try:
+            with io.TextIOWrapper(open_input(json_file), encoding="utf-8-sig") as file:
+                content = json.load(file)
+        except json.JSONDecodeError as err:
+            logging.error("Unable to parse JSON file '%s'", json_file)
+            logging.error("%s", err)
+            return False
+        except (OSError, UnicodeDecodeError) as err:
+            logging.error("Unable to read JSON file '%s'", json_file)
+            logging.error("%s", err)
+            return False
+
+        connections = content.get("Connections") if isinstance(content, dict) else None
+        if not isinstance(connections, list):
+            logging.error("JSON file '%s' has no 'Connections' list.", json_file)
+            return False
+
+        self._existing_connections = connections
+        self._existing_index = {}
+        for position, conn_obj in enumerate(connections):
+            if isinstance(conn_obj, dict):
+                self._existing_index.setdefault(self.__get_connection_key(conn_obj), position)
+        logging.info("%d existing connection(s) read from '%s'.", len(connections), json_file)
+
+        return True
+
+    def merge_existing_json(self, delta=False) -> dict | None:
+        """Merge built connections into existing RDM export (upsert by path).
+
+        Built connection of the existing path updates the existing connection
+        in place (its ID is kept, values not set by the build are kept), new
+        connections are appended, other existing connections are kept.
+        When delta is set, only new and changed connections are left (update
+        only import). Method sets attribute self._json_sessions.
+
+        Args:
+            delta (bool, optional): Keep new and changed connections only. Default: False.
+
+        Returns:
+            (dict): Number of added, updated, unchanged (built) and kept (existing) connections
+            None: Existing export or built connections are not set
+        """
+        if self._existing_connections is None or not self._json_sessions:
+            return None
+
+        merged = list(self._existing_connections)
+        changed = []
+        matched = set()
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "kept": 0}
+
+        for conn_obj in self._json_sessions["Connections"]:
+            position = self._existing_index.get(self.__get_connection_key(conn_obj))
+            if position is None or position in matched:
+                merged.append(conn_obj)
+                changed.append(conn_obj)
+                stats["added"] += 1
+                continue
+
+            matched.add(position)
+            existing = self._existing_connections[position]
+            merged_obj = self.__merge_connection(existing, conn_obj)
+            if merged_obj == existing:
+                stats["unchanged"] += 1
+                continue
+            merged[position] = merged_obj
+            changed.append(merged_obj)
+            stats["updated"] += 1
+
+        stats["kept"] = len(self._existing_connections) - len(matched)
+        self._json_sessions = {"Connections": changed if delta else merged}
+
+        return stats
+
+    # ====================
+    # Streaming build (rows -> JSON file)
+    # ====================
+
+    ### public methods
+
+    def set_stable_ids(self, enabled=True):
+        """Enable/disable stable connection IDs.
+
+        Stable ID is derived from connection type and path (UUID version 5),
+        so ID of credential or host referenced before it is built (streamed
+        rows) is known in advance, and the same source gives the same IDs.
+        IDs of existing export (see set_existing_json()) are preferred.
+
+        Args:
+            enabled (bool): Enable stable IDs. Default: True.
+        """
+        self.__rdm_stable_ids = enabled
+
+    def iter_json_connections(self, rows):
+        """Build connections from rows as they come and yield them.
+
+        Only folders are checked for duplicities (rows are expected to have
+        unique paths), so memory does not grow with the number of rows.
+        Enable stable IDs (see set_stable_ids()) when sessions come before
+        the credentials and hosts they reference.
+
+        Args:
+            rows (iterable): (sheet_key, row_dict) pairs, sheet_key is one of
+                'sessions', 'rdm_credentials', 'rdm_hosts' (other keys are skipped)
+
+        Yields:
+            (dict): Connection (new parent folders first)
+        """
+        ctx = self.__new_build_context(stream=True)
+
+        for sheet_key, row in rows:
+            if sheet_key == "sessions":
+                self.__build_rdm_connection_session(ctx, row)
+            elif sheet_key == "rdm_credentials":
+                self.__build_rdm_connection_credential(
+                    ctx,
+                    folder=row.get("folder", "").replace("/", "\\"),
+                    credential=row.get("credential", ""),
+                    username=row.get("username", ""),
+                )
+            elif sheet_key == "rdm_hosts":
+                self.__build_rdm_connection_host(
+                    ctx,
+                    folder=row.get("folder", "").replace("/", "\\"),
+                    name=row.get("name", ""),
+                    host=row.get("host", ""),
+                    rdm_vault=row.get("rdm_vault", ""),
+                )
+
+            connections, ctx["connections"] = ctx["connections"], []
+            yield from connections
+
+    def write_json_stream(self, rows, json_file=None, atomic=False, compression=None) -> dict | None:
+        """Build connections from rows and write them to JSON file as they come.
+
+        Output is the same as write_json() of the same connections (indented
+        by 4 spaces), see iter_json_connections().
+
+        Args:
+            rows (iterable): (sheet_key, row_dict) pairs (see iter_json_connections())
+            json_file (str, default: self.json_file): Destination file
+            atomic (bool, optional): Replace destination file atomically. Default: False.
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
+
+        Returns:
+            (dict): Number of written connections: connections, folders, sessions, credentials, hosts
+            None: In case of error
+        """
+        if json_file is None:
+            json_file = self.json_file
+
+        types = {25: "folders", 26: "credentials", 53: "hosts"}
+        counts = {"connections": 0, "folders": 0, "sessions": 0, "credentials": 0, "hosts": 0}
+        try:
+            with open_output(json_file, atomic=atomic, compression=compression) as file:
+                file.write(b'{\n    "Connections": [')
+                for conn_obj in self.iter_json_connections(rows):
+                    text = json.dumps(conn_obj, indent=4).replace("\n", "\n        ")
+                    separator = ",\n        " if counts["connections"] else "\n        "
+                    file.write((separator + text).encode("utf8"))
+                    counts["connections"] += 1
+                    counts[types.get(conn_obj["ConnectionType"], "sessions")] += 1
+                file.write(b"\n    ]\n}" if counts["connections"] else b"]\n}")
+        except (OSError, ValueError) as err:
+            # ValueError: rows source is not complete (destination is not replaced when atomic)
+            logging.error("Unable to write JSON file '%s'", json_file)
+            logging.error("%s", err)
+            return None
+
+        return counts
@@ -1,9 +1,39 @@
 """SecureCRT session generator"""
+import copy
+import hashlib
+import json
 import logging
+import os
+import re
+import shutil
 import xml.etree.ElementTree as ET
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 
 from .sm_class import SessionMaker
-from .sm_xml import SMXml
+from .sm_xml import SMXml, escape_xml_attrib, escape_xml_text
+from .fileio import COMPRESSION_SUFFIXES, open_output, open_output_directory
+
+
+# parsed XML templates cache of the worker process (see build_xml_bytes_parallel())
+_WORKER_XML_TPL_CACHE = {}
+
+
+def _xml_build_sessions_fragments(settings: dict, sessions: dict) -> dict:
+    """Build sessions in worker process and return serialized top-level elements.
+
+    Args:
+        settings (dict): Configuration settings
+        sessions (dict): Sessions dict (rows of whole partitions)
+
+    Returns:
+        (dict): Top-level element name: bytes
+    """
+    sm_scrt = SMSecureCrt(settings=settings, xml_tpl_cache=_WORKER_XML_TPL_CACHE)
+    sm_scrt.set_sessions_dict(sessions)
+
+    return dict(sm_scrt.build_xml_sessions_fragments())
 
 
 # ========================================
@@ -12,6 +42,29 @@ from .sm_xml import SMXml
 class SMSecureCrt(SessionMaker):
     """SessionMaker - SecureCRT sessions generator class"""
 
+    # sessions dict keys defining ssh session element (session cache key)
+    __SESSION_CACHE_KEYS = (
+        "session",
+        "hostname",
+        "port",
+        "username",
+        "scrt_credential",
+        "scrt_colorscheme",
+        "scrt_keywords",
+        "scrt_firewall",
+    )
+
+    # ssh session template settings set from sessions dict (setting name: key)
+    __TEMPLATE_FIELDS = {
+        "Hostname": "hostname",
+        "[SSH2] Port": "port",
+        "Username": "username",
+        "Credential Title": "scrt_credential",
+        "Keyword Set": "scrt_keywords",
+        "Color Scheme": "scrt_colorscheme",
+        "Firewall Name": "scrt_firewall",
+    }
+
     def __init__(self, **kwargs):
         """Initial method
 
@@ -23,6 +76,7 @@ class SMSecureCrt(SessionMaker):
             self:
             scrt_file (str): SecureCRT file path (destination or source)
             credentials (dict): Ordered dict of credentials
+            xml_tpl_cache (dict): Parsed XML templates cache (shared between instances)
         """
 
         # parent class attribiutes:
@@ -43,6 +97,21 @@ class SMSecureCrt(SessionMaker):
         self._firewalls_dict = dict()
         self.set_firewalls_dict(kwargs.get("firewalls", None))
 
+        # parsed XML templates cache (template: (file, mtime, element)),
+        # may be shared between instances (e.g. conversion service worker)
+        self._xml_tpl_cache = kwargs.get("xml_tpl_cache", {})
+
+        # built session elements cache (row values: element), None = disabled
+        self._xml_session_cache = None
+        self._xml_session_cache_stats = {"built": 0, "reused": 0}
+
+        # compact output (settings identical to Default session omitted)
+        self._xml_compact = False
+        self._xml_compact_stats = {}
+
+        # streamed XML file parsed completely (see iter_rows_from_xml())
+        self._xml_read_complete = False
+
     # ========================================
     # Private methods
     # ========================================
@@ -51,6 +120,69 @@ class SMSecureCrt(SessionMaker):
     # Public methods
     # ========================================
 
+    def set_xml_session_cache(self, enabled=True):
+        """Enable/disable built session elements cache.
+
+        When enabled, build_xml_from_dict() reuses session elements built by
+        the previous build from the same row values (warm rebuild), only
+        changed rows are built again. Reused elements are taken from the
+        previous build result, so the cache is meant for sequential
+        rebuilds (watch mode), not for concurrent builds.
+
+        Args:
+            enabled (bool): Enable cache. Default: True.
+        """
+        if enabled and self._xml_session_cache is None:
+            self._xml_session_cache = {}
+        if not enabled:
+            self._xml_session_cache = None
+
+    def load_xml_templates(self) -> bool:
+        """Parse all XML templates (warm templates cache).
+
+        Returns:
+            True: When all templates are parsed
+            False: If not
+        """
+        ret = True
+        for template in self._settings["scrt"]["template"]:
+            if self.__xml_tpl_get(template) is None:
+                ret = False
+
+        return ret
+
+    def clear_xml_cache(self):
+        """Clear parsed templates and built session elements caches."""
+        self._xml_tpl_cache.clear()
+        if self._xml_session_cache is not None:
+            self._xml_session_cache = {}
+
+    def get_xml_session_cache_stats(self) -> dict:
+        """Return number of built and reused session elements of the last build."""
+        return self._xml_session_cache_stats
+
+    def set_xml_compact(self, enabled=True):
+        """Enable/disable compact output of build_xml_from_dict().
+
+        Template defaults are written once, as 'Default' session (first key
+        in 'Sessions'), every session keeps settings which differ from the
+        template only (and 'Hostname', key without settings is a folder).
+        SecureCRT takes the omitted settings from the Default session.
+
+        Args:
+            enabled (bool): Enable compact output. Default: True.
+        """
+        self._xml_compact = enabled
+
+    def get_xml_compact_stats(self) -> dict:
+        """Return compact output statistics of the last build.
+
+        Returns:
+            (dict): sessions, settings (of full output), omitted (settings),
+                saved (bytes of serialized content, Default session included)
+        """
+        return self._xml_compact_stats
+
     def excel_read_sheet_credentials(self, sheet_name: str) -> dict | list | bool:
         """Read excel sheet 'scrt_credentials' and return content as dict/array.
 
@@ -365,6 +497,45 @@ class SMSecureCrt(SessionMaker):
 
             self.__set_sessions_dict_from_xml(child, folder)
 
+    def __xml_get_session_row(self, session: ET.Element, folder: str) -> dict:
+        """Return session row (dict) from session XML element.
+
+        Args:
+            session (ET.Element): Session key element
+            folder (str): Folder path of the session
+        """
+        # session settings (name: text), read children once instead of
+        # searching every setting (the first setting of the name is used)
+        settings = {}
+        for sub_et in session:
+            name = sub_et.get("name")
+            if name not in settings:
+                settings[name] = "" if sub_et.text is None else sub_et.text
+
+        row = {
+            "folder": folder,
+            "session": session.get("name"),
+            "type": "ssh" if "[SSH2] Port" in settings else "",
+            "hostname": settings.get("Hostname", ""),
+            "port": settings.get("[SSH2] Port", ""),
+            "username": settings.get("Username", ""),
+            "rdp_alternate": "",
+            "scrt_credential": settings.get("Credential Title", ""),
+            "scrt_keywords": settings.get("Keyword Set", ""),
+            "scrt_colorscheme": settings.get("Color Scheme", ""),
+            "scrt_firewall": settings.get("Firewall Name", ""),
+        }
+        logging.debug(" {0:<40} | {1:<30}".format(folder, row["session"]))
+
+        return row
+
+    def __xml_get_text(self, element: ET.Element, name: str) -> str:
+        """Return text of the element's setting (child with attribute 'name')."""
+        sub_et = element.find(f"./*[@name='{name}']")
+        if sub_et is None or sub_et.text is None:
+            return ""
+        return sub_et.text
+
     ### public methods
 
     def build_dict_from_xml(self):
@@ -481,6 +652,102 @@ class SMSecureCrt(SessionMaker):
 
         return self._sessions_dict
 
+    def iter_rows_from_xml(self, xml_file=""):
+        """Read SecureCRT XML file incrementally and yield parsed records.
+
+        Records are yielded as soon as the element is parsed, processed elements are
+        released immediately (memory usage does not depend on the file size).
+
+        Args:
+            xml_file (str, optional): SecureCRT XML file. If not set, use self.xml_file.
+
+        Yields:
+            (tuple): Pair (sheet_key, row_dict), where sheet_key is one of
+                'sessions', 'scrt_credentials', 'scrt_firewalls'.
+        """
+        if xml_file == "":
+            xml_file = self.xml_file
+
+        # element stack from the root element and "has key children" flags
+        stack = []
+        is_folder = []
+        self._xml_read_complete = False
+        for event, elem in SMXml().iterparse_xml_file(xml_file):
+            if event == "start":
+                if elem.tag == "key" and stack:
+                    is_folder[-1] = True
+                stack.append(elem)
+                is_folder.append(False)
+                continue
+
+            stack.pop()
+            folder_flag = is_folder.pop()
+
+            if not stack:
+                # root element is done (file is parsed completely)
+                self._xml_read_complete = True
+                continue
+            if len(stack) == 1:
+                # top-level section is done (Sessions, Credentials,...), release it
+                stack[0].remove(elem)
+                continue
+            if len(stack) < 2 or elem.tag != "key":
+                continue
+
+            section = stack[1].get("name")
+            row = None
+            if section == "Sessions" and not folder_flag:
+                row = self.__xml_get_session_row(
+                    elem, "/".join(key.get("name") for key in stack[2:])
+                )
+                sheet_key = "sessions"
+            elif section == "Credentials" and len(stack) == 2:
+                row = {
+                    "credential": elem.get("name"),
+                    "username": self.__xml_get_text(elem, "Username"),
+                }
+                sheet_key = "scrt_credentials"
+            elif section == "Firewalls" and len(stack) == 2:
+                row = {
+                    "firewall": elem.get("name"),
+                    "address": self.__xml_get_text(elem, "Firewall Address"),
+                    "port": self.__xml_get_text(elem, "Firewall Port"),
+                    "username": self.__xml_get_text(elem, "Firewall User"),
+                }
+                sheet_key = "scrt_firewalls"
+
+            if row is not None:
+                stack[-1].remove(elem)
+                yield sheet_key, row
+
+    def is_xml_read_complete(self) -> bool:
+        """Return True if the last iter_rows_from_xml() parsed the whole file (no parse error)."""
+        return self._xml_read_complete
+
+    def __iter_complete_rows(self):
+        """Yield rows of iter_rows_from_xml(), raise ValueError when the XML file is not parsed completely."""
+        yield from self.iter_rows_from_xml()
+        if not self.is_xml_read_complete():
+            raise ValueError(f"Source file '{self.xml_file}' is not complete")
+
+    def write_excel_stream(self, rows=None, excel_file=None) -> dict:
+        """Write records to Excel file as they come (see iter_rows_from_xml()).
+
+        Args:
+            rows (iterable, default: self.iter_rows_from_xml()): (sheet_key, row_dict) pairs
+            excel_file (str, default: self.excel_file): Excel file to write content
+
+        Returns:
+            (dict): Number of written rows per sheet key.
+            None: Source file is not complete or in case of error (Excel file is not written)
+        """
+        if rows is None:
+            rows = self.__iter_complete_rows()
+        if excel_file is None:
+            excel_file = self.excel_file
+
+        return self._excel_obj.write_excel_book_stream(rows, excel_file=excel_file)
+
     def write_excel(self, **kwargs):
         """Write credentials, sessions and firewalls to Excel file
 
@@ -509,22 +776,41 @@ class SMSecureCrt(SessionMaker):
 
     ### private methods
 
-    def __credentials_dict_to_xml(self) -> ET.Element:
-        """Read self._credentials_dict and return credentials hierarchy as XML object.
+    def __new_build_context(self, **kwargs) -> dict:
+        """Return new build context (sources and statistics of one build call).
+
+        Every build (build_xml_from_dict(), build_xml_bytes_compiled(), ...)
+        reads its sources from its own context and writes nothing but the
+        result attributes (the last build), so the object may serve
+        concurrent builds (threads) of different sources.
+
+        Args:
+            sessions_dict (dict, optional): Sessions dict. Default: self._sessions_dict.
+            credentials_dict (dict, optional): Credential groups dict. Default: self._credentials_dict.
+            firewalls_dict (dict, optional): Firewall groups dict. Default: self._firewalls_dict.
+        """
+        return {
+            "sessions": kwargs.get("sessions_dict", self._sessions_dict),
+            "credentials": kwargs.get("credentials_dict", self._credentials_dict),
+            "firewalls": kwargs.get("firewalls_dict", self._firewalls_dict),
+        }
+
+    def __credentials_dict_to_xml(self, credentials_dict: dict) -> ET.Element:
+        """Read credentials dict and return credentials hierarchy as XML object.
 
         Returns:
             (ET.Element): XML object for credentials
         """
         ret_xml = ET.Element("CREDENTIALS")
-        if not self._credentials_dict:
+        if not credentials_dict:
             return ret_xml
 
-        for idx, credential_row in enumerate(self._credentials_dict["credential"]):
+        for idx, credential_row in enumerate(credentials_dict["credential"]):
             # build credentials data in XML format
             credential_xml = self.__xml_build_credential(
                 xml_tpl_credential=self.__xml_tpl_get_credential(),
-                credential=self._credentials_dict["credential"][idx],
-                username=self._credentials_dict["username"][idx],
+                credential=credentials_dict["credential"][idx],
+                username=credentials_dict["username"][idx],
             )
 
             # return session_xml only (no folder path defined)
@@ -533,24 +819,24 @@ class SMSecureCrt(SessionMaker):
 
         return ret_xml
 
-    def __firewalls_dict_to_xml(self) -> ET.Element:
-        """Read self._firewalls_dict and return firewalls hierarchy as XML object.
+    def __firewalls_dict_to_xml(self, firewalls_dict: dict) -> ET.Element:
+        """Read firewalls dict and return firewalls hierarchy as XML object.
 
         Returns:
             (ET.Element): XML object for firewalls
         """
         ret_xml = ET.Element("FIREWALLS")
-        if not self._firewalls_dict:
+        if not firewalls_dict:
             return ret_xml
 
-        for idx, firewall_row in enumerate(self._firewalls_dict["firewall"]):
+        for idx, firewall_row in enumerate(firewalls_dict["firewall"]):
             # build firewalls data in XML format
             firewall_xml = self.__xml_build_firewall(
                 xml_tpl_firewall=self.__xml_tpl_get_firewall(),
-                firewall=self._firewalls_dict["firewall"][idx],
-                address=self._firewalls_dict["address"][idx],
-                port=self._firewalls_dict["port"][idx],
-                username=self._firewalls_dict["username"][idx],
+                firewall=firewalls_dict["firewall"][idx],
+                address=firewalls_dict["address"][idx],
+                port=firewalls_dict["port"][idx],
+                username=firewalls_dict["username"][idx],
             )
 
             # return session_xml only (no folder path defined)
@@ -559,8 +845,8 @@ class SMSecureCrt(SessionMaker):
 
         return ret_xml
 
-    def __sessions_dict_to_xml(self) -> ET.Element:
-        """Read self._sessions_dict and return firewalls hierarchy as XML object.
+    def __sessions_dict_to_xml(self, sessions_dict: dict) -> ET.Element:
+        """Read sessions dict and return sessions hierarchy as XML object.
 
         Returns:
             (ET.Element): XML object for sessions
@@ -568,10 +854,23 @@ class SMSecureCrt(SessionMaker):
         # root object for return
         ret_xml = ET.Element("SESSION")
 
+        # session elements of the previous build are taken by this build
+        # (concurrent build starts with empty cache), elements of this build
+        # are the cache for the next build
+        previous_cache = self._xml_session_cache
+        if previous_cache is not None:
+            self._xml_session_cache = {}
+        session_cache = {}
+        cache_stats = {"built": 0, "reused": 0}
+
+        # compact output: template defaults, omitted settings of session elements
+        compact_tpl = self.__xml_tpl_get_session_ssh() if self._xml_compact else None
+        compact_omitted = {}
+
         # get folder path and session in a loop
-        for idx, session_row in enumerate(self._sessions_dict["session"]):
+        for idx, session_row in enumerate(sessions_dict["session"]):
             # get folders structure
-            folder_path = self._sessions_dict["folder"][idx]
+            folder_path = sessions_dict["folder"][idx]
             if folder_path == "":
                 # no folder path
                 folders_xml = None
@@ -581,21 +880,42 @@ class SMSecureCrt(SessionMaker):
             # get session data in XML format
             session_xml = None
             # SSH session
-            if self._sessions_dict["type"][idx] == "ssh":
-                session_xml = self.__xml_get_session_ssh(
-                    # template
-                    xml_tpl_session=self.__xml_tpl_get_session_ssh(),
-                    # values
-                    session=self._sessions_dict["session"][idx],
-                    hostname=self._sessions_dict["hostname"][idx],
-                    port=self._sessions_dict["port"][idx],
-                    # type=self._sessions_dict["type"][idx],
-                    username=self._sessions_dict["username"][idx],
-                    credential=self._sessions_dict["scrt_credential"][idx],
-                    colorscheme=self._sessions_dict["scrt_colorscheme"][idx],
-                    keywords=self._sessions_dict["scrt_keywords"][idx],
-                    firewall=self._sessions_dict["scrt_firewall"][idx],
-                )
+            if sessions_dict["type"][idx] == "ssh":
+                session_key = None
+                if previous_cache is not None:
+                    # reuse session element built from the same row values (previous build)
+                    session_key = tuple(
+                        sessions_dict[key][idx] for key in self.__SESSION_CACHE_KEYS
+                    )
+                    if session_key not in session_cache:
+                        session_xml = previous_cache.pop(session_key, None)
+
+                if session_xml is not None:
+                    cache_stats["reused"] += 1
+                else:
+                    session_xml = self.__xml_get_session_ssh(
+                        # template
+                        xml_tpl_session=self.__xml_tpl_get_session_ssh(),
+                        # values
+                        session=sessions_dict["session"][idx],
+                        hostname=sessions_dict["hostname"][idx],
+                        port=sessions_dict["port"][idx],
+                        # type=sessions_dict["type"][idx],
+                        username=sessions_dict["username"][idx],
+                        credential=sessions_dict["scrt_credential"][idx],
+                        colorscheme=sessions_dict["scrt_colorscheme"][idx],
+                        keywords=sessions_dict["scrt_keywords"][idx],
+                        firewall=sessions_dict["scrt_firewall"][idx],
+                    )
+                    cache_stats["built"] += 1
+
+                    if compact_tpl is not None:
+                        compact_omitted[id(session_xml)] = self.__xml_compact_session(
+                            session_xml, compact_tpl
+                        )
+
+                if session_key is not None and session_key not in session_cache:
+                    session_cache[session_key] = session_xml
 
             # add session XML to folder path XML
             if session_xml != None:
@@ -616,6 +936,13 @@ class SMSecureCrt(SessionMaker):
         # normalize folder paths structure (merge duplicate folder paths)
         ret_xml = self.__xml_merge_sessions_folder_path(ret_xml)
 
+        if compact_tpl is not None:
+            self.__xml_compact_add_default(ret_xml, compact_tpl, compact_omitted)
+
+        if previous_cache is not None:
+            self._xml_session_cache = session_cache
+        self._xml_session_cache_stats = cache_stats
+
         return ret_xml
 
     def __xml_build_credential(self, **kwargs) -> ET.Element:
@@ -787,6 +1114,8 @@ class SMSecureCrt(SessionMaker):
         """Normalize folder path structure (remove duplicities).
 
         Read sessions folder/path in a loop and merge the same paths to one sub folder.
+        Children of the same name are found by index (linear time), merged
+        folders are normalized recursively.
 
         Args:
             parent_element (ET.Element): Parent XML element
@@ -794,73 +1123,169 @@ class SMSecureCrt(SessionMaker):
         Return:
             (ET.Element)
         """
-        # get all childrens
-        child_list = parent_element.findall("./key")
-        new_child = []
-
-        for child in child_list:
-            if not child.attrib in new_child:
-                new_child.append(child.attrib)
-            else:
-                # find child element instance to extend with current child
-                find_string = "./key[@name='" + child.attrib["name"] + "']"
-                child_element = parent_element.find(find_string)
-
-                # if child is folder path (has 'key(s)')
-                # add it to new path and remove it from old place
-                if child.find("./key") is None:
-                    # child has no 'key type' childrens
-                    parent_element.remove(child)
-                else:
-                    # child has 'key' childrens
-                    child_element.extend(child)
-                    parent_element.remove(child)
-
-                # iterate new child_element
+        # the first child element by name and attributes of kept children
+        first_by_name = {}
+        kept_attribs = set()
+        # children kept in parent, merged children (to normalize recursively)
+        children = []
+        merged = {}
+
+        for child in parent_element:
+            if child.tag != "key":
+                children.append(child)
+                continue
+
+            name = child.get("name")
+            first_by_name.setdefault(name, child)
+            attrib = frozenset(child.attrib.items())
+            if attrib not in kept_attribs:
+                kept_attribs.add(attrib)
+                children.append(child)
+                continue
+
+            # find child element instance to extend with current child
+            child_element = first_by_name[name]
+
+            # if child is folder path (has 'key(s)') add it to new path,
+            # child without 'key type' childrens is removed
+            if child.find("./key") is not None:
+                child_element.extend(child)
+            merged[id(child_element)] = child_element
+
+        if merged:
+            parent_element[:] = children
+            for child_element in merged.values():
                 self.__xml_merge_sessions_folder_path(child_element)
 
         return parent_element
 
+    def __xml_compact_session(self, session_xml: ET.Element, session_tpl: ET.Element) -> tuple:
+        """Remove session settings identical to the template (compact output).
+
+        Session element is built from the template copy, so settings are
+        compared with template settings of the same position. 'Hostname'
+        is kept (session key without settings is imported as folder).
+
+        Args:
+            session_xml (ET.Element): Session element
+            session_tpl (ET.Element): Session template element
+
+        Returns:
+            (tuple): Number of settings, number and size (bytes, without indentation) of removed settings
+        """
+        settings = len(session_xml)
+        removed = []
+        for setting, default in zip(list(session_xml), session_tpl):
+            if setting.get("name") == "Hostname":
+                continue
+            if setting.text == default.text and setting.attrib == default.attrib:
+                removed.append(setting)
+
+        size = 0
+        for setting in removed:
+            session_xml.remove(setting)
+            tail, setting.tail = setting.tail, None
+            size += len(ET.tostring(setting, encoding="unicode").encode("utf8"))
+            setting.tail = tail
+
+        return settings, len(removed), size
+
+    def __xml_compact_add_default(self, sessions_xml: ET.Element, session_tpl: ET.Element, omitted: dict):
+        """Add Default session (template defaults) and set compact output statistics.
+
+        Saved size is computed from the removed settings of session elements
+        kept in the merged structure (setting with its indentation, level
+        of the 'Sessions' children is 2), less the Default session size.
+
+        Args:
+            sessions_xml (ET.Element): Merged sessions structure
+            session_tpl (ET.Element): Session template element
+            omitted (dict): Session element id: result of __xml_compact_session()
+        """
+        stats = {"sessions": 0, "settings": 0, "omitted": 0, "saved": 0}
+
+        parents = [(sessions_xml, 2)]
+        while parents:
+            parent, level = parents.pop()
+            for child in parent:
+                if id(child) in omitted:
+                    settings, removed, size = omitted[id(child)]
+                    stats["sessions"] += 1
+                    stats["settings"] += settings
+                    stats["omitted"] += removed
+                    stats["saved"] += size + removed * (level + 2)
+                parents.append((child, level + 1))
+
+        if sessions_xml.find("./key[@name='Default']") is not None:
+            logging.warning("Top-level 'Default' key in sessions, Default session is not added.")
+        else:
+            session_tpl.set("name", "Default")
+            sessions_xml.insert(0, session_tpl)
+
+            default_xml = copy.deepcopy(session_tpl)
+            ET.indent(default_xml, space="\t", level=2)
+            default_xml.tail = None
+            stats["saved"] -= len(ET.tostring(default_xml, encoding="unicode").encode("utf8")) + 3
+
+        self._xml_compact_stats = stats
+
+    def __xml_tpl_get(self, template: str) -> ET.Element | None:
+        """Return template Element object (copy of cached parsed template).
+
+        Template file is parsed once and parsed again when it's modified.
+
+        Args:
+            template (str): Template name (key in settings 'scrt.template')
+        """
+        tpl_file = self._settings["scrt"]["template"][template]
+        try:
+            tpl_mtime = os.stat(tpl_file).st_mtime_ns
+        except OSError:
+            tpl_mtime = None
+
+        cached = self._xml_tpl_cache.get(template)
+        if cached is None or cached[0] != tpl_file or cached[1] != tpl_mtime:
+            # templates are copied into built documents (ElementTree only)
+            xml_obj = SMXml()
+            tpl_root = xml_obj.parse_xml_file(tpl_file, backend="etree")
+            if tpl_root is None:
+                return None
+            cached = (tpl_file, tpl_mtime, tpl_root)
+            self._xml_tpl_cache[template] = cached
+
+        return copy.deepcopy(cached[2])
+
     def __xml_tpl_get_root(self):
         """Return root template Element object"""
-        xml_obj = SMXml()
-        return xml_obj.parse_xml_file(self._settings["scrt"]["template"]["root"])
+        return self.__xml_tpl_get("root")
 
     def __xml_tpl_get_credential(self):
         """Return credential template Element object"""
-        xml_obj = SMXml()
-        return xml_obj.parse_xml_file(self._settings["scrt"]["template"]["credential"])
+        return self.__xml_tpl_get("credential")
 
     def __xml_tpl_get_firewall(self):
         """Return firewall template Element object"""
-        xml_obj = SMXml()
-        return xml_obj.parse_xml_file(self._settings["scrt"]["template"]["firewall"])
+        return self.__xml_tpl_get("firewall")
 
     def __xml_tpl_get_session_ssh(self):
         """Return SSH session template Element object"""
-        xml_obj = SMXml()
-        return xml_obj.parse_xml_file(self._settings["scrt"]["template"]["session_ssh"])
+        return self.__xml_tpl_get("session_ssh")
 
-    ### public methods
+    def __xml_build_document(self, ctx: dict, sessions_root: ET.Element) -> ET.Element:
+        """Return base (root template) XML with sessions, credentials and firewalls.
 
-    def build_xml_from_dict(self):
-        """Build SecureCRT XML content from template (root+sessions+credentials+firewalls).
-        Method set's attribute self._sessions_xml.
-
-        Returns:
-            (ET.Element): XML content of sessions for importing to SecureCRT.
+        Args:
+            ctx (dict): Build context (see __new_build_context())
+            sessions_root (ET.Element): Sessions (children are added to 'Sessions' key)
         """
         # read default base(root) XML file structure
         base_root = self.__xml_tpl_get_root()
 
-        # read all sessions as XML structures
-        sessions_root = self.__sessions_dict_to_xml()
-
         # read all credentials as XML structures
-        credentials_root = self.__credentials_dict_to_xml()
+        credentials_root = self.__credentials_dict_to_xml(ctx["credentials"])
 
         # read all credentials as XML structures
-        firewalls_root = self.__firewalls_dict_to_xml()
+        firewalls_root = self.__firewalls_dict_to_xml(ctx["firewalls"])
 
         if base_root:
             # add sessions to base xml on correct place (key.name=Sessions)
@@ -881,6 +1306,985 @@ class SMSecureCrt(SessionMaker):
                 for firewall in firewalls_root.findall("./"):
                     sub_firewalls.append(firewall)
 
-        self._xml_sessions = base_root
+        return base_root
+
+    def __xml_build_document_bytes(self, ctx: dict, sessions: bytes | None) -> bytes | None:
+        """Return serialized document with serialized sessions under 'Sessions' key.
+
+        Document (credentials, firewalls) is built with a marker comment in
+        'Sessions' key, the marker is replaced by sessions content.
+
+        Args:
+            ctx (dict): Build context (see __new_build_context())
+            sessions (bytes): Top-level session elements (indented for level 2), None = no sessions
+        """
+        marker = f"sessionmaker-sessions-{uuid.uuid4().hex}"
+        sessions_root = ET.Element("SESSION")
+        if sessions is not None:
+            sessions_root.append(ET.Comment(marker))
+        base_root = self.__xml_build_document(ctx, sessions_root)
+
+        content = self.xml_to_bytes(xml_element=base_root)
+        if content is None or sessions is None:
+            return content
+
+        return content.replace(f"<!--{marker}-->".encode("utf8"), sessions, 1)
+
+    def __xml_compile_session_ssh(self) -> list | None:
+        """Compile ssh session template to serialized children (byte template).
+
+        Every child is serialized once: settings from sessions dict as
+        (key, default, start tag, end tag), other settings as (None, default).
+        The row is rendered by joining the parts with escaped row values.
+
+        Returns:
+            (list): Compiled children of session element
+            None: Template can't be compiled (rendered output would differ from
+                the element build)
+        """
+        session_root = self.__xml_tpl_get_session_ssh()
+        if session_root is None or session_root.tag != "key" or len(session_root) == 0:
+            return None
+        if set(session_root.attrib) != {"name"}:
+            return None
+        if session_root.text is not None and session_root.text.strip() != "":
+            return None
+
+        compiled = []
+        for child in session_root:
+            # leaf settings only (indentation of nested keys depends on folder depth)
+            if not isinstance(child.tag, str) or child.tag == "key" or "{" in child.tag:
+                return None
+            if len(child) > 0 or (child.tail is not None and child.tail.strip() != ""):
+                return None
+
+            child.tail = None
+            default = ET.tostring(child, encoding="unicode")
+            key = self.__TEMPLATE_FIELDS.get(child.get("name"))
+            if key is None:
+                compiled.append((None, default, "", ""))
+                continue
+
+            child.text = "\0"
+            start, end = ET.tostring(child, encoding="unicode").split("\0")
+            compiled.append((key, default, start, end))
+
+        return compiled
+
+    def __xml_get_sessions_tree(self, sessions_dict: dict) -> dict | None:
+        """Return ssh sessions as folder tree (name: subtree or row index).
+
+        Children are ordered by the first row (the same order as merged
+        elements in the element build), duplicate sessions (the same path)
+        are dropped.
+
+        Returns:
+            (dict): Folder tree
+            None: Session and folder of the same path (merged by element build)
+        """
+        tree = {}
+        for idx, session in enumerate(sessions_dict["session"]):
+            if sessions_dict["type"][idx] != "ssh":
+                continue
+
+            folder = tree
+            folder_path = sessions_dict["folder"][idx]
+            if folder_path != "":
+                for name in folder_path.split("/"):
+                    child = folder.setdefault(name, {})
+                    if not isinstance(child, dict):
+                        return None
+                    folder = child
+
+            child = folder.setdefault(session, idx)
+            if isinstance(child, dict):
+                return None
+
+        return tree
+
+    def __xml_render_session_ssh(self, compiled: list, name: str, get_value, indent: str) -> str:
+        """Render ssh session element of the row from compiled template.
+
+        Values are set the same way as by __xml_get_session_ssh() (empty
+        value keeps template default) and escaped the same way as by
+        ElementTree serializer.
+
+        Args:
+            compiled (list): Compiled template (see __xml_compile_session_ssh())
+            name (str): Session name
+            get_value (callable): Returns row value of sessions dict key
+            indent (str): Indentation of the element (new line and tabs)
+        """
+        child_indent = indent + "\t"
+        parts = ['<key name="', escape_xml_attrib(name), '">']
+        for key, default, start, end in compiled:
+            parts.append(child_indent)
+            value = get_value(key) if key is not None else ""
+            if key == "scrt_firewall" and "/" in value and "Session:" not in value:
+                value = "Session:" + value
+            elif key == "port" and value:
+                value = str(value)
+
+            if value:
+                parts.extend((start, escape_xml_text(value), end))
+            else:
+                parts.append(default)
+
+        parts.extend((indent, "</key>"))
+
+        return "".join(parts)
+
+    def __xml_render_sessions_tree(
+        self, compiled: list, sessions_dict: dict, tree: dict, level: int, parts: list
+    ):
+        """Render folder tree elements (recursively) and add them to parts.
+
+        Args:
+            compiled (list): Compiled template (see __xml_compile_session_ssh())
+            sessions_dict (dict): Sessions dict (row values)
+            tree (dict): Folder tree (see __xml_get_sessions_tree())
+            level (int): Indentation level of tree elements
+            parts (list): Rendered parts (output)
+        """
+        indent = "\n" + "\t" * level
+        first = True
+        for name, child in tree.items():
+            if not first:
+                parts.append(indent)
+            first = False
+
+            if isinstance(child, dict):
+                parts.extend(('<key name="', escape_xml_attrib(name), '">', indent, "\t"))
+                self.__xml_render_sessions_tree(compiled, sessions_dict, child, level + 1, parts)
+                parts.extend((indent, "</key>"))
+            else:
+                parts.append(
+                    self.__xml_render_session_ssh(
+                        compiled, name, lambda key, idx=child: sessions_dict[key][idx], indent
+                    )
+                )
+
+    def __get_sessions_partitions(self, sessions_dict: dict) -> dict:
+        """Return ssh session row indexes by top-level name (first folder or session name).
+
+        Top-level elements of different names are never merged together,
+        so every partition can be built separately. Partitions are ordered
+        by the first row (the same order as top-level elements in serial build).
+        """
+        partitions = {}
+        for idx, folder in enumerate(sessions_dict["folder"]):
+            if sessions_dict["type"][idx] != "ssh":
+                continue
+            if folder == "":
+                name = sessions_dict["session"][idx]
+            else:
+                name = folder.split("/")[0]
+            partitions.setdefault(name, []).append(idx)
+
+        return partitions
+
+    ### public methods
+
+    def build_xml_from_dict(self, **kwargs):
+        """Build SecureCRT XML content from template (root+sessions+credentials+firewalls).
+        Method set's attribute self._sessions_xml.
+
+        Every call builds from its own build context, concurrent builds
+        (threads) of the same object do not share state. Use the returned
+        element (the attribute is the result of the last build).
+
+        Args:
+            sessions_dict (dict, optional): Sessions dict. Default: self._sessions_dict.
+            credentials_dict (dict, optional): Credential groups dict. Default: self._credentials_dict.
+            firewalls_dict (dict, optional): Firewall groups dict. Default: self._firewalls_dict.
+
+        Returns:
+            (ET.Element): XML content of sessions for importing to SecureCRT.
+        """
+        ctx = self.__new_build_context(**kwargs)
+
+        # read all sessions as XML structures
+        sessions_root = self.__sessions_dict_to_xml(ctx["sessions"])
+
+        xml_sessions = self.__xml_build_document(ctx, sessions_root)
+        self._xml_sessions = xml_sessions
+
+        return xml_sessions
+
+    def build_xml_sessions_fragments(self, level=2, **kwargs) -> list:
+        """Build sessions and return serialized top-level session elements.
+
+        Fragments are indented for the 'level' (position of 'Sessions' key
+        children in the document) and serialized the same way as by
+        write_xml_file() (see build_xml_bytes_parallel()).
+
+        Args:
+            level (int, optional): Indentation level of the elements. Default: 2.
+            sessions_dict (dict, optional): Sessions dict. Default: self._sessions_dict.
+
+        Returns:
+            (list): Pairs (name, bytes) of top-level elements (document order)
+        """
+        fragments = []
+        for element in self.__sessions_dict_to_xml(kwargs.get("sessions_dict", self._sessions_dict)):
+            ET.indent(element, space="\t", level=level)
+            element.tail = None
+            fragments.append(
+                (element.get("name"), ET.tostring(element, encoding="unicode").encode("utf8"))
+            )
+
+        return fragments
+
+    def build_xml_bytes_parallel(self, workers=None, **kwargs) -> bytes | None:
+        """Build SecureCRT XML content in worker processes and return it as bytes.
+
+        Sessions are partitioned by top-level folder, every partition is
+        built, normalized and serialized in a worker process. Fragments are
+        spliced in order under the 'Sessions' key of the document. Content
+        is identical to build_xml_from_dict() + write_xml_file().
+
+        Args:
+            workers (int, optional): Number of worker processes. Default: None (number of CPUs).
+            sessions_dict, credentials_dict, firewalls_dict (dict, optional): Sources (see build_xml_from_dict())
+
+        Returns:
+            (bytes): XML content
+            None: In case of error
+        """
+        ctx = self.__new_build_context(**kwargs)
+        partitions = self.__get_sessions_partitions(ctx["sessions"])
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        # jobs of whole partitions (several jobs per worker for load balancing)
+        jobs = []
+        job_size = max(1, -(-sum(map(len, partitions.values())) // (workers * 4)))
+        job = []
+        for indexes in partitions.values():
+            job.extend(indexes)
+            if len(job) >= job_size:
+                jobs.append(sorted(job))
+                job = []
+        if job:
+            jobs.append(sorted(job))
+
+        job_sessions = [
+            {key: [column[idx] for idx in job] for key, column in ctx["sessions"].items()}
+            for job in jobs
+        ]
+
+        fragments = {}
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                for job_fragments in executor.map(
+                    _xml_build_sessions_fragments,
+                    [self._settings] * len(jobs),
+                    job_sessions,
+                ):
+                    fragments.update(job_fragments)
+        else:
+            for sessions in job_sessions:
+                fragments.update(_xml_build_sessions_fragments(self._settings, sessions))
+
+        sessions = None
+        if fragments:
+            sessions = b"\n\t\t".join(fragments[name] for name in partitions)
+
+        return self.__xml_build_document_bytes(ctx, sessions)
+
+    def build_xml_bytes_compiled(self, **kwargs) -> bytes | None:
+        """Build SecureCRT XML content from compiled session template and return it as bytes.
+
+        The ssh session template is compiled once to serialized settings,
+        every row is rendered by substitution of its (escaped) values, no
+        session elements are built. Content is identical to
+        build_xml_from_dict() + write_xml_file().
+
+        Falls back to the element build when the template can't be compiled
+        (nested keys in template) or a session path is also a folder path.
+
+        Args:
+            sessions_dict, credentials_dict, firewalls_dict (dict, optional): Sources (see build_xml_from_dict())
+
+        Returns:
+            (bytes): XML content
+            None: In case of error
+        """
+        ctx = self.__new_build_context(**kwargs)
+        compiled = self.__xml_compile_session_ssh()
+        tree = self.__xml_get_sessions_tree(ctx["sessions"]) if compiled is not None else None
+        if compiled is None or tree is None:
+            if compiled is None:
+                logging.info("Session template can't be compiled, using element build.")
+            else:
+                logging.info("Session and folder of the same path, using element build.")
+            return self.xml_to_bytes(xml_element=self.build_xml_from_dict(**kwargs))
+
+        sessions = None
+        if tree:
+            parts = []
+            self.__xml_render_sessions_tree(compiled, ctx["sessions"], tree, 2, parts)
+            sessions = "".join(parts).encode("utf8")
+
+        return self.__xml_build_document_bytes(ctx, sessions)
+
+    # ====================
+    # Sharded XML output (one XML file per folder subtree)
+    # ====================
+
+    ### private methods
+
+    def __get_shard_file_name(self, shard: str, used_names: set) -> str:
+        """Return unique shard file name (without extension) of the shard folder."""
+        name = re.sub(r"[^\w.-]+", "_", shard.replace("/", "--")).strip("_")
+        if name == "":
+            name = "_root"
+
+        unique_name = name
+        idx = 2
+        while unique_name.lower() in used_names:
+            unique_name = f"{name}-{idx}"
+            idx += 1
+        used_names.add(unique_name.lower())
+
+        return unique_name
+
+    def __xml_build_shard(self, indexes: list) -> "SMSecureCrt":
+        """Return maker with sessions of the shard and referenced credentials/firewalls.
+
+        Args:
+            indexes (list): Session row indexes (self._sessions_dict) of the shard
+        """
+        sessions = {key: [column[idx] for idx in indexes] for key, column in self._sessions_dict.items()}
+        credential_names = set(sessions["scrt_credential"])
+        firewall_names = set(sessions["scrt_firewall"])
+
+        credentials = {
+            key: [
+                value
+                for value, name in zip(column, self._credentials_dict["credential"])
+                if name in credential_names
+            ]
+            for key, column in self._credentials_dict.items()
+        }
+        firewalls = {
+            key: [
+                value
+                for value, name in zip(column, self._firewalls_dict["firewall"])
+                if name in firewall_names
+            ]
+            for key, column in self._firewalls_dict.items()
+        }
+
+        # parsed templates are shared with the shard maker
+        sm_shard = SMSecureCrt(
+            settings=self._settings,
+            credentials=credentials,
+            firewalls=firewalls,
+            xml_tpl_cache=self._xml_tpl_cache,
+        )
+        sm_shard.set_sessions_dict(sessions)
+        sm_shard.build_xml_from_dict()
+
+        return sm_shard
+
+    def __xml_write_shard(self, shard: str, indexes: list, xml_file: str, atomic: bool, compression: str | None) -> dict:
+        """Build and write one shard, return its manifest record."""
+        sm_shard = self.__xml_build_shard(indexes)
+        sm_shard.xml_write(xml_file=xml_file, atomic=atomic, compression=compression)
+
+        return {
+            "folder": shard,
+            "file": os.path.basename(xml_file),
+            "sessions": sm_shard.get_sessions_dict_count(["ssh"]),
+            "credentials": sm_shard.get_credentials_dict_count(),
+            "firewalls": sm_shard.get_firewalls_dict_count(),
+            "bytes": os.path.getsize(xml_file),
+        }
+
+    ### public methods
+
+    def get_sessions_shards(self, depth=1) -> dict:
+        """Return session row indexes by shard folder.
+
+        Shard folder is the first 'depth' levels of the session folder path
+        (sessions in shallower folders belong to their own folder, sessions
+        without folder to the '' shard). Only ssh sessions are included.
+
+        Args:
+            depth (int, optional): Shard folder depth. Default: 1 (top-level folder).
+
+        Returns:
+            (dict): Shard folder: list of session row indexes (sessions dict order)
+        """
+        shards = {}
+        for idx, folder in enumerate(self._sessions_dict["folder"]):
+            if self._sessions_dict["type"][idx] != "ssh":
+                continue
+            shard = "/".join(folder.strip("/").split("/")[:depth])
+            shards.setdefault(shard, []).append(idx)
+
+        return shards
+
+    def xml_write_shards(
+        self, dst_folder: str, depth=1, workers=None, atomic=False, compression: str | None = None
+    ) -> dict | None:
+        """Write one SecureCRT XML file per folder subtree and manifest.
+
+        Every shard is a valid SecureCRT XML (root template) with sessions of
+        the subtree and credentials/firewall groups referenced by them only.
+        Shards are built and written concurrently (threads), manifest
+        ('manifest.json') lists shard files, session counts and sizes.
+
+        Args:
+            dst_folder (str): Destination folder
+            depth (int, optional): Shard folder depth. Default: 1 (top-level folder).
+            workers (int, optional): Number of concurrently written shards. Default: None (executor default).
+            atomic (bool, optional): Replace destination files atomically. Default: False.
+            compression (str, optional): Shard files compression ('gzip', 'zstd'). Default: None.
+
+        Returns:
+            (dict): Manifest content
+            None: No sessions
+        """
+        shards = self.get_sessions_shards(depth)
+        if not shards:
+            return None
+
+        # parse templates once (shard makers use the cache only)
+        if not self.load_xml_templates():
+            return None
+        Path(dst_folder).mkdir(parents=True, exist_ok=True)
+
+        suffix = ".xml" + COMPRESSION_SUFFIXES.get(compression, "")
+        used_names = set()
+        jobs = []
+        for shard, indexes in shards.items():
+            xml_file = os.path.join(
+                dst_folder, self.__get_shard_file_name(shard, used_names) + suffix
+            )
+            jobs.append((shard, indexes, xml_file, atomic, compression))
+
+        logging.info("Writing %d shard(s) to '%s'.", len(jobs), dst_folder)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            records = list(executor.map(lambda job: self.__xml_write_shard(*job), jobs))
+
+        manifest = {
+            "depth": depth,
+            "shards": records,
+            "sessions": sum(record["sessions"] for record in records),
+            "bytes": sum(record["bytes"] for record in records),
+        }
+        # manifest is written the same way as the shards (never truncated when atomic)
+        manifest_file = os.path.join(dst_folder, "manifest.json")
+        with open_output(manifest_file, atomic=atomic, compression="none") as file:
+            file.write((json.dumps(manifest, indent=2) + "\n").encode("utf8"))
+
+        return manifest
+
+    # ====================
+    # SecureCRT .ini folder output (Config folder, one file per session)
+    # ====================
+
+    # files and folders written to the destination (other files of the destination are kept)
+    INI_MANIFEST = ".sessionmaker-ini.json"
+
+    ### private methods
+
+    def __ini_get_content(self, key_xml: ET.Element) -> str:
+        """Return SecureCRT .ini file content of the key settings (non-key children).
+
+        Settings: string 'S:"name"=value', dword 'D:"name"=%08x',
+        array 'Z:"name"=%08x' + one line per item (prefixed by space).
+        """
+        lines = []
+        for setting in key_xml:
+            if setting.tag == "key":
+                continue
+            name = setting.get("name", "")
+            if setting.tag == "string":
+                lines.append(f'S:"{name}"={setting.text or ""}')
+            elif setting.tag == "dword":
+                try:
+                    lines.append(f'D:"{name}"={int(setting.text or 0) & 0xFFFFFFFF:08x}')
+                except ValueError:
+                    logging.warning("Setting '%s' is not a number (dword). Skipping.", name)
+            elif setting.tag == "array":
+                items = [item.text or "" for item in setting]
+                lines.append(f'Z:"{name}"={len(items):08x}')
+                lines.extend(" " + item for item in items)
+            else:
+                logging.warning("Setting '%s' type '%s' not supported. Skipping.", name, setting.tag)
+
+        return "\n".join(lines) + "\n"
+
+    def __ini_get_jobs(self, key_xml: ET.Element, folder: str, jobs: list, folders: list):
+        """Add .ini files (path, content) and folders of the key subtree (recursively).
+
+        Key with settings is written as '<name>.ini', key with keys as
+        '<name>' folder (key with both as both).
+        """
+        for child in key_xml:
+            if child.tag != "key":
+                continue
+            name = child.get("name", "")
+            if name in ("", ".", "..") or "/" in name or "\\" in name:
+                logging.warning("Key name '%s' is not a valid file name. Skipping.", name)
+                continue
+
+            path = os.path.join(folder, name)
+            if any(setting.tag != "key" for setting in child):
+                jobs.append((path + ".ini", self.__ini_get_content(child).encode("utf8")))
+            if len(child) == 0 or child.find("./key") is not None:
+                folders.append(path)
+                self.__ini_get_jobs(child, path, jobs, folders)
+
+    def __ini_write_file(self, job: tuple, new_dir: str, dst_dir: str) -> bool:
+        """Write .ini file to the new folder, return False if unchanged.
+
+        Unchanged file (the same content hash as the file in the destination
+        folder) is linked from the destination folder, not written.
+        """
+        path, content = job
+        old_file = os.path.join(dst_dir, path)
+        new_file = os.path.join(new_dir, path)
+        try:
+            if os.path.getsize(old_file) == len(content):
+                with open(old_file, "rb") as file:
+                    old_hash = hashlib.sha256(file.read()).digest()
+                if old_hash == hashlib.sha256(content).digest():
+                    try:
+                        os.link(old_file, new_file)
+                    except OSError:
+                        shutil.copy2(old_file, new_file)
+                    return False
+        except OSError:
+            pass
+
+        with open(new_file, "wb") as file:
+            file.write(content)
+        return True
+
+    def __ini_read_manifest(self, dst_dir: str) -> tuple:
+        """Return (files, folders) written to the destination folder by the previous run (sets of paths)."""
+        try:
+            with open(os.path.join(dst_dir, self.INI_MANIFEST), "r", encoding="utf8") as file:
+                manifest = json.load(file)
+            return (
+                {path.replace("/", os.sep) for path in manifest.get("files", [])},
+                {path.replace("/", os.sep) for path in manifest.get("folders", [])},
+            )
+        except FileNotFoundError:
+            return set(), set()
+        except (OSError, ValueError, AttributeError) as err:
+            logging.warning("Unable to read '%s' (%s), all existing files are kept.", self.INI_MANIFEST, err)
+            return set(), set()
+
+    def __ini_keep_files(self, new_dir: str, dst_dir: str, files: set, folders: set) -> int:
+        """Link files and folders of the destination not written by SessionMaker to the new folder.
+
+        Files and folders of the previous run (manifest) which are not written
+        again are dropped (removed sessions), the others (e.g. 'Global.ini',
+        'Keymaps', sessions created in SecureCRT) are kept. Generated files
+        replace the existing ones. Returns number of kept files.
+        """
+        old_files, old_folders = self.__ini_read_manifest(dst_dir)
+        kept = 0
+        for root, dirs, names in os.walk(dst_dir):
+            rel_root = os.path.relpath(root, dst_dir)
+            rel_root = "" if rel_root == "." else rel_root
+            for name in dirs:
+                path = os.path.join(rel_root, name)
+                if path not in folders and path not in old_folders:
+                    Path(new_dir, path).mkdir(parents=True, exist_ok=True)
+            for name in names:
+                path = os.path.join(rel_root, name)
+                if path == self.INI_MANIFEST or path in files or path in old_files:
+                    continue
+                old_file = os.path.join(dst_dir, path)
+                new_file = os.path.join(new_dir, path)
+                Path(os.path.dirname(new_file)).mkdir(parents=True, exist_ok=True)
+                if os.path.islink(old_file):
+                    os.symlink(os.readlink(old_file), new_file)
+                else:
+                    try:
+                        os.link(old_file, new_file)
+                    except OSError:
+                        shutil.copy2(old_file, new_file)
+                kept += 1
+
+        if kept:
+            logging.info("Keeping %d file(s) of '%s' not written by SessionMaker.", kept, dst_dir)
+        return kept
+
+    ### public methods
+
+    def ini_write_folder(self, dst_folder: str, workers=None) -> dict | None:
+        """Write built SecureCRT document as SecureCRT Config folder (.ini files).
+
+        Every session, credential and firewall of the document (see
+        build_xml_from_dict()) is written as '.ini' file, folders as
+        folders: '<dst>/Sessions/<folder>/<session>.ini',
+        '<dst>/Credentials/<name>.ini', '<dst>/Firewalls/<name>.ini'.
+
+        Files are written to a new folder next to the destination by a thread
+        pool, files with unchanged content (hash) are linked from the
+        destination folder. Other files of the destination (not written by
+        the previous run, see INI_MANIFEST) are linked to the new folder too.
+        New folder replaces the destination on completion.
+
+        Args:
+            dst_folder (str): Destination folder (SecureCRT 'Config' folder or its copy)
+            workers (int, optional): Number of writer threads. Default: None (executor default).
+
+        Returns:
+            (dict): Number of files, written files, unchanged files, kept (not
+                generated) files, folders and bytes
+            None: No document built or in case of error (destination is not changed)
+        """
+        if not isinstance(self._xml_sessions, ET.Element):
+            logging.error("SecureCRT document is not built.")
+            return None
+
+        jobs = []
+        folders = []
+        self.__ini_get_jobs(self._xml_sessions, "", jobs, folders)
+
+        try:
+            with open_output_directory(dst_folder) as new_dir:
+                for folder in folders:
+                    Path(new_dir, folder).mkdir(parents=True, exist_ok=True)
+
+                logging.info("Writing %d .ini file(s) to '%s'.", len(jobs), dst_folder)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    written = list(
+                        executor.map(lambda job: self.__ini_write_file(job, new_dir, dst_folder), jobs)
+                    )
+
+                kept = 0
+                files = {path for path, _ in jobs}
+                if os.path.isdir(dst_folder):
+                    kept = self.__ini_keep_files(new_dir, dst_folder, files, set(folders))
+
+                # generated files and folders (the next run drops the ones not written again)
+                manifest = {
+                    "files": sorted(path.replace(os.sep, "/") for path in files),
+                    "folders": sorted(path.replace(os.sep, "/") for path in folders),
+                }
+                with open(os.path.join(new_dir, self.INI_MANIFEST), "w", encoding="utf8") as file:
+                    json.dump(manifest, file, indent=2)
+                    file.write("\n")
+        except OSError as err:
+            logging.error("Unable to write folder '%s'", dst_folder)
+            logging.error("%s", err)
+            return None
+
+        return {
+            "files": len(jobs),
+            "written": sum(written),
+            "unchanged": len(jobs) - sum(written),
+            "kept": kept,
+            "folders": len(folders),
+            "bytes": sum(len(content) for _, content in jobs),
+        }
+
+    # ====================
+    # SecureCRT .ini folder input (Config folder, one file per session)
+    # ====================
+
+    # .ini file setting line: type, name, value (e.g. 'S:"Hostname"=10.0.0.1')
+    __INI_SETTING_RE = re.compile(r'^([A-Z]):"([^"]*)"=(.*)$')
+
+    # top-level folders of SecureCRT Config folder (document sections)
+    __INI_SECTIONS = ("Sessions", "Credentials", "Firewalls")
+
+    # number of .ini files parsed by one reader task
+    __INI_CHUNK_SIZE = 256
+
+    ### private methods
+
+    def __ini_scan_folder(self, folder: str, path: tuple, nodes: list):
+        """Add folders and .ini files of the folder subtree to nodes (recursively, os.scandir).
+
+        Nodes are (key path, file) pairs in name order, file is None for
+        folders. Files of SecureCRT folder data ('__FolderData__.ini') are
+        skipped.
+        """
+        with os.scandir(folder) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                nodes.append((path + (entry.name,), None))
+                self.__ini_scan_folder(entry.path, path + (entry.name,), nodes)
+            elif entry.name.lower().endswith(".ini") and not entry.name.startswith("__"):
+                nodes.append((path + (entry.name[:-4],), entry.path))
+
+    def __ini_parse_file(self, ini_file: str) -> list | None:
+        """Return settings elements (string, dword, array) of SecureCRT .ini file.
+
+        Settings are the same elements as in SecureCRT XML export. Binary
+        settings ('B:') are not part of the XML model and are skipped.
+
+        Returns:
+            (list): Settings elements
+            None: File is not valid UTF-8
+        """
+        try:
+            with open(ini_file, "r", encoding="utf-8-sig") as file:
+                lines = file.read().splitlines()
+        except UnicodeDecodeError:
+            logging.warning("File '%s' is not valid UTF-8. Skipping.", ini_file)
+            return None
+
+        settings = []
+        idx = 0
+        while idx < len(lines):
+            match = self.__INI_SETTING_RE.match(lines[idx])
+            idx += 1
+            if match is None:
+                # empty line or item of skipped setting
+                continue
+
+            kind, name, value = match.groups()
+            try:
+                if kind == "S":
+                    setting = ET.Element("string", name=name)
+                    setting.text = value or None
+                elif kind == "D":
+                    setting = ET.Element("dword", name=name)
+                    setting.text = str(int(value, 16))
+                elif kind == "Z":
+                    setting = ET.Element("array", name=name)
+                    for _ in range(int(value, 16)):
+                        if idx >= len(lines) or not lines[idx].startswith(" "):
+                            break
+                        ET.SubElement(setting, "string").text = lines[idx][1:] or None
+                        idx += 1
+                else:
+                    logging.debug("Setting '%s' type '%s' in '%s' not supported. Skipping.", name, kind, ini_file)
+                    continue
+            except ValueError:
+                logging.warning("Setting '%s' in '%s' is not a number. Skipping.", name, ini_file)
+                continue
+            settings.append(setting)
+
+        return settings
+
+    ### public methods
+
+    def read_ini_folder(self, src_folder: str, workers=None) -> dict | None:
+        """Read SecureCRT Config folder (.ini files) and set sessions XML attribute.
+
+        Reverse of ini_write_folder(): the folder tree is scanned and the
+        '.ini' files are parsed by a thread pool into the same document as
+        read from SecureCRT XML export (see build_dict_from_xml()). Source is
+        the Config folder ('Sessions', 'Credentials', 'Firewalls' subfolders)
+        or 'Sessions' folder only. Keys are in name order.
+
+        Args:
+            src_folder (str): SecureCRT Config folder (or Sessions folder)
+            workers (int, optional): Number of reader threads. Default: None (executor default).
+
+        Returns:
+            (dict): Number of files, skipped files and folders
+            None: In case of error
+        """
+        if not os.path.isdir(src_folder):
+            logging.error("Folder '%s' not found.", src_folder)
+            return None
+
+        roots = [
+            (name, os.path.join(src_folder, name))
+            for name in self.__INI_SECTIONS
+            if os.path.isdir(os.path.join(src_folder, name))
+        ]
+        if not roots:
+            roots = [("Sessions", src_folder)]
+
+        nodes = []
+        try:
+            for name, folder in roots:
+                nodes.append(((name,), None))
+                self.__ini_scan_folder(folder, (name,), nodes)
+
+            files = [file for _, file in nodes if file is not None]
+            logging.info("Reading %d .ini file(s) from '%s'.", len(files), src_folder)
+            # files are parsed in chunks (task overhead is larger than small file parsing)
+            chunks = [
+                files[idx : idx + self.__INI_CHUNK_SIZE]
+                for idx in range(0, len(files), self.__INI_CHUNK_SIZE)
+            ]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parsed = iter(
+                    [
+                        settings
+                        for chunk in executor.map(
+                            lambda chunk: [self.__ini_parse_file(file) for file in chunk], chunks
+                        )
+                        for settings in chunk
+                    ]
+                )
+        except OSError as err:
+            logging.error("Unable to read folder '%s'", src_folder)
+            logging.error("%s", err)
+            return None
+
+        # document tree (folder and file of the same name are the same key)
+        xml_root = ET.Element("VanDyke", version="3.0")
+        keys = {(): xml_root}
+        skipped = 0
+        for path, file in nodes:
+            settings = next(parsed) if file is not None else []
+            if settings is None:
+                skipped += 1
+                continue
+
+            key = keys.get(path)
+            if key is None:
+                key = ET.SubElement(keys[path[:-1]], "key", name=path[-1])
+                keys[path] = key
+            # settings before subkeys
+            key[0:0] = settings
+
+        self._xml_sessions = xml_root
+
+        return {
+            "files": len(files),
+            "skipped": skipped,
+            "folders": len(nodes) - len(files) - len(roots),
+        }
+
+    # ====================
+    # Streaming XML output (rows -> XML file)
+    # ====================
+
+    ### private methods
+
+    def __xml_split_document_bytes(self, ctx: dict) -> tuple | None:
+        """Return serialized document (credentials, firewalls of the build context) split at 'Sessions' content.
+
+        Returns:
+            (tuple): (prefix, suffix) bytes
+            None: In case of error
+        """
+        marker = f"sessionmaker-split-{uuid.uuid4().hex}".encode("utf8")
+        content = self.__xml_build_document_bytes(ctx, marker)
+        if content is None or marker not in content:
+            return None
+
+        return tuple(content.split(marker, 1))
+
+    ### public methods
+
+    def write_xml_stream(self, rows, xml_file: str, atomic=False, compression=None) -> dict | None:
+        """Render ssh session rows and write SecureCRT XML file as they come.
+
+        Sessions are rendered from compiled session template (see
+        build_xml_bytes_compiled()) and written immediately, only the open
+        folder path is kept. Folder which comes again after other folders is
+        written again (keys of the same path are merged by SecureCRT import).
+        Credentials and firewalls are collected and written after sessions.
+
+        Args:
+            rows (iterable): (sheet_key, row_dict) pairs, sheet_key is one of
+                'sessions', 'scrt_credentials', 'scrt_firewalls' (see iter_rows_from_xml())
+            xml_file (str): Destination file
+            atomic (bool, optional): Replace destination file atomically. Default: False.
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension).
+
+        Returns:
+            (dict): Number of written sessions, folders (keys), credentials and firewalls
+            None: Template can't be compiled or in case of error
+        """
+        compiled = self.__xml_compile_session_ssh()
+        if compiled is None:
+            logging.error("Session template can't be compiled (nested keys in template).")
+            return None
+
+        # credentials and firewalls come with rows (the object's dicts are not used)
+        ctx = self.__new_build_context(sessions_dict={}, credentials_dict={}, firewalls_dict={})
+        split = self.__xml_split_document_bytes(ctx)
+        if split is None:
+            logging.error("Unable to build XML document.")
+            return None
+
+        credentials = {"credential": [], "username": []}
+        firewalls = {"firewall": [], "address": [], "port": [], "username": []}
+        counts = {"sessions": 0, "folders": 0, "credentials": 0, "firewalls": 0}
+        # open folder names and "has child" flags (Sessions key first)
+        opened = []
+        has_child = [False]
+
+        try:
+            with open_output(xml_file, atomic=atomic, compression=compression) as file:
+                for sheet_key, row in rows:
+                    if sheet_key == "scrt_credentials":
+                        for key in credentials:
+                            credentials[key].append(row.get(key, ""))
+                        continue
+                    if sheet_key == "scrt_firewalls":
+                        for key in firewalls:
+                            firewalls[key].append(row.get(key, ""))
+                        continue
+                    if sheet_key != "sessions" or row.get("type") != "ssh" or row.get("session", "") == "":
+                        continue
+
+                    if counts["sessions"] == 0:
+                        file.write(split[0])
+
+                    folder = [name for name in row.get("folder", "").split("/") if name != ""]
+                    common = 0
+                    while common < min(len(opened), len(folder)) and opened[common] == folder[common]:
+                        common += 1
+
+                    parts = []
+                    while len(opened) > common:
+                        opened.pop()
+                        has_child.pop()
+                        parts.extend(("\n", "\t" * (len(opened) + 2), "</key>"))
+                    for name in folder[common:] + [None]:
+                        indent = "\n" + "\t" * (len(opened) + 2)
+                        if has_child[-1] or opened:
+                            parts.append(indent)
+                        has_child[-1] = True
+                        if name is None:
+                            parts.append(self.__xml_render_session_ssh(compiled, row["session"], row.get, indent))
+                            break
+                        parts.extend(('<key name="', escape_xml_attrib(name), '">'))
+                        opened.append(name)
+                        has_child.append(False)
+                        counts["folders"] += 1
+
+                    file.write("".join(parts).encode("utf8"))
+                    counts["sessions"] += 1
+
+                # close folders, write credentials and firewalls
+                ctx["credentials"] = credentials
+                ctx["firewalls"] = firewalls
+                counts["credentials"] = len(credentials["credential"])
+                counts["firewalls"] = len(firewalls["firewall"])
+                if counts["sessions"] == 0:
+                    content = self.__xml_build_document_bytes(ctx, None)
+                    if content is None:
+                        raise ValueError("Unable to build XML document")
+                    file.write(content)
+                else:
+                    parts = []
+                    while opened:
+                        opened.pop()
+                        parts.extend(("\n", "\t" * (len(opened) + 2), "</key>"))
+                    file.write("".join(parts).encode("utf8"))
+
+                    split_end = self.__xml_split_document_bytes(ctx)
+                    if split_end is None or split_end[0] != split[0]:
+                        # sessions are written before credentials and firewalls
+                        raise ValueError("Credentials or firewalls precede sessions in root template")
+                    file.write(split_end[1])
+        except (OSError, ValueError) as err:
+            # ValueError: rows source is not complete (destination is not replaced when atomic)
+            logging.error("Unable to write XML file '%s'", xml_file)
+            logging.error("%s", err)
+            return None
 
-        return self._xml_sessions
+        return counts
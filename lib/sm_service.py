@@ -0,0 +1,565 @@
+"""SessionMaker service module
+
+Class - SMService:
+    Local conversion service (Excel -> SecureCRT XML / Devolutions RDM JSON).
+    Asyncio HTTP front-end (TCP or Unix socket), conversions run in a process
+    pool with warm settings and templates.
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import os.path
+import stat
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import xlsxwriter
+
+from .settings import read_config_file
+from .sm_excel import SMExcel
+from .sm_profile import SMProfiler
+from .sm_scrt import SMSecureCrt
+from .sm_rdm import SMDevolutionsRdm
+
+
+# ========================================
+# Worker process functions
+# ========================================
+
+# worker process state (settings and parsed templates stay warm between requests)
+_WORKER = {}
+
+
+def _worker_init(config_file: str):
+    """Process pool worker initializer (read settings, warm templates and Excel reader).
+
+    Raises:
+        RuntimeError: Configuration file or templates can't be read (pool fails at startup)
+    """
+    _WORKER["config_file"] = config_file
+    _WORKER["xml_tpl_cache"] = {}
+    if _worker_get_settings() is None:
+        raise RuntimeError(f"Unable to read configuration file '{config_file}'")
+    if not _WORKER["xml_tpl_loaded"]:
+        raise RuntimeError("Unable to parse SecureCRT XML templates")
+
+    # Excel reader plugins are imported on the first read, read small book now
+    with io.BytesIO() as file:
+        workbook = xlsxwriter.Workbook(file, {"in_memory": True})
+        workbook.add_worksheet("warm-up").write_string(0, 0, "warm-up")
+        workbook.close()
+        SMExcel().read_excel_book_content(file.getvalue())
+
+
+def _worker_get_settings() -> dict | None:
+    """Return settings, read configuration file again when it's modified."""
+    config_file = _WORKER["config_file"]
+    try:
+        config_mtime = os.stat(config_file).st_mtime_ns
+    except OSError:
+        config_mtime = None
+
+    if config_mtime is not None and _WORKER.get("config_mtime") != config_mtime:
+        settings = read_config_file(config_file)
+        if settings:
+            _WORKER["settings"] = settings
+            _WORKER["config_mtime"] = config_mtime
+            _WORKER["xml_tpl_loaded"] = SMSecureCrt(
+                settings=settings, xml_tpl_cache=_WORKER["xml_tpl_cache"]
+            ).load_xml_templates()
+
+    return _WORKER.get("settings")
+
+
+def _worker_ping() -> int:
+    """Return worker process ID (used to start workers in advance)."""
+    return os.getpid()
+
+
+def _worker_convert(
+    maker_type: str, content: bytes | None, file_type="xlsx", src_file: str | None = None
+) -> dict:
+    """Convert Excel book (content or file) to SecureCRT XML or Devolutions RDM JSON.
+
+    Args:
+        maker_type (str): Destination type ('scrt' or 'rdm')
+        content (bytes): Excel book content (uploaded). Not used when src_file is set.
+        file_type (str, optional): Excel book file type. Default: "xlsx".
+        src_file (str, optional): Excel book file
+
+    Returns:
+        (dict): Conversion result (status, body, message, sessions, stages)
+    """
+    settings = _worker_get_settings()
+    if settings is None:
+        return {"status": "error", "message": "Unable to read configuration file."}
+
+    profiler = SMProfiler(enabled=True)
+
+    with profiler.stage("excel_load"):
+        if maker_type == "scrt":
+            sm_maker = SMSecureCrt(settings=settings, xml_tpl_cache=_WORKER["xml_tpl_cache"])
+        else:
+            sm_maker = SMDevolutionsRdm(settings=settings)
+
+        if src_file is not None:
+            try:
+                with open(src_file, "rb") as file:
+                    content = file.read()
+            except OSError as err:
+                logging.error("Unable to read file '%s'.", src_file)
+                logging.error("%s", err)
+                content = None
+        ret = content is not None and sm_maker.excel_read_book_content(content, file_type)
+    if not ret:
+        return {"status": "error", "message": "Unable to read Excel book."}
+
+    with profiler.stage("normalize") as stage:
+        sessions_dict = sm_maker.excel_read_sheet_sessions(settings["excel"]["tab_sessions"])
+        if maker_type == "scrt":
+            # SecureCRT credentials and firewalls sheets are required
+            sheets_dict = [
+                sessions_dict,
+                sm_maker.excel_read_sheet_credentials(settings["excel"]["tab_scrt_credentials"]),
+                sm_maker.excel_read_sheet_firewalls(settings["excel"]["tab_scrt_firewalls"]),
+            ]
+        else:
+            # Devolutions RDM credentials and hosts sheets are optional
+            sm_maker.excel_read_sheet_credentials(settings["excel"]["tab_rdm_credentials"])
+            sm_maker.excel_read_sheet_rdm_hosts(settings["excel"]["tab_rdm_hosts"])
+            sheets_dict = [sessions_dict]
+        if sessions_dict:
+            stage["rows"] = len(sessions_dict["session"])
+
+    if any(sheet_dict is False for sheet_dict in sheets_dict):
+        return {"status": "error", "message": "Unable to read Excel sheets (see server log)."}
+
+    with profiler.stage("build") as stage:
+        if maker_type == "scrt":
+            build = sm_maker.build_xml_from_dict()
+            stage["rows"] = sm_maker.get_sessions_dict_count(["ssh"])
+        else:
+            build = sm_maker.build_json_from_dict()
+            stage["rows"] = len(build["Connections"])
+    if build is None:
+        return {"status": "error", "message": "No sessions."}
+
+    with profiler.stage("serialize"):
+        if maker_type == "scrt":
+            body = sm_maker.xml_to_bytes()
+        else:
+            body = sm_maker.json_to_bytes()
+
+    report = profiler.get_report()
+    return {
+        "status": "ok",
+        "body": body,
+        "sessions": report["stages"][2]["rows"],
+        "stages": {stage["stage"]: stage["wall_s"] for stage in report["stages"]},
+    }
+
+
+# ========================================
+# Class SMService
+# ========================================
+class SMService:
+    """SessionMaker local conversion service.
+
+    Endpoints:
+        POST /convert?type=scrt|rdm[&format=xlsx]: Convert uploaded Excel book (request body).
+        POST /convert?type=scrt|rdm&path=FILE: Convert Excel book file (relative to root folder).
+        GET /metrics: Requests counters and latency percentiles (JSON).
+        GET /health: Service status (JSON).
+
+    Attributes:
+        Public:
+            config_file (str): Configuration file (read by workers, reloaded when modified).
+            workers (int): Number of worker processes.
+            max_concurrent (int): Maximum number of conversions running at once.
+            max_queue (int): Maximum number of conversions waiting for a worker (then 503).
+            max_body (int): Maximum request body size in bytes (then 413).
+            root (str): Root folder of Excel books converted by path. None = disabled.
+            quiet (bool): Don't print access log.
+
+        Private:
+            _pool (ProcessPoolExecutor): Worker processes pool.
+            _metrics (dict): Requests counters and latency samples.
+    """
+
+    # latency samples kept per destination type (percentiles window)
+    METRICS_WINDOW = 1024
+
+    # request head (and body) read timeout (seconds)
+    READ_TIMEOUT = 30
+
+    CONTENT_TYPES = {"scrt": "application/xml", "rdm": "application/json"}
+    FILE_TYPES = ("xlsx", "xlsm", "xls", "ods", "csv")
+
+    def __init__(
+        self,
+        config_file="config.yaml",
+        workers: int | None = None,
+        max_concurrent: int | None = None,
+        max_queue=32,
+        max_body=64 * 1024 * 1024,
+        root: str | None = ".",
+        quiet=False,
+    ):
+        self.config_file = os.path.abspath(config_file)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent or self.workers
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.root = os.path.realpath(root) if root is not None else None
+        self.quiet = quiet
+
+        self._pool = None
+        self._semaphore = None
+        self._started = time.time()
+        self._metrics = {
+            "requests": 0,
+            "in_flight": 0,
+            "waiting": 0,
+            "responses": {},
+            "rejected": 0,
+            "errors": 0,
+            "latency": {
+                maker_type: deque(maxlen=self.METRICS_WINDOW) for maker_type in self.CONTENT_TYPES
+            },
+        }
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        """Return new worker processes pool."""
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_worker_init,
+            initargs=(self.config_file,),
+        )
+
+    def _get_percentiles(self, samples: list) -> dict:
+        """Return p50/p90/p99/max of latency samples (milliseconds)."""
+        if not samples:
+            return {"p50": None, "p90": None, "p99": None, "max": None}
+
+        samples = sorted(samples)
+
+        def percentile(value):
+            return round(samples[min(len(samples) - 1, int(len(samples) * value))] * 1000, 3)
+
+        return {
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p99": percentile(0.99),
+            "max": round(samples[-1] * 1000, 3),
+        }
+
+    def _get_src_file(self, path: str) -> str | None:
+        """Return Excel book file path (inside root folder) or None."""
+        if self.root is None:
+            return None
+
+        src_file = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([self.root, src_file]) != self.root:
+            return None
+
+        return src_file
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple:
+        """Read HTTP request.
+
+        Returns:
+            (tuple): (method, target, headers, body) or (status, message) in case of error
+        """
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.READ_TIMEOUT)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            return (HTTPStatus.BAD_REQUEST, "Malformed request line.")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            return (HTTPStatus.NOT_IMPLEMENTED, "Chunked request body is not supported.")
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            return (HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if length > self.max_body:
+            return (HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+
+        body = b""
+        if length > 0:
+            body = await asyncio.wait_for(reader.readexactly(length), self.READ_TIMEOUT)
+
+        return (method, target, headers, body)
+
+    async def _convert(self, query: dict, body: bytes) -> tuple:
+        """Run conversion in worker process (with concurrency limits).
+
+        Returns:
+            (tuple): (status, body, content type, extra headers)
+        """
+        maker_type = query.get("type", "scrt")
+        file_type = query.get("format", "xlsx")
+        if maker_type not in self.CONTENT_TYPES:
+            return self._error(HTTPStatus.BAD_REQUEST, "Parameter 'type' must be 'scrt' or 'rdm'.")
+
+        src_file = None
+        if "path" in query:
+            if "format" not in query:
+                file_type = os.path.splitext(query["path"])[1][1:].lower() or "xlsx"
+            src_file = self._get_src_file(query["path"])
+            if src_file is None:
+                return self._error(HTTPStatus.FORBIDDEN, "Path is outside of the service root folder.")
+            if not os.path.isfile(src_file):
+                return self._error(HTTPStatus.NOT_FOUND, f"File '{query['path']}' not found.")
+        elif not body:
+            return self._error(HTTPStatus.BAD_REQUEST, "Upload Excel book (request body) or set 'path'.")
+
+        if file_type not in self.FILE_TYPES:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Unsupported format '{file_type}'.")
+
+        # concurrency limits (running + waiting conversions)
+        if self._metrics["waiting"] >= self.max_queue:
+            self._metrics["rejected"] += 1
+            return self._error(
+                HTTPStatus.SERVICE_UNAVAILABLE, "Too many requests.", {"Retry-After": "1"}
+            )
+
+        queue_start = time.perf_counter()
+        self._metrics["waiting"] += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._metrics["waiting"] -= 1
+
+        convert_start = time.perf_counter()
+        self._metrics["in_flight"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._pool, _worker_convert, maker_type, body, file_type, src_file
+            )
+        except BrokenProcessPool:
+            logging.error("Worker process terminated unexpectedly. Restarting workers.")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+            self._metrics["errors"] += 1
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, "Worker process failed.")
+        except Exception as err:
+            # any other worker error (e.g. build error), the worker process is still usable
+            logging.error("Conversion failed in worker process.")
+            logging.error("%s: %s", type(err).__name__, err)
+            self._metrics["errors"] += 1
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "Conversion failed (see server log).")
+        finally:
+            self._metrics["in_flight"] -= 1
+            self._semaphore.release()
+        convert_end = time.perf_counter()
+
+        if result["status"] != "ok":
+            return self._error(HTTPStatus.UNPROCESSABLE_ENTITY, result["message"])
+
+        queue_s = convert_start - queue_start
+        convert_s = convert_end - convert_start
+        self._metrics["latency"][maker_type].append((queue_s, convert_s))
+
+        timing = [f"queue;dur={queue_s * 1000:.3f}"]
+        timing.extend(f"{stage};dur={wall_s * 1000:.3f}" for stage, wall_s in result["stages"].items())
+        extension = "xml" if maker_type == "scrt" else "json"
+        headers = {
+            "Server-Timing": ", ".join(timing),
+            "X-Sessions": str(result["sessions"]),
+            "Content-Disposition": f'attachment; filename="sessions-{maker_type}.{extension}"',
+        }
+        return (HTTPStatus.OK, result["body"], self.CONTENT_TYPES[maker_type], headers)
+
+    def _error(self, status: HTTPStatus, message: str, headers: dict | None = None) -> tuple:
+        """Return error response tuple (JSON body)."""
+        body = json.dumps({"error": message}).encode("utf8")
+        return (status, body, "application/json", headers or {})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle one HTTP connection (one request)."""
+        start = time.perf_counter()
+        self._metrics["requests"] += 1
+        peer = writer.get_extra_info("peername") or "unix"
+        if isinstance(peer, tuple):
+            peer = peer[0]
+        request_line = "-"
+
+        try:
+            request = await self._read_request(reader)
+            if len(request) == 2:
+                response = self._error(*request)
+            else:
+                method, target, headers, body = request
+                request_line = f"{method} {target}"
+                url = urlsplit(target)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+                if url.path == "/convert":
+                    if method != "POST":
+                        response = self._error(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST.")
+                    else:
+                        response = await self._convert(query, body)
+                elif url.path == "/metrics" and method == "GET":
+                    response = (HTTPStatus.OK, json.dumps(self.get_metrics(), indent=4).encode("utf8"), "application/json", {})
+                elif url.path == "/health" and method == "GET":
+                    response = (HTTPStatus.OK, b'{"status": "ok"}', "application/json", {})
+                else:
+                    response = self._error(HTTPStatus.NOT_FOUND, "Not found.")
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except asyncio.LimitOverrunError:
+            response = self._error(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request head is too large.")
+        except asyncio.TimeoutError:
+            response = self._error(HTTPStatus.REQUEST_TIMEOUT, "Request timeout.")
+        except Exception as err:
+            # unexpected error, the client gets a response anyway
+            logging.error("Request '%s' failed.", request_line)
+            logging.error("%s: %s", type(err).__name__, err)
+            self._metrics["errors"] += 1
+            response = self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server error.")
+
+        status, body, content_type, headers = response
+        latency = time.perf_counter() - start
+        response_head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+            f"X-Latency-Ms: {latency * 1000:.3f}",
+        ]
+        response_head.extend(f"{name}: {value}" for name, value in headers.items())
+
+        try:
+            writer.write(("\r\n".join(response_head) + "\r\n\r\n").encode("latin-1"))
+            writer.write(body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+        responses = self._metrics["responses"]
+        responses[status.value] = responses.get(status.value, 0) + 1
+        if not self.quiet:
+            print(f'{peer} "{request_line}" {status.value} {len(body)} {latency * 1000:.1f} ms', flush=True)
+        logging.info("Request '%s' latency %.6f s.", request_line, latency)
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def get_metrics(self) -> dict:
+        """Return service metrics (counters, latency percentiles in milliseconds)."""
+        metrics = {
+            "uptime_s": round(time.time() - self._started, 3),
+            "workers": self.workers,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "requests": self._metrics["requests"],
+            "in_flight": self._metrics["in_flight"],
+            "waiting": self._metrics["waiting"],
+            "rejected": self._metrics["rejected"],
+            "errors": self._metrics["errors"],
+            "responses": {str(key): value for key, value in sorted(self._metrics["responses"].items())},
+            "latency_ms": {},
+        }
+        for maker_type, samples in self._metrics["latency"].items():
+            metrics["latency_ms"][maker_type] = {
+                "count": len(samples),
+                "queue": self._get_percentiles([sample[0] for sample in samples]),
+                "convert": self._get_percentiles([sample[1] for sample in samples]),
+            }
+
+        return metrics
+
+    async def serve(self, host="127.0.0.1", port=8080, socket_file: str | None = None) -> bool:
+        """Start workers and serve requests until cancelled.
+
+        Args:
+            host (str, optional): Listen address. Default: 127.0.0.1 (local only).
+            port (int, optional): Listen port. Default: 8080.
+            socket_file (str, optional): Unix socket file (instead of host/port).
+
+        Returns:
+            False: Worker processes failed to start (configuration or templates)
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._pool = self._new_pool()
+
+        # start (and warm) all workers before accepting requests
+        loop = asyncio.get_running_loop()
+        try:
+            pids = await asyncio.gather(
+                *[loop.run_in_executor(self._pool, _worker_ping) for _ in range(self.workers)]
+            )
+        except BrokenProcessPool:
+            logging.error("Worker processes failed to start (configuration file or templates, see log).")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            return False
+        logging.info("Worker processes started: %s.", ", ".join(map(str, sorted(set(pids)))))
+
+        if socket_file is not None:
+            if os.path.exists(socket_file) and stat.S_ISSOCK(os.stat(socket_file).st_mode):
+                os.remove(socket_file)
+            server = await asyncio.start_unix_server(self._handle, path=socket_file)
+            address = f"unix:{socket_file}"
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+            address = f"http://{host}:{port}"
+
+        if not self.quiet:
+            print(f"Serving on {address} ({self.workers} worker(s), Ctrl+C to stop)...", flush=True)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            if socket_file is not None and os.path.exists(socket_file):
+                os.remove(socket_file)
+
+        return True
+
+    def run(self, host="127.0.0.1", port=8080, socket_file: str | None = None) -> bool:
+        """Run service (blocking) until interrupted (Ctrl+C).
+
+        Returns:
+            False: Worker processes failed to start
+        """
+        try:
+            return asyncio.run(self.serve(host=host, port=port, socket_file=socket_file))
+        except KeyboardInterrupt:
+            if not self.quiet:
+                print("Stopped.")
+        return True
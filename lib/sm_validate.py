@@ -0,0 +1,461 @@
+"""SessionMaker validation module
+
+Class - SMValidator:
+    Validate normalized sheets (sessions, credentials, firewalls, hosts)
+    before build: required fields, values, duplicates and cross-references.
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import json
+import logging
+import time
+
+from .sm_jumphost import SMJumpHostGraph
+
+
+# ========================================
+# Class SMValidator
+# ========================================
+class SMValidator:
+    """SessionMaker dataset validator.
+
+    Hash indexes (names, paths) are built over all sheets once, then every
+    row is checked against them (linear time). Issues are collected to
+    machine-readable report.
+
+    Checks:
+        required: required field is empty (error)
+        invalid_value: unknown session type, port out of range (error)
+        duplicate: duplicate session path or credential/firewall/host name (error)
+        path_conflict: SecureCRT session path is also a folder path (error)
+        missing_reference: referenced credential/firewall/host/jump host session not found (error)
+        cycle: jump host sessions cycle (error)
+        unused: credential/firewall/host not referenced by any session (warning)
+
+    Attributes:
+        Public:
+            target (str): Validated destination ('scrt', 'rdm'). None = both.
+
+        Private:
+            _settings (dict): Configuration settings.
+            _issues (list): Issues of the last validation.
+    """
+
+    SESSION_TYPES = ("ssh", "rdp", "web")
+
+    # firewall values meaning "no firewall" (SecureCRT)
+    NO_FIREWALL = ("", "None")
+
+    # required fields by sheet key
+    REQUIRED = {
+        "sessions": ("session", "type", "hostname"),
+        "scrt_credentials": ("credential",),
+        "scrt_firewalls": ("firewall", "address"),
+        "rdm_credentials": ("credential",),
+        "rdm_hosts": ("name",),
+    }
+
+    def __init__(self, settings: dict, target: str | None = None):
+        self._settings = settings
+        self.target = target
+        self._issues = []
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def _add_issue(self, severity: str, check: str, sheet: str, idx: int, key: str, value: str, message: str):
+        """Add issue to the report.
+
+        Args:
+            severity (str): 'error' or 'warning'
+            check (str): Check name (see class docstring)
+            sheet (str): Sheet key
+            idx (int): Row index (None = whole sheet)
+            key (str): Column key
+            value (str): Checked value
+            message (str): Issue description
+        """
+        self._issues.append(
+            {
+                "severity": severity,
+                "check": check,
+                "sheet": sheet,
+                # Excel row number (title row is the first)
+                "row": None if idx is None else idx + 2,
+                "column": self.__get_col_name(sheet, key),
+                "value": value,
+                "message": message,
+            }
+        )
+
+    def __get_col_name(self, sheet: str, key: str) -> str:
+        """Return Excel column name of the key (from settings)."""
+        return self._settings["excel"].get("col_names_" + sheet, {}).get(key, key)
+
+    def __get_path(self, folder: str, name: str) -> str:
+        """Return full path ("folder/name"), folder separator is '/'."""
+        folder = folder.replace("\\", "/").rstrip("/")
+        if folder == "":
+            return name
+        return folder + "/" + name
+
+    def __get_ref_path(self, reference: str) -> str:
+        """Return full path of the referenced RDM connection (credential, host)."""
+        folder, _, name = reference.replace("\\", "/").rpartition("/")
+        return self.__get_path(folder, name)
+
+    def __get_column(self, sheet_dict: dict, key: str, count: int) -> list:
+        """Return sheet column as list of stripped strings (empty if not defined)."""
+        column = sheet_dict.get(key)
+        if column is None:
+            return [""] * count
+        return ["" if value is None else str(value).strip() for value in column]
+
+    def __get_count(self, sheet_dict: dict, key: str) -> int:
+        """Return number of sheet rows (length of the key column)."""
+        return len(sheet_dict.get(key) or [])
+
+    def __get_blank_rows(self, columns: dict, count: int) -> set:
+        """Return indexes of blank rows (all values empty, e.g. separators)."""
+        return {
+            idx
+            for idx in range(count)
+            if all(column[idx] == "" for column in columns.values())
+        }
+
+    def __check_required(self, sheet: str, columns: dict, count: int, blank=frozenset()):
+        """Check required fields of the sheet rows (blank rows are skipped)."""
+        for key in self.REQUIRED[sheet]:
+            for idx, value in enumerate(columns[key]):
+                if value == "" and idx not in blank:
+                    self._add_issue(
+                        "error", "required", sheet, idx, key, value,
+                        f"Required value '{self.__get_col_name(sheet, key)}' is empty.",
+                    )
+
+    def __get_index(self, sheet: str, names: list, label: str) -> dict:
+        """Return name: row index dict, report duplicate names."""
+        index = {}
+        for idx, name in enumerate(names):
+            if name == "":
+                continue
+            if name in index:
+                self._add_issue(
+                    "error", "duplicate", sheet, idx, "", name,
+                    f"Duplicate {label} '{name}' (row {index[name] + 2}).",
+                )
+                continue
+            index[name] = idx
+
+        return index
+
+    def __check_unused(self, sheet: str, index: dict, referenced: set, key: str, label: str):
+        """Report index entries not referenced by any session (warning)."""
+        for name, idx in index.items():
+            if name not in referenced:
+                self._add_issue(
+                    "warning", "unused", sheet, idx, key, name,
+                    f"{label.capitalize()} '{name}' is not used by any session.",
+                )
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def validate(
+        self,
+        sessions: dict,
+        scrt_credentials: dict | None = None,
+        scrt_firewalls: dict | None = None,
+        rdm_credentials: dict | None = None,
+        rdm_hosts: dict | None = None,
+    ) -> dict:
+        """Validate sheets (column-based dicts, as read from Excel).
+
+        Args:
+            sessions (dict): Sessions dict
+            scrt_credentials (dict, optional): SecureCRT credential groups dict
+            scrt_firewalls (dict, optional): SecureCRT firewall groups dict
+            rdm_credentials (dict, optional): RDM credentials dict
+            rdm_hosts (dict, optional): RDM hosts dict
+
+        Returns:
+            (dict): Validation report (counters and issues)
+        """
+        start = time.perf_counter()
+        self._issues = []
+        check_scrt = self.target in (None, "scrt")
+        check_rdm = self.target in (None, "rdm")
+
+        # sessions
+        # ==========
+
+        count = self.__get_count(sessions, "session")
+        keys = [
+            "folder", "session", "type", "hostname", "port",
+            "scrt_credential", "scrt_firewall", "rdm_credential", "rdm_host",
+        ]
+        columns = {key: self.__get_column(sessions, key, count) for key in keys}
+        blank = self.__get_blank_rows(columns, count)
+        self.__check_required("sessions", columns, count, blank)
+
+        paths = {}
+        scrt_folders = set()
+        for idx in range(count):
+            if idx in blank:
+                continue
+            session_type = columns["type"][idx]
+            if session_type != "" and session_type not in self.SESSION_TYPES:
+                self._add_issue(
+                    "error", "invalid_value", "sessions", idx, "type", session_type,
+                    f"Unknown session type '{session_type}' (use: {', '.join(self.SESSION_TYPES)}).",
+                )
+
+            port = columns["port"][idx]
+            if port != "" and (not port.isdigit() or not 0 < int(port) < 65536):
+                self._add_issue(
+                    "error", "invalid_value", "sessions", idx, "port", port,
+                    f"Port '{port}' is not a number 1-65535.",
+                )
+
+            # only ssh sessions are built for SecureCRT
+            if columns["session"][idx] == "" or (not check_rdm and session_type != "ssh"):
+                continue
+
+            path = self.__get_path(columns["folder"][idx], columns["session"][idx])
+            if path in paths:
+                self._add_issue(
+                    "error", "duplicate", "sessions", idx, "session", path,
+                    f"Duplicate session path '{path}' (row {paths[path] + 2}).",
+                )
+            else:
+                paths[path] = idx
+
+            if check_scrt and session_type == "ssh":
+                folder = columns["folder"][idx].strip("/")
+                while folder != "":
+                    scrt_folders.add(folder)
+                    folder = folder.rpartition("/")[0]
+
+        if check_scrt:
+            # SecureCRT merges folder and session of the same path
+            for path in scrt_folders:
+                idx = paths.get(path)
+                if idx is not None and columns["type"][idx] == "ssh":
+                    self._add_issue(
+                        "error", "path_conflict", "sessions", idx, "session", path,
+                        f"Session path '{path}' is also a folder path.",
+                    )
+
+        # SecureCRT references
+        # ==========
+
+        if check_scrt and scrt_credentials is not None:
+            sheet_count = self.__get_count(scrt_credentials, "credential")
+            sheet_columns = {
+                key: self.__get_column(scrt_credentials, key, sheet_count)
+                for key in ("credential",)
+            }
+            self.__check_required("scrt_credentials", sheet_columns, sheet_count)
+            index = self.__get_index("scrt_credentials", sheet_columns["credential"], "credential group")
+
+            referenced = set()
+            for idx in range(count):
+                credential = columns["scrt_credential"][idx]
+                if columns["type"][idx] != "ssh" or credential == "":
+                    continue
+                referenced.add(credential)
+                if credential not in index:
+                    self._add_issue(
+                        "error", "missing_reference", "sessions", idx, "scrt_credential", credential,
+                        f"Credential group '{credential}' not found.",
+                    )
+            self.__check_unused("scrt_credentials", index, referenced, "credential", "credential group")
+
+        # jump host sessions (firewall value is a session path)
+        jump_hosts = None
+        if check_scrt:
+            graph = SMJumpHostGraph(sessions)
+            for missing in graph.get_missing():
+                self._add_issue(
+                    "error", "missing_reference", "sessions", missing["row"], "scrt_firewall", missing["target"],
+                    f"Jump host session '{missing['target']}' not found.",
+                )
+            for cycle in graph.get_cycles():
+                chain = " -> ".join(node["session"] for node in cycle + cycle[:1])
+                self._add_issue(
+                    "error", "cycle", "sessions", cycle[0]["row"], "scrt_firewall", cycle[0]["session"],
+                    f"Jump host cycle: {chain}.",
+                )
+            jump_hosts = {
+                "sessions": graph.get_jump_sessions_count(),
+                "max_depth": graph.get_max_depth(),
+                "cycles": len(graph.get_cycles()),
+            }
+
+        if check_scrt and scrt_firewalls is not None:
+            sheet_count = self.__get_count(scrt_firewalls, "firewall")
+            sheet_columns = {
+                key: self.__get_column(scrt_firewalls, key, sheet_count)
+                for key in ("firewall", "address")
+            }
+            self.__check_required("scrt_firewalls", sheet_columns, sheet_count)
+            index = self.__get_index("scrt_firewalls", sheet_columns["firewall"], "firewall group")
+
+            referenced = set()
+            for idx in range(count):
+                firewall = columns["scrt_firewall"][idx]
+                # firewall with '/' is a session path (jump host)
+                if (
+                    columns["type"][idx] != "ssh"
+                    or firewall in self.NO_FIREWALL
+                    or SMJumpHostGraph.get_target_path(firewall) is not None
+                ):
+                    continue
+                referenced.add(firewall)
+                if firewall not in index:
+                    self._add_issue(
+                        "error", "missing_reference", "sessions", idx, "scrt_firewall", firewall,
+                        f"Firewall group '{firewall}' not found.",
+                    )
+            self.__check_unused("scrt_firewalls", index, referenced, "firewall", "firewall group")
+
+        # RDM references
+        # ==========
+
+        if check_rdm:
+            credentials_index = None
+            if rdm_credentials is not None:
+                sheet_count = self.__get_count(rdm_credentials, "credential")
+                sheet_columns = {
+                    key: self.__get_column(rdm_credentials, key, sheet_count)
+                    for key in ("folder", "credential")
+                }
+                self.__check_required("rdm_credentials", sheet_columns, sheet_count)
+                credentials_index = self.__get_index(
+                    "rdm_credentials",
+                    [
+                        self.__get_path(folder, name) if name else ""
+                        for folder, name in zip(sheet_columns["folder"], sheet_columns["credential"])
+                    ],
+                    "credential",
+                )
+
+            hosts_index = None
+            referenced_credentials = set()
+            if rdm_hosts is not None:
+                sheet_count = self.__get_count(rdm_hosts, "name")
+                sheet_columns = {
+                    key: self.__get_column(rdm_hosts, key, sheet_count)
+                    for key in ("folder", "name", "rdm_vault")
+                }
+                self.__check_required("rdm_hosts", sheet_columns, sheet_count)
+                hosts_index = self.__get_index(
+                    "rdm_hosts",
+                    [
+                        self.__get_path(folder, name) if name else ""
+                        for folder, name in zip(sheet_columns["folder"], sheet_columns["name"])
+                    ],
+                    "host",
+                )
+
+                for idx, vault in enumerate(sheet_columns["rdm_vault"]):
+                    if vault == "" or credentials_index is None:
+                        continue
+                    vault_path = self.__get_ref_path(vault)
+                    referenced_credentials.add(vault_path)
+                    if vault_path not in credentials_index:
+                        self._add_issue(
+                            "error", "missing_reference", "rdm_hosts", idx, "rdm_vault", vault,
+                            f"Credential '{vault}' not found.",
+                        )
+
+            referenced_hosts = set()
+            for idx in range(count):
+                credential = columns["rdm_credential"][idx]
+                if credential != "" and credentials_index is not None:
+                    credential_path = self.__get_ref_path(credential)
+                    referenced_credentials.add(credential_path)
+                    if credential_path not in credentials_index:
+                        self._add_issue(
+                            "error", "missing_reference", "sessions", idx, "rdm_credential", credential,
+                            f"Credential '{credential}' not found.",
+                        )
+
+                host = columns["rdm_host"][idx]
+                if host != "" and hosts_index is not None:
+                    host_path = self.__get_ref_path(host)
+                    referenced_hosts.add(host_path)
+                    if host_path not in hosts_index:
+                        self._add_issue(
+                            "error", "missing_reference", "sessions", idx, "rdm_host", host,
+                            f"Host '{host}' not found.",
+                        )
+
+            if credentials_index is not None:
+                self.__check_unused("rdm_credentials", credentials_index, referenced_credentials, "credential", "credential")
+            if hosts_index is not None:
+                self.__check_unused("rdm_hosts", hosts_index, referenced_hosts, "name", "host")
+
+        errors = sum(1 for issue in self._issues if issue["severity"] == "error")
+        report = {
+            "target": self.target,
+            "sessions": count,
+            "errors": errors,
+            "warnings": len(self._issues) - errors,
+            "seconds": round(time.perf_counter() - start, 4),
+            "jump_hosts": jump_hosts,
+            "issues": self._issues,
+        }
+        logging.info(
+            "Validation done. %d error(s), %d warning(s) in %.3f s.",
+            report["errors"],
+            report["warnings"],
+            report["seconds"],
+        )
+
+        return report
+
+    def get_report_lines(self, report: dict, limit=20) -> list:
+        """Return validation report lines (issues up to the limit and summary).
+
+        Args:
+            report (dict): Validation report (see validate())
+            limit (int, optional): Maximum number of listed issues. Default: 20.
+        """
+        lines = []
+        for issue in report["issues"][:limit]:
+            row = "" if issue["row"] is None else f" row {issue['row']}"
+            lines.append(f"{issue['severity'].upper()}: [{issue['sheet']}{row}] {issue['message']}")
+        if len(report["issues"]) > limit:
+            lines.append(f"... and {len(report['issues']) - limit} more issue(s).")
+        if report.get("jump_hosts"):
+            lines.append(
+                "Jump hosts: %d session(s) behind jump host, max chain depth %d, %d cycle(s)."
+                % (
+                    report["jump_hosts"]["sessions"],
+                    report["jump_hosts"]["max_depth"],
+                    report["jump_hosts"]["cycles"],
+                )
+            )
+        lines.append(
+            "Validation: %d error(s), %d warning(s) in %.3f s."
+            % (report["errors"], report["warnings"], report["seconds"])
+        )
+
+        return lines
+
+    def write_report(self, report: dict, report_file: str) -> None:
+        """Write validation report to JSON file."""
+        with open(report_file, "w", encoding="utf8") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        logging.info("Validation report written to '%s'.", report_file)
@@ -0,0 +1,298 @@
+"""SessionMaker watch module
+
+Class - SMWatcher:
+    Watch source Excel book and configuration file, rebuild sessions on change
+    (warm incremental rebuild).
+
+Author:
+    Martin Kyrc
+
+Version list:
+    = 1.0 (20261019)
+        - initial version
+
+"""
+
+import logging
+import os
+import os.path
+import time
+from datetime import datetime
+
+from ruamel.yaml import YAMLError
+
+from .settings import read_config_file
+from .sm_scrt import SMSecureCrt
+from .sm_rdm import SMDevolutionsRdm
+
+
+# ========================================
+# Class SMWatcher
+# ========================================
+class SMWatcher:
+    """SessionMaker watch mode (warm incremental rebuild).
+
+    Process keeps settings, parsed templates and normalized sheets in memory.
+    When the source book changes, only modified sheets are read again and
+    (SecureCRT) only sessions built from changed rows are built again.
+    Output file is replaced atomically.
+
+    Attributes:
+        Public:
+            config_file (str): Configuration file (watched).
+            src_file (str): Source Excel file (watched).
+            dst_file (str): Destination file (SecureCRT XML or Devolutions RDM JSON).
+            maker_type (str): Destination type ('scrt' or 'rdm').
+            interval (float): Polling interval (seconds).
+            quiet (bool): Quiet output.
+
+        Private:
+            _settings (dict): Configuration settings.
+            _maker (SMSecureCrt|SMDevolutionsRdm): Warm sessions maker.
+            _signature (dict): Source book signature (last read).
+            _file_stats (dict): Watched files stats (last read).
+    """
+
+    # sheets read by maker type ('tab_*' settings key, maker method normalizing the sheet)
+    SHEETS = {
+        "scrt": (
+            ("tab_sessions", "excel_read_sheet_sessions"),
+            ("tab_scrt_credentials", "excel_read_sheet_credentials"),
+            ("tab_scrt_firewalls", "excel_read_sheet_firewalls"),
+        ),
+        "rdm": (
+            ("tab_sessions", "excel_read_sheet_sessions"),
+            ("tab_rdm_credentials", "excel_read_sheet_credentials"),
+            ("tab_rdm_hosts", "excel_read_sheet_rdm_hosts"),
+        ),
+    }
+
+    def __init__(
+        self,
+        config_file: str,
+        src_file: str,
+        dst_file: str,
+        maker_type="scrt",
+        interval=1.0,
+        quiet=False,
+    ):
+        self.config_file = config_file
+        self.src_file = src_file
+        self.dst_file = dst_file
+        self.maker_type = maker_type
+        self.interval = interval
+        self.quiet = quiet
+
+        self._settings = None
+        self._maker = None
+        self._signature = None
+        self._file_stats = {}
+
+    # ========================================
+    # Private methods
+    # ========================================
+
+    def _print(self, message: str):
+        """Print status message (if not quiet)."""
+        if not self.quiet:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
+
+    def _get_file_stat(self, file: str) -> tuple | None:
+        """Return file (mtime, size) or None (file doesn't exist)."""
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _get_watched_files(self) -> list:
+        """Return list of watched files (config, source book, templates)."""
+        files = [self.config_file, self.src_file]
+        if self.maker_type == "scrt" and self._settings:
+            files.extend(self._settings["scrt"]["template"].values())
+        return files
+
+    def _load_settings(self) -> bool:
+        """Read configuration file, keep current settings on error."""
+        try:
+            settings = read_config_file(self.config_file)
+        except (OSError, YAMLError) as err:
+            logging.error("Unable to read configuration file '%s'.", self.config_file)
+            logging.error("%s", err)
+            return False
+
+        if not settings:
+            return False
+
+        self._settings = settings
+        return True
+
+    def _load_maker(self) -> bool:
+        """Create maker object and read whole source book."""
+        if self.maker_type == "scrt":
+            self._maker = SMSecureCrt(
+                settings=self._settings, excel_file=self.src_file, read_excel_file=True
+            )
+            self._maker.set_xml_session_cache(True)
+        else:
+            self._maker = SMDevolutionsRdm(
+                settings=self._settings, excel_file=self.src_file, read_excel_file=True
+            )
+        self._signature = self._maker.excel_get_book_signature()
+
+        return self._read_sheets(None)
+
+    def _reload_sheets(self) -> list | None | bool:
+        """Read changed sheets of the source book.
+
+        Returns:
+            (list): Changed sheets (already read)
+            None: All sheets read again
+            False: In case of error
+        """
+        signature = self._maker.excel_get_book_signature()
+        changed_sheets = self._maker.excel_get_changed_sheets(self._signature, signature)
+
+        if changed_sheets is None:
+            if not self._maker.excel_read_book():
+                return False
+        elif changed_sheets:
+            if not self._maker.excel_read_sheets(changed_sheets):
+                return False
+        self._signature = signature
+
+        if not self._read_sheets(changed_sheets):
+            return False
+
+        return changed_sheets
+
+    def _read_sheets(self, sheet_names: list | None) -> bool:
+        """Normalize sheets (set maker's dicts).
+
+        Args:
+            sheet_names (list|None): Sheets to normalize. None = all sheets.
+        """
+        for tab_key, method in self.SHEETS[self.maker_type]:
+            sheet_name = self._settings["excel"][tab_key]
+            if sheet_names is not None and sheet_name not in sheet_names:
+                continue
+            if getattr(self._maker, method)(sheet_name) is False and tab_key == "tab_sessions":
+                logging.error("Unable to read sheet '%s'.", sheet_name)
+                return False
+
+        return True
+
+    def _build(self) -> str | None:
+        """Build sessions and replace destination file atomically.
+
+        Returns:
+            (str): Rebuild summary
+            None: No sessions
+        """
+        if self.maker_type == "scrt":
+            if self._maker.build_xml_from_dict() is None:
+                return None
+            self._maker.xml_write(xml_file=self.dst_file, atomic=True)
+            stats = self._maker.get_xml_session_cache_stats()
+            return "%d session(s) built, %d reused" % (stats["built"], stats["reused"])
+
+        rdm_json = self._maker.build_json_from_dict()
+        if rdm_json is None:
+            return None
+        self._maker.write_json(json_file=self.dst_file, atomic=True)
+        return "%d connection(s) built" % len(rdm_json["Connections"])
+
+    # ========================================
+    # Public methods
+    # ========================================
+
+    def rebuild(self, changed_files: list | None = None) -> bool:
+        """Rebuild sessions (warm) and write destination file.
+
+        Args:
+            changed_files (list, optional): Changed watched files. None = initial (full) build.
+
+        Returns:
+            True: When success
+            False: If not (last written destination file is kept)
+        """
+        start = time.perf_counter()
+        changed_sheets = None
+
+        if changed_files is None or self._maker is None or self.config_file in changed_files:
+            # settings changed, everything depends on them (full build)
+            if not self._load_settings() or not self._load_maker():
+                return False
+        else:
+            if self.maker_type == "scrt" and self.src_file not in changed_files:
+                # templates changed, built sessions are not valid anymore
+                self._maker.clear_xml_cache()
+            if self.src_file in changed_files:
+                changed_sheets = self._reload_sheets()
+                if changed_sheets is False:
+                    return False
+
+        summary = self._build()
+        latency = time.perf_counter() - start
+
+        if summary is None:
+            self._print("No sessions. Destination file not written.")
+            return False
+
+        if changed_sheets is None:
+            sheets = "all sheets"
+        elif changed_sheets:
+            sheets = "sheet(s) '" + "', '".join(changed_sheets) + "'"
+        else:
+            sheets = "no sheet changed"
+        self._print(f"Rebuilt '{self.dst_file}' in {latency:.3f} s ({sheets}, {summary}).")
+        logging.info("Rebuild latency %.6f s.", latency)
+
+        return True
+
+    def run(self) -> None:
+        """Initial build and watch files until interrupted (Ctrl+C)."""
+        if not self.rebuild():
+            self._print("Build failed. Waiting for changes...")
+        for file in self._get_watched_files():
+            self._file_stats[file] = self._get_file_stat(file)
+
+        self._print(
+            f"Watching '{self.src_file}' and '{self.config_file}' (Ctrl+C to stop)..."
+        )
+
+        pending = {}
+        try:
+            while True:
+                time.sleep(self.interval)
+
+                # file is changed, when its stat differs from the last read
+                # and it's the same for one polling interval (saved completely)
+                changed_files = []
+                for file in self._get_watched_files():
+                    stat = self._get_file_stat(file)
+                    if stat == self._file_stats.get(file):
+                        pending.pop(file, None)
+                        continue
+                    if stat is not None and pending.get(file) == stat:
+                        changed_files.append(file)
+                    pending[file] = stat
+
+                if not changed_files:
+                    continue
+
+                for file in changed_files:
+                    self._file_stats[file] = pending.pop(file)
+                self._print("Changed: '" + "', '".join(changed_files) + "'.")
+
+                if not self.rebuild(changed_files):
+                    self._print(f"Rebuild failed. Keeping '{self.dst_file}'.")
+
+                if self.config_file in changed_files:
+                    # watched templates may change with settings
+                    for file in self._get_watched_files():
+                        if file not in self._file_stats:
+                            self._file_stats[file] = self._get_file_stat(file)
+
+        except KeyboardInterrupt:
+            self._print("Stopped.")
@@ -3,6 +3,13 @@
 Class - SMXml:
     Basic XML operations (read and write).
 
+XML backend:
+    Source files are parsed with lxml when it is installed (faster parser,
+    huge trees), ElementTree otherwise. Environment variable
+    SESSIONMAKER_XML_BACKEND ('auto', 'lxml', 'etree') overrides the choice.
+    Built documents (templates) are always ElementTree elements, indented
+    and serialized by ElementTree (the backend is used for parsing only).
+
 Author:
     Martin Kyrc
 
@@ -11,11 +18,64 @@ Version list:
         - initial version
 
 """
+import io
 import logging
+import os
 import os.path
+from functools import lru_cache
 from pathlib import Path
 
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # optional, accelerated XML parser
+    lxml_etree = None
+
+from .fileio import open_input, open_output
+
+# XML backend selection (environment variable)
+XML_BACKEND_ENV = "SESSIONMAKER_XML_BACKEND"
+XML_BACKENDS = ("auto", "lxml", "etree")
+
+# attribute value entities (besides '&', '<', '>'), the same as ElementTree serializer writes
+XML_ATTRIB_ENTITIES = {'"': "&quot;", "\r": "&#13;", "\n": "&#10;", "\t": "&#09;"}
+
+
+def get_xml_backend() -> str:
+    """Return XML parser backend name ('lxml' or 'etree').
+
+    'auto' (default) uses lxml when it is installed. Unknown value or 'lxml'
+    without lxml installed falls back to 'etree' (with a warning).
+    """
+    return _resolve_xml_backend(os.environ.get(XML_BACKEND_ENV, "").strip().lower() or "auto")
+
+
+@lru_cache(maxsize=None)
+def _resolve_xml_backend(backend: str) -> str:
+    """Return XML backend of the environment value (warnings are logged once)."""
+    if backend not in XML_BACKENDS:
+        logging.warning("Unknown XML backend '%s' (%s). Using 'auto'.", backend, XML_BACKEND_ENV)
+        backend = "auto"
+    if backend == "etree":
+        return "etree"
+    if lxml_etree is None:
+        if backend == "lxml":
+            logging.warning("XML backend 'lxml' is not installed. Using 'etree'.")
+        return "etree"
+    return "lxml"
+
+
+def escape_xml_text(text: str) -> str:
+    """Return escaped XML text (element content), the same as ElementTree serializer writes."""
+    return escape(text)
+
+
+def escape_xml_attrib(value: str) -> str:
+    """Return escaped XML attribute value (without quotes), the same as ElementTree serializer writes."""
+    return escape(value, XML_ATTRIB_ENTITIES)
+
 
 # import pyexcel
 
@@ -54,6 +114,16 @@ class SMXml:
     # Private methods
     # ========================================
 
+    def __get_lxml_parser(self):
+        """Return lxml parser (huge trees, comments dropped as by ElementTree)."""
+        return lxml_etree.XMLParser(huge_tree=True, remove_comments=True, remove_pis=True)
+
+    def __get_parse_errors(self, backend: str) -> tuple:
+        """Return parse exception types of the backend."""
+        if backend == "lxml":
+            return (ET.ParseError, lxml_etree.XMLSyntaxError)
+        return (ET.ParseError,)
+
     # ========================================
     # Protected methods
     # ========================================
@@ -62,28 +132,78 @@ class SMXml:
     # Public methods
     # ========================================
 
-    def parse_xml_file(self, xml_file="") -> ET.Element | None:
-        """Read XML file and return ET.Element root object."""
+    def parse_xml_file(self, xml_file="", backend: str | None = None) -> ET.Element | None:
+        """Read XML file and return root element.
+
+        Compressed (gzip, zstd) file is decompressed while parsed. With lxml
+        backend, lxml element is returned (ElementTree compatible API, read
+        only use).
+
+        Args:
+            xml_file (str, optional): XML file. If not set, use self.xml_file.
+            backend (str, optional): 'lxml' or 'etree'. Default: None (see get_xml_backend()).
+        """
 
         if xml_file == "":
             xml_file = self.xml_file
+        if backend is None:
+            backend = get_xml_backend()
 
         try:
-            logging.info("Parsing XML file '%s'...", xml_file)
-            root = ET.parse(xml_file)
+            logging.info("Parsing XML file '%s' (%s)...", xml_file, backend)
+            with open_input(xml_file) as file:
+                if backend == "lxml":
+                    root = lxml_etree.parse(file, parser=self.__get_lxml_parser())
+                else:
+                    root = ET.parse(file)
             self._xml_element = root.getroot()
             logging.info("Success.")
-        except ET.ParseError as err:
+        except self.__get_parse_errors(backend) as err:
             logging.error("Unable to parse XML file '%s'", xml_file)
             logging.error("%s", err)
             self._xml_element = None
-        except FileNotFoundError as err:
+        except OSError as err:
             logging.error("Unable to read XML file '%s'", xml_file)
             logging.error("%s", err)
             self._xml_element = None
 
         return self._xml_element
 
+    def iterparse_xml_file(self, xml_file="", events=("start", "end"), backend: str | None = None):
+        """Read XML file incrementally and yield (event, element) pairs.
+
+        Elements are yielded while the file is parsed, caller is responsible
+        for releasing processed elements (keeps memory bounded). Compressed
+        (gzip, zstd) file is decompressed while parsed.
+
+        Args:
+            xml_file (str, optional): XML file. If not set, use self.xml_file.
+            events (tuple, optional): Events to report. Default: ("start", "end").
+            backend (str, optional): 'lxml' or 'etree'. Default: None (see get_xml_backend()).
+        """
+
+        if xml_file == "":
+            xml_file = self.xml_file
+        if backend is None:
+            backend = get_xml_backend()
+
+        try:
+            logging.info("Parsing XML file '%s' (streaming, %s)...", xml_file, backend)
+            with open_input(xml_file) as file:
+                if backend == "lxml":
+                    yield from lxml_etree.iterparse(
+                        file, events=events, huge_tree=True, remove_comments=True, remove_pis=True
+                    )
+                else:
+                    yield from ET.iterparse(file, events=events)
+            logging.info("Success.")
+        except self.__get_parse_errors(backend) as err:
+            logging.error("Unable to parse XML file '%s'", xml_file)
+            logging.error("%s", err)
+        except OSError as err:
+            logging.error("Unable to read XML file '%s'", xml_file)
+            logging.error("%s", err)
+
     def print_xml(self, **kwargs):
         """Print ElementTree object to stdout as formated XML"""
 
@@ -99,6 +219,24 @@ class SMXml:
                 ).decode("utf8")
             )
 
+    def xml_to_bytes(self, **kwargs) -> bytes | None:
+        """Return XML object as bytes (the same content as written by write_xml_file).
+
+        Args:
+            xml_element (ET.Element, optional): XML object.
+        """
+
+        xml_element = kwargs.get("xml_element", self._xml_element)
+        if type(xml_element) is not ET.Element:
+            logging.error("Wrong XML element type")
+            return None
+
+        tree = ET.ElementTree(element=xml_element)
+        ET.indent(tree, space="\t", level=0)
+        with io.BytesIO() as file:
+            tree.write(file, encoding="utf8")
+            return file.getvalue()
+
     def set_xml_file(self, xml_file: str, read_xml_file=False):
         """Set XML file attribute"""
         self.xml_file = xml_file
@@ -106,9 +244,20 @@ class SMXml:
             self.parse_xml_file()
 
     def write_xml_file(self, **kwargs) -> None:
-        """Write XML object to file."""
+        """Write XML object to file.
+
+        Args:
+            xml_file (str, optional): Destination file. If not set, use self.xml_file.
+            xml_element (ET.Element, optional): XML object.
+            xml_bytes (bytes, optional): Serialized XML content (written instead of xml_element).
+            atomic (bool, optional): Replace destination file atomically. Default: False.
+            compression (str, optional): 'gzip', 'zstd' or 'none'. Default: None (by file extension '.gz', '.zst').
+        """
 
         xml_file = str(kwargs.get("xml_file", self.xml_file))
+        xml_bytes = kwargs.get("xml_bytes", None)
+        atomic = kwargs.get("atomic", False)
+        compression = kwargs.get("compression", None)
         # xml_element = ET.Element(kwargs.get("xml_element", self._xml_element))
         xml_element = kwargs.get("xml_element", self._xml_element)
 
@@ -119,21 +268,43 @@ class SMXml:
             Path(dst[0]).mkdir(parents=True, exist_ok=True)
 
         if os.path.exists(xml_file):
-            logging.warning("Destination file '%s' exists. Overwriting.", xml_file)
+            if atomic:
+                logging.info("Destination file '%s' exists. Replacing.", xml_file)
+            else:
+                logging.warning("Destination file '%s' exists. Overwriting.", xml_file)
 
         logging.info("Writing XML file '%s'.", xml_file)
-        if type(xml_element) is ET.Element:
+        if xml_bytes is not None:
+            try:
+                with open_output(xml_file, atomic=atomic, compression=compression) as file:
+                    file.write(xml_bytes)
+            except FileNotFoundError as err:
+                logging.error(
+                    "Unable to write. Destination XML file not set.",
+                )
+                logging.error("%s", err)
+                return
+            except OSError as err:
+                logging.error("Unable to write XML file '%s'", xml_file)
+                logging.error("%s", err)
+                return
+        elif type(xml_element) is ET.Element:
             # ET.indent(xml_element, space="\t", level=0)
             tree = ET.ElementTree(element=xml_element)
             ET.indent(tree, space="\t", level=0)
             try:
-                tree.write(xml_file, encoding="utf8")
+                with open_output(xml_file, atomic=atomic, compression=compression) as file:
+                    tree.write(file, encoding="utf8")
             except FileNotFoundError as err:
                 logging.error(
                     "Unable to write. Destination XML file not set.",
                 )
                 logging.error("%s", err)
                 return
+            except OSError as err:
+                logging.error("Unable to write XML file '%s'", xml_file)
+                logging.error("%s", err)
+                return
         else:
             logging.error("Wrong XML element type")
             return
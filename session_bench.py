@@ -0,0 +1,157 @@
+"""
+Session Bench - SessionMaker benchmark suite
+
+Generates synthetic fleets (sessions workbook and SecureCRT XML export)
+and measures end-to-end conversions (rows/sec, peak RSS).
+
+Author:
+    Martin Kyrc,
+    Soitron NetOps Team
+
+Revision:
+    1.0 (2026-10-19)
+        - initial version
+"""
+
+import json
+import os.path
+import sys
+
+# import lib
+from lib.parseargs import parse_bench_args
+from lib.logging import init_logging
+from lib.settings import set_config_file
+from lib.settings import read_config_file
+from lib.sm_bench import SMBenchmark
+
+# ====================
+# Main function
+# ====================
+
+
+def main() -> int:
+    """Main function of the script
+
+    Returns:
+        (int): Exit status (0 = all cases passed, 1 = case failed, 2 = error)
+    """
+
+    ARGS = parse_bench_args()
+    init_logging(ARGS.verbose)
+
+    ## default settings
+    # default settings file (SessionMaker folder, cases run there)
+    config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+
+    # read config file
+    # if undefined, use 'config.yaml'
+    if ARGS.config:
+        config_file = set_config_file(ARGS.config.strip(), config_file)
+
+    config_data = read_config_file(config_file)
+    if config_data is False:
+        return 2
+
+    sizes = [parse_size(size) for size in ARGS.sizes.split(",") if size.strip()]
+    cases = [case.strip() for case in ARGS.cases.split(",") if case.strip()]
+    all_cases = list(SMBenchmark.CASES) + list(SMBenchmark.THREAD_CASES)
+    if not cases:
+        cases = all_cases
+    for case in cases:
+        if case not in all_cases:
+            print(f"Unknown case '{case}'. Available: {', '.join(all_cases)}")
+            return 2
+
+    sm_bench = SMBenchmark(
+        settings=config_data,
+        data_dir=ARGS.data,
+        config_file=config_file,
+        timeout=ARGS.timeout,
+        seed=ARGS.seed,
+    )
+
+    # Run benchmarks
+    # ==========
+
+    if not ARGS.quiet:
+        print(f"{'case':<24} {'sessions':>9} {'status':>8} {'seconds':>10} {'rows/sec':>10} {'peak RSS':>10}")
+
+    def print_result(result):
+        if ARGS.quiet:
+            return
+        rows_per_sec = result["rows_per_sec"] if result["rows_per_sec"] else 0
+        peak_rss = "%.1fM" % (result["peak_rss_kb"] / 1024) if result["peak_rss_kb"] else "-"
+        reference = ""
+        if "threads" in result:
+            reference = "  %d threads, output %s" % (
+                result["threads"],
+                "identical" if result["identical"] else "DIFFERS",
+            )
+        elif "reference" in result:
+            reference = "  %.2fx vs %s, output %s" % (
+                result["reference_speedup"],
+                result["reference"],
+                "identical" if result["identical"] else "DIFFERS",
+            )
+        print(
+            f"{result['case']:<24} {result['sessions']:>9} {result['status']:>8} "
+            f"{result['seconds']:>10.3f} {rows_per_sec:>10.1f} {peak_rss:>10}{reference}"
+        )
+
+    results = sm_bench.run(cases, sizes, on_result=print_result)
+
+    # Write results
+    # ==========
+
+    results_file = ARGS.write
+    if results_file is None:
+        results_file = os.path.join(ARGS.data, f"results-{results['commit']}.json")
+    sm_bench.write_results(results, results_file)
+    if not ARGS.quiet:
+        print(f"Results written to '{results_file}'.")
+
+    # Compare with baseline
+    # ==========
+
+    if ARGS.compare:
+        with open(ARGS.compare, "r", encoding="utf8") as file:
+            baseline = json.load(file)
+
+        print(f"Comparison with '{ARGS.compare}' (commit {baseline.get('commit', 'unknown')}):")
+        print(f"{'case':<24} {'sessions':>9} {'baseline':>10} {'current':>10} {'speedup':>8}")
+        for record in sm_bench.compare(results, baseline):
+            print(
+                f"{record['case']:<24} {record['sessions']:>9} {record['baseline_seconds']:>10.3f} "
+                f"{record['seconds']:>10.3f} {record['speedup']:>7.2f}x"
+            )
+
+    # failed case or output parity (reference, concurrent builds)
+    failed = [
+        result
+        for result in results["results"]
+        if result["status"] == "error" or result.get("identical") is False
+    ]
+    return 1 if failed else 0
+
+
+# ====================
+# Functions
+# ====================
+
+
+def parse_size(size: str) -> int:
+    """Return fleet size from string (e.g. '1000', '10k', '1m')."""
+    size = size.strip().lower()
+    if size.endswith("k"):
+        return int(float(size[:-1]) * 1000)
+    if size.endswith("m"):
+        return int(float(size[:-1]) * 1000000)
+    return int(size)
+
+
+# ====================
+# Initial functions
+# ====================
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Session Convert - direct SecureCRT <-> Devolutions RDM sessions conversion
+
+Converts SecureCRT sessions XML export to Devolutions RDM JSON or RDM JSON
+export to SecureCRT XML (source '*.json') without Excel book. Source is
+parsed incrementally and sessions are written as they come (bounded memory
+usage).
+
+Exit status is 0 on success and 2 in case of error.
+
+Author:
+    Martin Kyrc,
+    Soitron NetOps Team
+
+Revision:
+    1.0 (2026-10-19)
+        - initial version
+"""
+
+import os.path
+import sys
+from pathlib import Path
+
+# import lib
+from lib.parseargs import parse_convert_args
+from lib.logging import init_logging
+from lib.settings import set_config_file
+from lib.settings import read_config_file
+from lib.sm_convert import SMSessionConvert
+from lib.sm_profile import SMProfiler
+from lib.fileio import COMPRESSION_SUFFIXES, split_compression_suffix
+
+# ====================
+# Main function
+# ====================
+
+
+def main() -> int:
+    """Main function of the script"""
+
+    ARGS = parse_convert_args()
+    init_logging(ARGS.verbose)
+
+    ## default settings
+    config_file = "config.yaml"  # default settings file
+
+    # read config file
+    # if undefined, use 'config.yaml'
+    if ARGS.config:
+        config_file = set_config_file(ARGS.config.strip(), config_file)
+
+    config_data = read_config_file(config_file)
+    if config_data is False:
+        return 2
+
+    # conversion direction (by source file extension)
+    # compressed source: name without compression suffix
+    src_file = split_compression_suffix(ARGS.source)[0]
+    dst_type = "scrt" if src_file.lower().endswith(".json") else "rdm"
+
+    # destination file (json/xml)
+    # if undefined, export to 'export' subfolder
+    if ARGS.write:
+        dst_file = ARGS.write
+    else:
+        src_folder = os.path.split(src_file)
+        filename = Path(src_folder[1]).stem
+        if dst_type == "scrt":
+            dst_file = src_folder[0] + "/export/" + filename + "-scrt.xml"
+        else:
+            dst_file = src_folder[0] + "/export/" + filename + "-rdm.json"
+
+    if ARGS.compress and split_compression_suffix(dst_file)[1] != ARGS.compress:
+        dst_file += COMPRESSION_SUFFIXES[ARGS.compress]
+
+    # profiling (per-stage timing)
+    profiler = SMProfiler(
+        enabled=ARGS.profile or ARGS.profile_json is not None,
+        profile_dir=ARGS.profile_dir,
+        memory=ARGS.profile_memory,
+    )
+
+    # Convert sessions
+    # ==========
+
+    if not ARGS.quiet:
+        if dst_type == "scrt":
+            print(f"Converting Devolutions RDM JSON file to SecureCRT XML file '{dst_file}'...")
+        else:
+            print(f"Converting SecureCRT XML file to Devolutions RDM JSON file '{dst_file}'...")
+
+    sm_convert = SMSessionConvert(config_data, credential_folder=ARGS.credential_folder)
+    with profiler.stage("convert") as stage:
+        if dst_type == "scrt":
+            stats = sm_convert.rdm_to_scrt(ARGS.source, dst_file, compression=ARGS.compress)
+        else:
+            stats = sm_convert.scrt_to_rdm(ARGS.source, dst_file, compression=ARGS.compress)
+        if stats is not None:
+            stage["rows"] = stats["sessions"]
+
+    if stats is None:
+        if not ARGS.quiet:
+            print("Exit.")
+        return 2
+
+    if not ARGS.quiet and dst_type == "scrt":
+        print(
+            "Done. %d session(s), %d credential(s), %d folder(s) (%d host(s) resolved, %d unsupported connection(s), %d duplicate credential(s) skipped, %d unresolved reference(s))."
+            % (
+                stats["sessions"],
+                stats["credentials"],
+                stats["folders"],
+                stats["hosts"],
+                stats["unsupported"],
+                stats["duplicates"],
+                stats["unresolved"],
+            )
+        )
+    elif not ARGS.quiet:
+        print(
+            "Done. %d session(s), %d credential(s), %d folder(s) (%d unsupported session(s), %d firewall group(s) skipped)."
+            % (
+                stats["sessions"],
+                stats["credentials"],
+                stats["folders"],
+                stats["unsupported"],
+                stats["firewalls"],
+            )
+        )
+
+    # profiling report
+    profiler.print_report()
+    if ARGS.profile_json:
+        profiler.write_json(ARGS.profile_json)
+
+    return 0
+
+
+# ====================
+# Initial function
+# ====================
+
+if __name__ == "__main__":
+
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Session Diff - compare SecureCRT/Devolutions RDM sessions sources
+
+Compares two sources (Excel book, SecureCRT XML, Devolutions RDM JSON) in
+any combination by full session path. Reports added, removed and modified
+sessions (fields) and optionally writes changed sessions only as importable
+SecureCRT XML or Devolutions RDM JSON.
+
+Exit status is 0 when sources are the same, 1 when they differ and 2 in case
+of error.
+
+Author:
+    Martin Kyrc,
+    Soitron NetOps Team
+
+Revision:
+    1.0 (2026-10-19)
+        - initial version
+"""
+
+import sys
+
+# import lib
+from lib.parseargs import parse_diff_args
+from lib.logging import init_logging
+from lib.settings import set_config_file
+from lib.settings import read_config_file
+from lib.sm_diff import SMDiff
+from lib.sm_profile import SMProfiler
+from lib.fileio import split_compression_suffix
+
+# ====================
+# Main function
+# ====================
+
+
+def main() -> int:
+    """Main function of the script"""
+
+    ARGS = parse_diff_args()
+    init_logging(ARGS.verbose)
+
+    ## default settings
+    config_file = "config.yaml"  # default settings file
+
+    # read config file
+    # if undefined, use 'config.yaml'
+    if ARGS.config:
+        config_file = set_config_file(ARGS.config.strip(), config_file)
+
+    config_data = read_config_file(config_file)
+    if config_data is False:
+        return 2
+
+    # profiling (per-stage timing)
+    profiler = SMProfiler(
+        enabled=ARGS.profile or ARGS.profile_json is not None,
+        profile_dir=ARGS.profile_dir,
+        memory=ARGS.profile_memory,
+    )
+
+    # Compare sources
+    # ==========
+
+    sm_diff = SMDiff(config_data)
+    with profiler.stage("diff") as stage:
+        result = sm_diff.diff(ARGS.old, ARGS.new)
+        if result is not None:
+            stage["rows"] = result["old"]["sessions"] + result["new"]["sessions"]
+
+    if result is None:
+        if not ARGS.quiet:
+            print("Exit.")
+        return 2
+
+    if not ARGS.quiet:
+        for line in sm_diff.get_report(result, summary=ARGS.summary):
+            print(line)
+
+    if ARGS.json:
+        sm_diff.write_report(result, ARGS.json)
+
+    # Write changed sessions
+    # ==========
+
+    if ARGS.write:
+        dst_type = ARGS.type
+        if dst_type is None:
+            dst_file = split_compression_suffix(ARGS.write)[0]
+            dst_type = "rdm" if dst_file.lower().endswith(".json") else "scrt"
+
+        with profiler.stage("write") as stage:
+            count = sm_diff.write_changes(ARGS.write, dst_type)
+            stage["rows"] = count or 0
+
+        if not ARGS.quiet:
+            if count is None:
+                print("No added or modified sessions. Destination file not written.")
+            else:
+                print(f"{count} changed session(s) written to '{ARGS.write}'.")
+
+    # profiling report
+    profiler.print_report()
+    if ARGS.profile_json:
+        profiler.write_json(ARGS.profile_json)
+
+    changed = result["added"] or result["removed"] or result["modified"]
+    return 1 if changed else 0
+
+
+# ====================
+# Initial function
+# ====================
+
+if __name__ == "__main__":
+
+    sys.exit(main())
@@ -15,12 +15,15 @@ Revision:
 
 # import logging
 import os.path
+import sys
 from pathlib import Path
 from datetime import datetime
 
 # import lib
 from lib import parse_maker_args, init_logging, set_config_file, read_config_file
-from lib import SMSecureCrt, SMDevolutionsRdm
+from lib import SMSecureCrt, SMDevolutionsRdm, SMProfiler, SMWatcher, SMValidator
+from lib import SMJumpHostGraph, SMXmlMerge
+from lib.fileio import COMPRESSION_SUFFIXES, split_compression_suffix
 
 # ====================
 # Main functions
@@ -29,8 +32,8 @@ from lib import SMSecureCrt, SMDevolutionsRdm
 # global ARGS
 
 
-def main():
-    """Main function of the script"""
+def main() -> int:
+    """Main function of the script (returns exit status)"""
 
     ARGS = parse_maker_args()
     init_logging(ARGS.verbose)
@@ -53,7 +56,7 @@ def main():
 
     config_data = read_config_file(config_file)
     if config_data is False:
-        return
+        return 2
 
     # source file (excel)
     if ARGS.source:
@@ -64,58 +67,237 @@ def main():
     if not ARGS.print:
         if ARGS.write:
             dst_file = ARGS.write
+        elif ARGS.merge and not ARGS.delta:
+            # merge in place
+            dst_file = ARGS.merge
         else:
             src_folder = os.path.split(ARGS.source)
             filename = Path(src_folder[1]).stem
             current_date = datetime.now().strftime("%Y%m%d")
 
-            if ARGS.type == "scrt":
+            if ARGS.type == "scrt" and ARGS.shard:
+                # destination folder (shards and manifest)
+                dst_file = f"{src_folder[0]}/export/{current_date}-{filename}-scrt"
+            elif ARGS.type == "scrt":
                 dst_file = f"{src_folder[0]}/export/{current_date}-{filename}-scrt.xml"
+            elif ARGS.type == "scrt-ini":
+                # destination folder (SecureCRT Config folder tree)
+                dst_file = f"{src_folder[0]}/export/{current_date}-{filename}-scrt-ini"
             if ARGS.type == "rdm":
                 dst_file = f"{src_folder[0]}/export/{current_date}-{filename}-rdm.json"
 
+        # compressed destination file (shard files are named by the maker)
+        if ARGS.compress and not ARGS.shard:
+            if split_compression_suffix(dst_file)[1] != ARGS.compress:
+                dst_file += COMPRESSION_SUFFIXES[ARGS.compress]
+
+    # profiling (per-stage timing)
+    profiler = SMProfiler(
+        enabled=ARGS.profile or ARGS.profile_json is not None,
+        profile_dir=ARGS.profile_dir,
+        memory=ARGS.profile_memory,
+    )
+
     if not ARGS.quiet:
         print("Done.")
 
+    # ===========
+    # Watch mode (rebuild on change)
+    # ===========
+
+    if ARGS.watch:
+        watcher = SMWatcher(
+            config_file=config_file,
+            src_file=src_file,
+            dst_file=dst_file,
+            maker_type=ARGS.type,
+            interval=ARGS.interval,
+            quiet=ARGS.quiet,
+        )
+        watcher.run()
+        return 0
+
     # ===========
     # Make a sessions
     # ===========
 
-    if ARGS.type == "scrt":
-        # SecureCRT sessions (XML content) maker
+    validate = None
+    if ARGS.validate:
+        validate = {"strict": ARGS.strict, "report_file": ARGS.validate_json}
+
+    result = None
+    if ARGS.type in ("scrt", "scrt-ini"):
+        # SecureCRT sessions (XML content or .ini files) maker
 
-        scrt_maker(
+        result = scrt_maker(
             settings=config_data,
             src_file=src_file,
             dst_file=dst_file,
             quiet=ARGS.quiet,
             stdout=ARGS.print,
+            profiler=profiler,
+            shard_depth=ARGS.shard_depth if ARGS.shard else None,
+            compression=ARGS.compress,
+            parallel=ARGS.parallel,
+            compiled=ARGS.compiled,
+            compact=ARGS.compact,
+            merge_file=ARGS.merge,
+            ini=ARGS.type == "scrt-ini",
+            workers=ARGS.workers,
+            validate=validate,
+            bastion=ARGS.bastion,
         )
 
     if ARGS.type == "rdm":
         # Devolutions RDM session (JSON content) maker
-        rdm_maker(
+        result = rdm_maker(
             settings=config_data,
             src_file=src_file,
             dst_file=dst_file,
             quiet=ARGS.quiet,
             stdout=ARGS.print,
+            profiler=profiler,
+            validate=validate,
+            merge_file=ARGS.merge,
+            delta=ARGS.delta,
         )
 
+    # profiling report
+    profiler.print_report()
+    if ARGS.profile_json:
+        profiler.write_json(ARGS.profile_json)
+
+    # validation failed (strict)
+    return 1 if result is False else 0
+
 
 # ====================
 # Functions
 # ====================
 
 
+def validate_sheets(
+    target: str,
+    sheets: dict,
+    settings: dict,
+    validate: dict,
+    quiet=False,
+    profiler: SMProfiler | None = None,
+) -> bool:
+    """Validate normalized sheets before build (see SMValidator).
+
+    Args:
+        target (str): Destination type ('scrt' or 'rdm')
+        sheets (dict): Sheets dicts (keyword arguments of SMValidator.validate())
+        settings (dict): Configuration settings
+        validate (dict): Validation options: strict (bool), report_file (str)
+        quiet (bool, optional): If True, suppresses output messages. Defaults to False.
+        profiler (SMProfiler, optional): Pipeline stages profiler. Defaults to None.
+
+    Returns:
+        (bool): False if strict validation found error(s), True otherwise
+    """
+    if profiler is None:
+        profiler = SMProfiler()
+
+    if not quiet:
+        print("Validating sheets...")
+
+    validator = SMValidator(settings, target=target)
+    with profiler.stage("validate") as stage:
+        report = validator.validate(**sheets)
+        stage["rows"] = report["sessions"]
+
+    if not quiet:
+        for line in validator.get_report_lines(report):
+            print(line)
+
+    if validate.get("report_file"):
+        validator.write_report(report, validate["report_file"])
+
+    if validate.get("strict") and report["errors"] > 0:
+        if not quiet:
+            print("Validation failed (strict). Exit.")
+        return False
+
+    return True
+
+
+def bastion_query(sessions: dict, bastion: str, profiler: SMProfiler | None = None) -> bool:
+    """Print sessions connected through the bastion (jump host) session.
+
+    Args:
+        sessions (dict): Sessions dict
+        bastion (str): Bastion session path
+        profiler (SMProfiler, optional): Pipeline stages profiler. Defaults to None.
+
+    Returns:
+        (bool): False if the bastion session is not found
+    """
+    if profiler is None:
+        profiler = SMProfiler()
+
+    with profiler.stage("jump_hosts") as stage:
+        graph = SMJumpHostGraph(sessions)
+        transit = graph.get_transit(bastion)
+        stage["rows"] = graph.get_sessions_count()
+
+    if transit is None:
+        return False
+
+    chain = graph.get_chain(bastion)
+    print(f"Bastion '{chain[0]}' (jump host chain: {' -> '.join(chain)}).")
+    for item in transit:
+        print(f"  [{item['hops']}] {item['session']} (via '{item['via']}')")
+    direct = sum(1 for item in transit if item["hops"] == 1)
+    print(f"{len(transit)} session(s) transit through the bastion ({direct} directly).")
+
+    return True
+
+
 def scrt_maker(
     src_file: str | None = None,
     dst_file: str | None = None,
     settings=None,
     quiet=False,
     stdout=False,
+    profiler: SMProfiler | None = None,
+    shard_depth: int | None = None,
+    parallel=False,
+    compiled=False,
+    compact=False,
+    merge_file: str | None = None,
+    ini=False,
+    workers: int | None = None,
+    validate: dict | None = None,
+    bastion: str | None = None,
+    compression: str | None = None,
 ):
-    """Reading Excel and export sessions to SecureCRT."""
+    """Reading Excel and export sessions to SecureCRT.
+
+    When shard_depth is set, dst_file is a folder and one XML file per folder
+    subtree (of the depth) is written to it (see SMSecureCrt.xml_write_shards()),
+    compressed if compression is set. Single destination file is compressed
+    by its extension ('.gz', '.zst').
+    When parallel is set, sessions are built and serialized in worker processes
+    (see SMSecureCrt.build_xml_bytes_parallel()).
+    When compiled is set, sessions are rendered from compiled session template
+    (see SMSecureCrt.build_xml_bytes_compiled()).
+    When compact is set, settings identical to the template are written once
+    as 'Default' session (see SMSecureCrt.set_xml_compact()), size reduction
+    is printed at the end.
+    When merge_file is set, built sessions, credentials and firewalls are
+    merged into the existing SecureCRT XML file and written to dst_file
+    (see SMXmlMerge.merge()), returns False if merge fails.
+    When ini is set, dst_file is a folder and sessions, credentials and
+    firewalls are written as SecureCRT .ini files (see
+    SMSecureCrt.ini_write_folder()), returns False if writing fails.
+    When validate is set, sheets are validated before build (see
+    validate_sheets()); returns False if strict validation fails.
+    When bastion is set, sessions connected through the bastion session are
+    printed and nothing is built (see bastion_query()), returns False if the
+    bastion session is not found.
+    """
 
     # arguments
     # settings = kwargs.get("settings", {})
@@ -125,6 +307,8 @@ def scrt_maker(
     # stdout = kwargs.get("stdout", False)
     if settings is None:
         settings = {}
+    if profiler is None:
+        profiler = SMProfiler()
 
     # Reading Excel
     # ==========
@@ -132,16 +316,24 @@ def scrt_maker(
     if not quiet:
         print("Reading Excel book...")
 
-    sm_scrt = SMSecureCrt(settings=settings, excel_file=src_file, read_excel_file=True)
+    with profiler.stage("excel_load"):
+        sm_scrt = SMSecureCrt(
+            settings=settings, excel_file=src_file, read_excel_file=True
+        )
 
     # get excel content (and set object's attribute(s))
-    sessions_dict = sm_scrt.excel_read_sheet_sessions(settings["excel"]["tab_sessions"])
-    credentials_dict = sm_scrt.excel_read_sheet_credentials(
-        settings["excel"]["tab_scrt_credentials"]
-    )
-    firewalls_dict = sm_scrt.excel_read_sheet_firewalls(
-        settings["excel"]["tab_scrt_firewalls"]
-    )
+    with profiler.stage("normalize") as stage:
+        sessions_dict = sm_scrt.excel_read_sheet_sessions(
+            settings["excel"]["tab_sessions"]
+        )
+        credentials_dict = sm_scrt.excel_read_sheet_credentials(
+            settings["excel"]["tab_scrt_credentials"]
+        )
+        firewalls_dict = sm_scrt.excel_read_sheet_firewalls(
+            settings["excel"]["tab_scrt_firewalls"]
+        )
+        if sessions_dict:
+            stage["rows"] = len(sessions_dict["session"])
 
     if sessions_dict is False or credentials_dict is False or firewalls_dict is False:
         if not quiet:
@@ -160,13 +352,72 @@ def scrt_maker(
 
         print(f"Done. {p_sessions}, {p_credentials}, {p_firewalls} from Excel.")
 
+    # Validation
+    # ==========
+
+    if validate is not None:
+        sheets = {
+            "sessions": sessions_dict,
+            "scrt_credentials": sm_scrt.get_credentials_dict(),
+            "scrt_firewalls": sm_scrt.get_firewalls_dict(),
+        }
+        if not validate_sheets("scrt", sheets, settings, validate, quiet, profiler):
+            return False
+
+    # Bastion query (blast radius)
+    # ==========
+
+    if bastion is not None:
+        return bastion_query(sessions_dict, bastion, profiler)
+
+    # Sharded output (build and write per shard)
+    # ==========
+
+    if shard_depth is not None:
+        if not quiet:
+            print(f"Building and writing shards to '{dst_file}'...")
+
+        with profiler.stage("shard") as stage:
+            stage["rows"] = sm_scrt.get_sessions_dict_count(["ssh"])
+            manifest = sm_scrt.xml_write_shards(
+                dst_file, depth=shard_depth, workers=workers, compression=compression
+            )
+
+        if manifest is None:
+            if not quiet:
+                print("No sessions. Exit.")
+            return
+        if not quiet:
+            print(
+                "Done. %d shard(s), %d session(s), %d bytes (manifest: '%s')."
+                % (
+                    len(manifest["shards"]),
+                    manifest["sessions"],
+                    manifest["bytes"],
+                    os.path.join(dst_file, "manifest.json"),
+                )
+            )
+        return
+
     # Building SecureCRT sessions
     # ==========
 
     if not quiet:
         print("Building sessions...")
 
-    scrt_xml = sm_scrt.build_xml_from_dict()
+    if compact:
+        sm_scrt.set_xml_compact()
+
+    with profiler.stage("build") as stage:
+        if parallel:
+            # build and serialize (content is written as is)
+            scrt_xml = sm_scrt.build_xml_bytes_parallel(workers=workers)
+        elif compiled:
+            # render from compiled template (content is written as is)
+            scrt_xml = sm_scrt.build_xml_bytes_compiled()
+        else:
+            scrt_xml = sm_scrt.build_xml_from_dict()
+        stage["rows"] = sm_scrt.get_sessions_dict_count(["ssh"])
 
     if scrt_xml == None:
         if not quiet:
@@ -175,26 +426,97 @@ def scrt_maker(
     if not quiet:
         print("Done.")
 
-    # Exporting
+    # SecureCRT Config folder (.ini files)
     # ==========
 
-    if stdout:
-        # print to stdout
+    if ini:
         if not quiet:
-            print("XML content...")
-        sm_scrt.print_xml()
-    else:
-        # write to file
+            print(f"Writing .ini files to '{dst_file}'...")
+
+        with profiler.stage("ini_write") as stage:
+            stage["rows"] = sm_scrt.get_sessions_dict_count(["ssh"])
+            stats = sm_scrt.ini_write_folder(dst_file, workers=workers)
+
+        if stats is None:
+            if not quiet:
+                print("Exit.")
+            return False
         if not quiet:
-            print(f"Writing to '{dst_file}'...")
-        sm_scrt.set_xml_file(dst_file)
-        sm_scrt.xml_write()
+            print(
+                "Done. %d file(s) (%d written, %d unchanged), %d folder(s), %d bytes, %d other file(s) kept."
+                % (
+                    stats["files"],
+                    stats["written"],
+                    stats["unchanged"],
+                    stats["folders"],
+                    stats["bytes"],
+                    stats["kept"],
+                )
+            )
+        return
+
+    # Merging into existing file
+    # ==========
+
+    if merge_file is not None:
+        if not quiet:
+            print(f"Merging into '{merge_file}', writing to '{dst_file}'...")
+
+        with profiler.stage("merge") as stage:
+            stage["rows"] = sm_scrt.get_sessions_dict_count(["ssh"])
+            stats = SMXmlMerge(scrt_xml).merge(merge_file, dst_file)
+
+        if stats is None:
+            if not quiet:
+                print("Exit.")
+            return False
+        if not quiet:
+            for line in SMXmlMerge.get_report_lines(stats):
+                print(line)
+            print("Done.")
+        return
+
+    # Exporting
+    # ==========
+
+    with profiler.stage("serialize") as stage:
+        stage["rows"] = sm_scrt.get_sessions_dict_count(["ssh"])
+        if stdout:
+            # print to stdout
+            if not quiet:
+                print("XML content...")
+            sm_scrt.print_xml()
+        else:
+            # write to file
+            if not quiet:
+                print(f"Writing to '{dst_file}'...")
+            sm_scrt.set_xml_file(dst_file)
+            if parallel or compiled:
+                sm_scrt.xml_write(xml_bytes=scrt_xml)
+            elif compact:
+                # serialized content (size of compact output)
+                scrt_xml = sm_scrt.xml_to_bytes()
+                sm_scrt.xml_write(xml_bytes=scrt_xml)
+            else:
+                sm_scrt.xml_write()
         # alebo takto:
         # sm_scrt.xml_write(xml_file=dst_file)
 
     if not quiet:
         print("Done.")
 
+    # compact output size reduction
+    if compact and not quiet:
+        stats = sm_scrt.get_xml_compact_stats()
+        reduction = ""
+        if isinstance(scrt_xml, bytes):
+            full_size = len(scrt_xml) + stats["saved"]
+            reduction = f" ({len(scrt_xml)} of {full_size} bytes, -{100 * stats['saved'] / full_size:.1f}%)"
+        print(
+            f"Compact output: {stats['omitted']} of {stats['settings']} session setting(s) omitted, "
+            f"{stats['saved']} bytes smaller{reduction}."
+        )
+
 
 def rdm_maker(
     src_file: str | None = None,
@@ -202,6 +524,10 @@ def rdm_maker(
     settings=None,
     quiet=False,
     stdout=False,
+    profiler: SMProfiler | None = None,
+    validate: dict | None = None,
+    merge_file: str | None = None,
+    delta=False,
 ):
     """
     Generates Devolutions RDM sessions from an Excel file and exports them to JSON.
@@ -212,9 +538,14 @@ def rdm_maker(
         settings (dict, optional): Configuration settings for reading and processing the Excel file. Defaults to {}.
         quiet (bool, optional): If True, suppresses output messages. Defaults to False.
         stdout (bool, optional): If True, prints the JSON content to stdout instead of writing to a file. Defaults to False.
+        profiler (SMProfiler, optional): Pipeline stages profiler. Defaults to None (no profiling).
+        validate (dict, optional): Validation options (see validate_sheets()). Defaults to None (no validation).
+        merge_file (str, optional): Existing RDM JSON file, built connections are merged into it by path
+            (see SMDevolutionsRdm.merge_existing_json()). Defaults to None (no merge).
+        delta (bool, optional): With merge_file, write new and changed connections only. Defaults to False.
 
     Returns:
-        None
+        False if strict validation or reading of the merged file fails, None otherwise
     """
 
     # arguments
@@ -225,6 +556,8 @@ def rdm_maker(
     # stdout = kwargs.get("stdout", False)
     if settings is None:
         settings = {}
+    if profiler is None:
+        profiler = SMProfiler()
 
     # Reading Excel
     # ==========
@@ -232,16 +565,24 @@ def rdm_maker(
     if not quiet:
         print("Reading Excel book...")
 
-    sm_rdm = SMDevolutionsRdm(
-        settings=settings, excel_file=src_file, read_excel_file=True
-    )
+    with profiler.stage("excel_load"):
+        sm_rdm = SMDevolutionsRdm(
+            settings=settings, excel_file=src_file, read_excel_file=True
+        )
 
     # get content (and set object's attribute(s))
-    sessions_dict = sm_rdm.excel_read_sheet_sessions(settings["excel"]["tab_sessions"])
-    credentials_dict = sm_rdm.excel_read_sheet_credentials(
-        settings["excel"]["tab_rdm_credentials"]
-    )
-    hosts_dict = sm_rdm.excel_read_sheet_rdm_hosts(settings["excel"]["tab_rdm_hosts"])
+    with profiler.stage("normalize") as stage:
+        sessions_dict = sm_rdm.excel_read_sheet_sessions(
+            settings["excel"]["tab_sessions"]
+        )
+        credentials_dict = sm_rdm.excel_read_sheet_credentials(
+            settings["excel"]["tab_rdm_credentials"]
+        )
+        hosts_dict = sm_rdm.excel_read_sheet_rdm_hosts(
+            settings["excel"]["tab_rdm_hosts"]
+        )
+        if sessions_dict:
+            stage["rows"] = len(sessions_dict["session"])
 
     # if sessions_dict is False or credentials_dict is False or hosts_dict is False:
     if sessions_dict is False:
@@ -266,13 +607,39 @@ def rdm_maker(
 
         print(f"Done. {p_sessions}, {p_credentials}, {p_hosts} from Excel.")
 
+    # Validation
+    # ==========
+
+    if validate is not None:
+        sheets = {
+            "sessions": sessions_dict,
+            "rdm_credentials": sm_rdm.get_credentials_dict(),
+            "rdm_hosts": sm_rdm.get_rdm_hosts_dict(),
+        }
+        if not validate_sheets("rdm", sheets, settings, validate, quiet, profiler):
+            return False
+
+    # Reading existing RDM export (merge)
+    # ==========
+
+    if merge_file is not None:
+        if not quiet:
+            print(f"Reading existing connections from '{merge_file}'...")
+        with profiler.stage("merge_load"):
+            if not sm_rdm.set_existing_json(merge_file):
+                if not quiet:
+                    print("Exit.")
+                return False
+
     # Building Devolutions RDM sessions
     # ==========
 
     if not quiet:
         print("Building sessions...")
 
-    rdm_json = sm_rdm.build_json_from_dict()
+    with profiler.stage("build") as stage:
+        rdm_json = sm_rdm.build_json_from_dict()
+        stage["rows"] = len(rdm_json["Connections"])
 
     if rdm_json is None:
         if not quiet:
@@ -281,20 +648,43 @@ def rdm_maker(
     if not quiet:
         print("Done.")
 
-    # Exporting
+    # Merging into existing RDM export
     # ==========
 
-    if stdout:
-        # print to stdout
+    if merge_file is not None:
+        with profiler.stage("merge") as stage:
+            stage["rows"] = len(rdm_json["Connections"])
+            stats = sm_rdm.merge_existing_json(delta=delta)
+            rdm_json = sm_rdm.get_json_sessions()
         if not quiet:
-            print("JSON content...")
-        sm_rdm.print_json()
-    else:
-        # write to file
-        if not quiet:
-            print(f"Writing to '{dst_file}'...")
-        sm_rdm.set_json_file(dst_file)
-        sm_rdm.write_json()
+            print(
+                "Connections: %d added, %d updated, %d unchanged, %d kept (%s)."
+                % (
+                    stats["added"],
+                    stats["updated"],
+                    stats["unchanged"],
+                    stats["kept"],
+                    "delta" if delta else "merged",
+                )
+            )
+
+    # Exporting
+    # ==========
+
+    with profiler.stage("serialize") as stage:
+        stage["rows"] = len(rdm_json["Connections"])
+        if stdout:
+            # print to stdout
+            if not quiet:
+                print("JSON content...")
+            sm_rdm.print_json()
+        else:
+            # write to file
+            if not quiet:
+                print(f"Writing to '{dst_file}'...")
+            sm_rdm.set_json_file(dst_file)
+            # merged export replaces existing file atomically
+            sm_rdm.write_json(atomic=merge_file is not None)
         # sm_rdm.xml_write(xml_file=dst_file)
 
     if not quiet:
@@ -307,4 +697,4 @@ def rdm_maker(
 
 if __name__ == "__main__":
 
-    main()
+    sys.exit(main())
@@ -1,5 +1,5 @@
 """
-Session Reader - SecureCRT session reader
+Session Reader - SecureCRT and Devolutions RDM session reader
 
 Arguments:
 
@@ -15,6 +15,7 @@ Revision:
 
 # import logging
 import os.path
+import sys
 from pathlib import Path
 
 # import lib
@@ -24,17 +25,20 @@ from lib.settings import set_config_file
 from lib.settings import read_config_file
 from lib.sm_excel import SMExcel
 from lib.sm_scrt import SMSecureCrt
+from lib.sm_rdm import SMDevolutionsRdm
+from lib.sm_profile import SMProfiler
+from lib.fileio import split_compression_suffix
 
 # ====================
 # Main function
 # ====================
 
-def main():
-    """Main function of the script"""
+def main() -> int:
+    """Main function of the script (returns exit status)"""
 
     ## default settings
     config_file = "config.yaml"  # default settings file
-    src_file = None # SecureCRT XML file
+    src_file = None # SecureCRT XML file or Devolutions RDM JSON file
     dst_file = None # Excel file
 
     # arguments
@@ -50,21 +54,31 @@ def main():
 
     config_data = read_config_file(config_file)
     if config_data is False:
-        return
+        return 2
 
-    # source file (SecureCRT XML)
+    # source file (SecureCRT XML, SecureCRT Config folder or Devolutions RDM JSON)
     if ARGS.source:
         src_file = ARGS.source
+        if os.path.isdir(src_file):
+            src_file = os.path.normpath(src_file)
 
     # destination file (excel)
     # if undefined, export to 'export' subfolder
     if ARGS.write != None:
         dst_file = ARGS.write
     else:
-        src_folder = os.path.split(ARGS.source)
+        # compressed source: name without compression suffix
+        src_folder = os.path.split(split_compression_suffix(src_file)[0])
         filename = Path(src_folder[1]).stem
         dst_file = src_folder[0] + "/export/" + filename + ".xlsx"
 
+    # profiling (per-stage timing)
+    profiler = SMProfiler(
+        enabled=ARGS.profile or ARGS.profile_json is not None,
+        profile_dir=ARGS.profile_dir,
+        memory=ARGS.profile_memory,
+    )
+
     if not ARGS.quiet:
         print("Done.")
 
@@ -72,16 +86,55 @@ def main():
     # ===========
 
     example = 2
-
-    if example == 1:
+    result = None
+
+    if os.path.isdir(src_file):
+        # SecureCRT Config folder (.ini files)
+        scrt_reader_ini(
+            settings=config_data,
+            src_file=src_file,
+            dst_file=dst_file,
+            quiet=ARGS.quiet,
+            profiler=profiler,
+            workers=ARGS.workers,
+        )
+    elif split_compression_suffix(src_file)[0].lower().endswith(".json"):
+        # Devolutions RDM JSON is always read in streaming mode
+        result = rdm_reader_stream(
+            settings=config_data,
+            src_file=src_file,
+            dst_file=dst_file,
+            quiet=ARGS.quiet,
+            profiler=profiler,
+        )
+    elif ARGS.stream:
+        result = scrt_reader_stream(
+            settings=config_data,
+            src_file=src_file,
+            dst_file=dst_file,
+            quiet=ARGS.quiet,
+            profiler=profiler,
+        )
+    elif example == 1:
         scrt_reader_1(
             settings=config_data, src_file=src_file, dst_file=dst_file, quiet=ARGS.quiet
         )
     elif example == 2:
         scrt_reader_2(
-            settings=config_data, src_file=src_file, dst_file=dst_file, quiet=ARGS.quiet
+            settings=config_data,
+            src_file=src_file,
+            dst_file=dst_file,
+            quiet=ARGS.quiet,
+            profiler=profiler,
         )
 
+    # profiling report
+    profiler.print_report()
+    if ARGS.profile_json:
+        profiler.write_json(ARGS.profile_json)
+
+    return 2 if result is False else 0
+
 
 # ====================
 # Functions
@@ -146,6 +199,7 @@ def scrt_reader_2(**kwargs):
     src_file = kwargs.get("src_file", "")
     dst_file = kwargs.get("dst_file", "")
     quiet = kwargs.get("quiet", False)
+    profiler = kwargs.get("profiler", SMProfiler())
 
     # parse XML and prepare dictionaries
     # ==========    
@@ -153,11 +207,15 @@ def scrt_reader_2(**kwargs):
     if not quiet:
         print("Reading SecureCRT sessions XML file...")
 
-    sm_scrt = SMSecureCrt(settings=settings, xml_file=src_file, read_xml_file=True)
+    with profiler.stage("xml_parse"):
+        sm_scrt = SMSecureCrt(settings=settings, xml_file=src_file, read_xml_file=True)
 
-    if sm_scrt.build_dict_from_xml() == False:
-        if not quiet:
-            print("No Sessions. Exit")
+    with profiler.stage("normalize") as stage:
+        if sm_scrt.build_dict_from_xml() == False:
+            if not quiet:
+                print("No Sessions. Exit")
+        else:
+            stage["rows"] = sm_scrt.get_sessions_dict_count()
 
     if not quiet:
         print(
@@ -174,12 +232,168 @@ def scrt_reader_2(**kwargs):
 
     if not quiet:
         print("Writing Excel file...")
-    sm_scrt.set_excel_file(dst_file, False)
-    sm_scrt.write_excel()
+    with profiler.stage("excel_write") as stage:
+        stage["rows"] = sm_scrt.get_sessions_dict_count()
+        sm_scrt.set_excel_file(dst_file, False)
+        sm_scrt.write_excel()
+    if not quiet:
+        print("Done.")
+
+
+def scrt_reader_ini(**kwargs):
+    """Read SecureCRT Config folder (.ini files) and export it to Excel.
+
+    Files are parsed in parallel (thread pool) into the same dictionaries
+    as SecureCRT XML file.
+    """
+
+    ## parse kwargs
+    settings = kwargs.get("settings", {})
+    src_file = kwargs.get("src_file", "")
+    dst_file = kwargs.get("dst_file", "")
+    quiet = kwargs.get("quiet", False)
+    profiler = kwargs.get("profiler", SMProfiler())
+    workers = kwargs.get("workers", None)
+
+    # parse .ini files and prepare dictionaries
+    # ==========
+
+    if not quiet:
+        print("Reading SecureCRT Config folder (.ini files)...")
+
+    sm_scrt = SMSecureCrt(settings=settings)
+    with profiler.stage("ini_read") as stage:
+        stats = sm_scrt.read_ini_folder(src_file, workers=workers)
+        if stats is not None:
+            stage["rows"] = stats["files"]
+
+    if stats is None:
+        if not quiet:
+            print("Exit.")
+        return
+
+    with profiler.stage("normalize") as stage:
+        sm_scrt.build_dict_from_xml()
+        stage["rows"] = sm_scrt.get_sessions_dict_count()
+
+    if not quiet:
+        print(
+            "Done. %d session(s), %d credential group(s), %d firewall group(s) from %d file(s) (%d skipped)."
+            % (
+                sm_scrt.get_sessions_dict_count(),
+                sm_scrt.get_credentials_dict_count(),
+                sm_scrt.get_firewalls_dict_count(),
+                stats["files"],
+                stats["skipped"],
+            )
+        )
+
+    # Write to Excel file
+    # ==========
+
+    if not quiet:
+        print("Writing Excel file...")
+    with profiler.stage("excel_write") as stage:
+        stage["rows"] = sm_scrt.get_sessions_dict_count()
+        sm_scrt.set_excel_file(dst_file, False)
+        sm_scrt.write_excel()
     if not quiet:
         print("Done.")
 
 
+def scrt_reader_stream(**kwargs):
+    """Read SecureCRT XML sessions file and export it to Excel.
+
+    Streaming mode: sessions, credentials and firewalls are written to Excel
+    while XML file is parsed (no dictionaries are built). Excel file is
+    written only when XML file is parsed completely.
+
+    Returns:
+        False: XML file is not complete or Excel file can't be written
+    """
+
+    ## parse kwargs
+    settings = kwargs.get("settings", {})
+    src_file = kwargs.get("src_file", "")
+    dst_file = kwargs.get("dst_file", "")
+    quiet = kwargs.get("quiet", False)
+    profiler = kwargs.get("profiler", SMProfiler())
+
+    if not quiet:
+        print("Reading SecureCRT sessions XML file and writing Excel file...")
+
+    # parsing and writing are interleaved, there is only one stage
+    with profiler.stage("stream") as stage:
+        sm_scrt = SMSecureCrt(settings=settings, xml_file=src_file, read_xml_file=False)
+        sm_scrt.set_excel_file(dst_file, False)
+        counts = sm_scrt.write_excel_stream()
+        if counts is not None:
+            stage["rows"] = counts["sessions"]
+
+    if counts is None:
+        if not quiet:
+            print("Exit.")
+        return False
+
+    if not quiet:
+        print(
+            "Done. %d session(s), %d credential group(s), %d firewall group(s) from XML file."
+            % (
+                counts["sessions"],
+                counts["scrt_credentials"],
+                counts["scrt_firewalls"],
+            )
+        )
+
+
+def rdm_reader_stream(**kwargs):
+    """Read Devolutions RDM JSON file and export it to Excel.
+
+    Streaming mode: 'Connections' are decoded one by one and written to Excel
+    (sessions, rdm-credentials, rdm-hosts sheets). Excel file is written only
+    when JSON file is parsed completely.
+
+    Returns:
+        False: JSON file is not complete or Excel file can't be written
+    """
+
+    ## parse kwargs
+    settings = kwargs.get("settings", {})
+    src_file = kwargs.get("src_file", "")
+    dst_file = kwargs.get("dst_file", "")
+    quiet = kwargs.get("quiet", False)
+    profiler = kwargs.get("profiler", SMProfiler())
+
+    if not quiet:
+        print("Reading Devolutions RDM JSON file and writing Excel file...")
+
+    # parsing and writing are interleaved, there is only one stage
+    with profiler.stage("stream") as stage:
+        sm_rdm = SMDevolutionsRdm(settings=settings, json_file=src_file)
+        sm_rdm.set_excel_file(dst_file, False)
+        counts = sm_rdm.write_excel_stream()
+        if counts is not None:
+            stage["rows"] = counts["sessions"]
+
+    if counts is None:
+        if not quiet:
+            print("Exit.")
+        return False
+
+    if not quiet:
+        stats = sm_rdm.get_json_read_stats()
+        print(
+            "Done. %d session(s), %d credential(s), %d host(s) from JSON file (%d folder(s), %d unsupported)."
+            % (
+                counts["sessions"],
+                counts["rdm_credentials"],
+                counts["rdm_hosts"],
+                stats["folders"],
+                stats["unsupported"],
+            )
+        )
+
+
 # ====================
 # Initial functions
 # ====================
@@ -188,4 +402,4 @@ def scrt_reader_2(**kwargs):
 if __name__ == "__main__":
     ARGS = parse_reader_args()
     init_logging(ARGS.verbose)
-    main()
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Session Server - SessionMaker local conversion service
+
+Converts uploaded Excel book (or Excel book file path) to SecureCRT XML
+or Devolutions RDM JSON over HTTP (or Unix socket). Conversions run in
+worker processes with warm settings and templates.
+
+Author:
+    Martin Kyrc,
+    Soitron NetOps Team
+
+Revision:
+    1.0 (2026-10-19)
+        - initial version
+"""
+
+import sys
+
+# import lib
+from lib.parseargs import parse_server_args
+from lib.logging import init_logging
+from lib.settings import set_config_file
+from lib.settings import read_config_file
+from lib.sm_service import SMService
+
+# ====================
+# Main function
+# ====================
+
+
+def main() -> int:
+    """Main function of the script (returns exit status)"""
+
+    ARGS = parse_server_args()
+    init_logging(ARGS.verbose)
+
+    ## default settings
+    config_file = "config.yaml"  # default settings file
+
+    # read config file
+    # if undefined, use 'config.yaml'
+    if ARGS.config:
+        config_file = set_config_file(ARGS.config.strip(), config_file)
+
+    # check config file before workers start
+    config_data = read_config_file(config_file)
+    if config_data is False:
+        return 2
+
+    sm_service = SMService(
+        config_file=config_file,
+        workers=ARGS.workers,
+        max_concurrent=ARGS.max_concurrent,
+        max_queue=ARGS.max_queue,
+        max_body=int(ARGS.max_body * 1024 * 1024),
+        root=ARGS.root,
+        quiet=ARGS.quiet,
+    )
+    if not sm_service.run(host=ARGS.host, port=ARGS.port, socket_file=ARGS.socket):
+        return 2
+    return 0
+
+
+# ====================
+# Initial function
+# ====================
+
+if __name__ == "__main__":
+
+    sys.exit(main())